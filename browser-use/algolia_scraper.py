@@ -6,22 +6,31 @@ This module uses the hidden Algolia API instead of HTML scraping.
 Much faster, more reliable, and provides richer data (logo, slug, etc.)
 
 Usage:
-    python algolia_scraper.py
+    python algolia_scraper.py [--concurrency 16]
 
 API Details:
     - Endpoint: https://csekhvms53-dsn.algolia.net/1/indexes/*/queries
     - Index: wk_cms_jobs_production_careers
     - Filter: Station F jobs only (embedded in API key)
+
+Fetching: page 0 first (it reports nbPages), then the other pages in parallel
+(ALGOLIA_CONCURRENCY requests at a time) on one pooled HTTP session; the pages
+are merged in page order, so the result is the same as a sequential crawl.
 """
 
 import os
 import sys
 import json
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
+from matching import materialize_match_columns
+
 # Load environment variables
 root_dir = os.path.dirname(os.path.abspath(__file__))
 load_dotenv(os.path.join(root_dir, "..", ".env.local"))
@@ -63,6 +72,27 @@ ALGOLIA_HEADERS = {
 # TECH_FILTER = '["department:Tech","department:Engineering","department:Data","department:Product"]'
 TECH_FILTER = ''  # Empty = ALL departments (716+ jobs)
 
+# Pages fetched in parallel after page 0 (1 = one page at a time)
+ALGOLIA_CONCURRENCY = int(os.getenv("ALGOLIA_CONCURRENCY", "16"))
+
+# Session HTTP partagée (keep-alive) : une connexion par requête en vol
+_session: Optional[requests.Session] = None
+_pool_size = 0
+
+
+def get_session(pool_size: int = ALGOLIA_CONCURRENCY) -> requests.Session:
+    """Shared Algolia session, keeping at least pool_size connections alive."""
+    global _session, _pool_size
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(ALGOLIA_HEADERS)
+    if pool_size > _pool_size:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+        _pool_size = pool_size
+    return _session
+
 
 # ============================================================
 # MAIN SCRAPING FUNCTION
@@ -89,9 +119,8 @@ def fetch_algolia_jobs(page: int = 0, hits_per_page: int = 50) -> Dict:
     }
     
     try:
-        response = requests.post(
+        response = get_session().post(
             ALGOLIA_ENDPOINT,
-            headers=ALGOLIA_HEADERS,
             json=payload,
             timeout=30
         )
@@ -121,6 +150,10 @@ def map_algolia_hit_to_job(hit: Dict) -> Dict:
         - description: job description (HTML)
         - profile: required profile/skills (HTML)
         - department: {name}
+
+    The matching columns (match_text, match_skills...) are computed here too:
+    Algolia rows never get sector/stack/skills_extracted (those are only filled
+    for source="stationf"), so this row holds every source of the features.
     """
     org = hit.get("organization") or {}
     office = hit.get("office") or {}
@@ -149,7 +182,7 @@ def map_algolia_hit_to_job(hit: Dict) -> Dict:
     country_name = country.get("fr", "") if isinstance(country, dict) else str(country)
     location = f"{city}, {country_name}".strip(", ") if city else "Remote"
     
-    return {
+    job = {
         "external_id": hit.get("objectID"),
         "title": hit.get("name", "Untitled"),
         "company_name": org.get("name", "Unknown"),
@@ -164,35 +197,58 @@ def map_algolia_hit_to_job(hit: Dict) -> Dict:
         "source": "algolia_stationf",
         "scraped_at": datetime.utcnow().isoformat(),
     }
+    job.update(materialize_match_columns(job))
+    return job
 
 
-def scrape_all_jobs(max_pages: int = 100, save_to_db: bool = True) -> List[Dict]:
+def fetch_pages(max_pages: int = 100, concurrency: int = ALGOLIA_CONCURRENCY) -> Iterator[Tuple[int, Dict]]:
+    """
+    Yield (page, Algolia response) in page order: page 0 first, then pages
+    1..nbPages-1 (capped by max_pages), `concurrency` requests at a time.
+    """
+    get_session(concurrency)
+    first = fetch_algolia_jobs(page=0)
+    yield 0, first
+    last_page = min(first.get("nbPages", 0), max_pages)
+    if concurrency <= 1:
+        for page in range(1, last_page):
+            yield page, fetch_algolia_jobs(page=page)
+        return
+    if last_page > 1:
+        with ThreadPoolExecutor(max_workers=min(concurrency, last_page - 1), thread_name_prefix="algolia") as pool:
+            # map() rend les réponses dans l'ordre des pages
+            yield from zip(range(1, last_page), pool.map(lambda page: fetch_algolia_jobs(page=page), range(1, last_page)))
+
+
+def scrape_all_jobs(max_pages: int = 100, save_to_db: bool = True, concurrency: int = ALGOLIA_CONCURRENCY) -> List[Dict]:
     """
     Scrape all tech jobs from Algolia API.
     
     Args:
         max_pages: Maximum pages to scrape (safety limit)
         save_to_db: Whether to upsert to Supabase
+        concurrency: Pages fetched in parallel after the first one (1 = sequential)
     
     Returns:
         List of all scraped jobs
     """
     all_jobs = []
-    page = 0
+    started = time.time()
     
     print("[>] Starting Algolia API Scrape...")
     print(f"   Endpoint: {ALGOLIA_ENDPOINT}")
     print(f"   Filter: Tech/Engineering/Data/Product")
+    print(f"   Concurrency: {concurrency}")
     print("-" * 50)
     
-    while page < max_pages:
-        print(f"[p] Fetching page {page + 1}...", end=" ")
+    for page, result in fetch_pages(max_pages, concurrency):
+        print(f"[p] Page {page + 1}...", end=" ")
         
-        result = fetch_algolia_jobs(page=page)
         hits = result.get("hits", [])
         total_hits = result.get("nbHits", 0)
         total_pages = result.get("nbPages", 0)
         
+        # Page vide (fin des résultats ou erreur) : on s'arrête là, comme en séquentiel
         if not hits:
             print("No more results.")
             break
@@ -214,15 +270,13 @@ def scrape_all_jobs(max_pages: int = 100, save_to_db: bool = True) -> List[Dict]
                 except Exception as e:
                     print(f"   [!] DB upsert error: {e}")
         
-        page += 1
-        
         # Check if we've reached the last page
-        if page >= total_pages:
+        if page + 1 >= total_pages:
             print("[OK] Reached last page.")
             break
     
     print("-" * 50)
-    print(f"[OK] Scraping complete! Total jobs: {len(all_jobs)}")
+    print(f"[OK] Scraping complete! Total jobs: {len(all_jobs)} in {time.time() - started:.1f}s")
     
     # Export to JSON if no DB save
     if not save_to_db or not supabase:
@@ -279,10 +333,11 @@ if __name__ == "__main__":
     parser.add_argument("--limit", type=int, default=5, help="Number of jobs to preview")
     parser.add_argument("--max-pages", type=int, default=100, help="Max pages to scrape")
     parser.add_argument("--no-save", action="store_true", help="Don't save to database")
+    parser.add_argument("--concurrency", type=int, default=ALGOLIA_CONCURRENCY, help="Pages fetched in parallel (1 = sequential)")
     
     args = parser.parse_args()
     
     if args.preview:
         preview_jobs(limit=args.limit)
     else:
-        scrape_all_jobs(max_pages=args.max_pages, save_to_db=not args.no_save)
+        scrape_all_jobs(max_pages=args.max_pages, save_to_db=not args.no_save, concurrency=args.concurrency)
@@ -5,23 +5,22 @@ import os
 import sys
 import io
 import json
-import re
+import time
 import asyncio
-from typing import Dict, List, Optional, Literal
+import hashlib
+import itertools
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Literal
+
+# Démarrage à froid mesuré depuis ici (cf. mark_startup)
+IMPORT_STARTED = time.perf_counter()
 
 # Force UTF-8 logs on Windows consoles
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, ValidationError
-from supabase import create_client, Client
-import google.generativeai as genai
-from browser_use import Agent, ChatGoogle, Controller
-from job_service import JobService
-from find_contact import find_contact
 
 # ============================================================
 # ENV LOADING
@@ -30,10 +29,109 @@ from find_contact import find_contact
 script_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(script_dir)  # Parent directory (jobtinder root)
 
-# Load environment variables
+# Load environment variables (before the local modules: they read their config at import)
 load_dotenv(os.path.join(script_dir, ".env"))       # browser-use/.env
 load_dotenv(os.path.join(root_dir, ".env.local"))   # root .env.local (Next.js style)
 
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, Field, ValidationError
+from job_catalog import DeltaOverlap, JobCatalog
+import blocking_io
+from blocking_io import run_blocking
+from catalog_file import private_state_dir
+from company_index import build_company_index
+from fast_json import ORJSON_AVAILABLE, FastJSONResponse, dumps as fast_dumps
+from keyword_index import build_keyword_index
+from matching import (
+    MATCH_FEATURES_VERSION,
+    MATCH_SOURCE_COLUMNS,
+    MatchQuery,
+    SearchPreferences,
+    UserProfile,
+    build_job_features,
+    compact_job_row,
+    evaluate_catalog,
+    materialize_match_columns,
+    match_confidence,
+    rank_catalog,
+    rank_rows,
+    score_job,
+)
+from match_cache import MatchCache, match_cache_key
+from metrics import (
+    METRICS_CONTENT_TYPE,
+    STARTUP_SECONDS,
+    MetricsMiddleware,
+    observe_bytes,
+    observe_count,
+    render_metrics,
+    stage,
+    timed,
+)
+from match_pages import (
+    COMPANY_PAGE_SIZE,
+    MATCH_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    RankedResult,
+    ResultPages,
+    decode_cursor,
+    next_cursor,
+)
+from parallel_scoring import ParallelScorer
+from refresh_scheduler import (
+    REFRESH_CATALOG_SECONDS,
+    REFRESH_SCHEDULER,
+    RefreshScheduler,
+    add_stationf_tasks,
+    supabase_run_recorder,
+)
+
+# Imports lourds (browser_use, google.generativeai, duckduckgo_search, dns, bs4, supabase) :
+# chargés au premier usage (cf. load_gemini, load_job_service...), pas à l'import du serveur
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Moteur NumPy (optionnel) : mêmes scores, calculés pour tout le catalogue en quelques opérations
+try:
+    from vector_scoring import (
+        build_vector_index,
+        evaluate_catalog_vectorized,
+        rank_catalog_vectorized,
+        rank_catalog_vectorized_batch,
+    )
+except ImportError:
+    print("[!] numpy not installed. Using the pure-Python matching engine.")
+    build_vector_index = None
+
+# "vector" (NumPy) ou "python"
+MATCH_ENGINE = os.getenv("MATCH_ENGINE", "vector" if build_vector_index else "python")
+
+# Sérialisation des réponses /match, /match-by-company, /enrich : "orjson" (si installé) ou "stdlib"
+JSON_RENDERER = os.getenv("JSON_RENDERER", "orjson" if ORJSON_AVAILABLE else "stdlib")
+if JSON_RENDERER == "orjson" and not ORJSON_AVAILABLE:
+    print("[!] orjson not installed. Using the stdlib JSON renderer.")
+    JSON_RENDERER = "stdlib"
+
+# Nombre max de profils par appel à /match/batch
+MATCH_BATCH_MAX_PROFILES = int(os.getenv("MATCH_BATCH_MAX_PROFILES", "100"))
+
+# Synchro du catalogue par delta : on relit aussi les N dernières secondes avant le
+# watermark (updated_at = début de transaction, une écriture lente peut arriver "en retard")
+CATALOG_DELTA_OVERLAP_SECONDS = int(os.getenv("CATALOG_DELTA_OVERLAP_SECONDS", "60"))
+
+# Snapshot local du catalogue featurisé : un worker redémarré sert tout de suite puis rattrape par delta ("" = désactivé).
+# Par défaut dans un dossier privé (0700) de l'utilisateur : le fichier est relu avec pickle
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH")
+if CATALOG_SNAPSHOT_PATH is None:
+    try:
+        CATALOG_SNAPSHOT_PATH = os.path.join(private_state_dir(), "catalog.snapshot")
+    except OSError as e:
+        print(f"[!] No private directory for the catalog snapshot ({e}). Snapshot disabled.")
+        CATALOG_SNAPSHOT_PATH = ""
+
 # API Keys
 api_key = os.getenv("GOOGLE_API_KEY")
 if not api_key:
@@ -47,23 +145,75 @@ supabase_service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 if not supabase_url or not supabase_key:
     raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
 
+# Clients created by the startup hook (create_supabase_clients)
 # Public client (RLS applied)
-supabase: Client = create_client(supabase_url, supabase_key)
+supabase: Optional["Client"] = None
 
 # Admin client (Bypass RLS) - Use ONLY for background tasks
-supabase_admin: Optional[Client] = None
-if supabase_service_key:
-    supabase_admin = create_client(supabase_url, supabase_service_key)
-    print("✅ Supabase Admin Client initialized (Service Role)")
-else:
-    print("⚠️ Supabase Admin Client NOT initialized (Missing SERVICE_ROLE_KEY)")
+supabase_admin: Optional["Client"] = None
+
+
+def create_supabase_clients():
+    """Public + admin Supabase clients (the supabase import alone takes ~0.5s)."""
+    global supabase, supabase_admin
+    from supabase import create_client
+
+    if supabase is None:
+        supabase = create_client(supabase_url, supabase_key)
+    if supabase_admin is None:
+        if supabase_service_key:
+            supabase_admin = create_client(supabase_url, supabase_service_key)
+            print("✅ Supabase Admin Client initialized (Service Role)")
+        else:
+            print("⚠️ Supabase Admin Client NOT initialized (Missing SERVICE_ROLE_KEY)")
+
+
+@lru_cache(maxsize=None)
+def load_gemini():
+    """google.generativeai configured for enrichment (imported on first use, ~1.5s)."""
+    import google.generativeai as genai
+
+    if api_key:
+        genai.configure(api_key=api_key)
+    return genai
+
+
+@lru_cache(maxsize=None)
+def load_job_service():
+    """JobService for company analysis and skill extraction (Gemini + BeautifulSoup, first use only)."""
+    from job_service import JobService
+
+    return JobService(api_key=api_key) if api_key else None
+
 
-# Configure Gemini API for enrichment
-if api_key:
-    genai.configure(api_key=api_key)
+@lru_cache(maxsize=None)
+def load_browser_use():
+    """browser_use module (Station F scraping agent; first use only)."""
+    import browser_use
 
-# Initialize JobService for company analysis and skill extraction
-job_service = JobService(api_key=api_key) if api_key else None
+    return browser_use
+
+
+@lru_cache(maxsize=None)
+def load_find_contact():
+    """find_contact pipeline (DuckDuckGo + dnspython; first use only)."""
+    from find_contact import find_contact
+
+    return find_contact
+
+
+# Démarrage à froid : import du module -> hook de startup -> premier /match servi
+startup_timings: Dict[str, float] = {}
+
+
+def mark_startup(phase: str):
+    """Record (once) the time from the start of the api_server import to `phase`."""
+    if phase in startup_timings:
+        return
+    elapsed = time.perf_counter() - IMPORT_STARTED
+    startup_timings[phase] = round(elapsed, 3)
+    STARTUP_SECONDS.observe(elapsed, phase=phase)
+    print(f"[startup] {phase}: {elapsed:.2f}s")
 
 # ============================================================
 # FASTAPI APP SETUP
@@ -83,91 +233,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Durées par étape + latences des services externes -> GET /metrics (cf. metrics.py)
+app.add_middleware(MetricsMiddleware)
+
 # Health Check
 @app.get("/")
 async def root():
     return {"status": "healthy", "service": "JobTinder API", "version": "2.0.0"}
-# ============================================================
-# 1. MATCHING CONSTANTS (Le Dictionnaire du Recruteur)
-# ============================================================
-# On définit ici les règles du jeu pour le matching.
-
-# Poids des critères pour le score final (Total = 100)
-MATCH_WEIGHTS = {
-    "skill_overlap": 65,  # Les compétences techniques comptent le plus
-    "objective_fit": 30,  # Est-ce que c'est le bon poste visé ?
-    "hiring_signal": 5,   # Bonus si mots clés "junior", "alternance"...
-}
-
-# Synonymes pour normaliser les compétences (Ex: "js" devient "javascript")
-# Ça évite de rater un match juste à cause d'une abréviation.
-SKILL_SYNONYMS: Dict[str, str] = {
-    "js": "javascript",
-    "node": "nodejs",
-    "node.js": "nodejs",
-    "react.js": "react",
-    "next": "nextjs",
-    "next.js": "nextjs",
-    "py": "python",
-    "postgres": "postgresql",
-}
-
-# Si le job mentionne "Frontend", on suppose qu'il faut ces skills :
-ROLE_TO_SKILLS: Dict[str, List[str]] = {
-    "frontend": ["react", "javascript", "typescript", "html", "css"],
-    "backend": ["nodejs", "python", "fastapi", "django", "express", "sql"],
-    "data science": ["python", "sql", "machine learning"],
-    "ml": ["python", "machine learning", "ml", "ai"],  # Ajouté pour ML/AI
-}
-
-# Mots-clés pour deviner le rôle si ce n'est pas explicite
-ROLE_KEYWORDS: Dict[str, List[str]] = {
-    "frontend": ["frontend", "react", "vue", "angular", "nextjs", "javascript", "typescript"],
-    "backend": ["backend", "api", "fastapi", "django", "nodejs", "express", "python", "java", "spring"],
-    "fullstack": ["full stack", "fullstack", "frontend", "backend"],
-    "data": ["data", "data engineer", "data analyst", "sql", "etl", "warehouse"],
-    "ml_ai": ["ml", "machine learning", "ai", "ia", "intelligence artificielle", "deep learning", "nlp", "genai", "gen ai", "llm", "rag", "gpt"],
-    "devops": ["devops", "sre", "docker", "kubernetes", "ci/cd", "cloud", "aws", "gcp", "azure"],
-    "security": ["security", "cyber", "pentest", "soc", "siem"],
-}
-
-# Rôles explicites (quand l'utilisateur sélectionne "Je veux des jobs AI")
-# Plus strict que ROLE_KEYWORDS - utilisé pour le filtre d'intention
-PREFERENCE_ROLES: Dict[str, List[str]] = {
-    "ai_engineer": ["ai", "ia", "intelligence artificielle", "genai", "llm", "rag", "embedding", "fine-tuning", "nlp"],
-    "ml_engineer": ["machine learning", "ml", "deep learning", "model", "training", "inference", "pipeline"],
-    "backend": ["backend", "api", "fastapi", "django", "express", "microservices"],
-    "frontend": ["frontend", "react", "nextjs", "vue", "angular", "typescript"],
-    "data_engineer": ["data engineer", "etl", "pipeline", "warehouse", "spark", "airflow", "dbt"],
-}
-
 # ============================================================
 # 2. PYDANTIC MODELS (Le Contrat d'Interface)
 # ============================================================
 # C'est ici qu'on définit la forme EXACTE des données.
 # Pydantic va rejeter tout ce qui ne correspond pas (Validation automatique).
 
-
-
-# Ce que le Frontend nous envoie pour définir l'utilisateur
-class UserProfile(BaseModel):
-    skills: List[str] = Field(default_factory=list) # Ex: ["Python", "React"]
-    objectif: str = ""  # Ex: "Je cherche une alternance Backend"
-
-# Les préférences de recherche (Filtres)
-class SearchPreferences(BaseModel):
-    target_roles: List[str] = Field(default_factory=list)  # Ex: ["backend", "ai_engineer"]
-    exclude_keywords: List[str] = Field(default_factory=list)  # Mots à éviter
-    must_have_keywords: List[str] = Field(default_factory=list)  # Mots obligatoires
-    contract_types: List[str] = Field(default_factory=list)  # Ex: ["alternance", "CDI"]
-    strict_intent: bool = False  # Si True, exclut les jobs sans match d'intention
-    enriched_only: bool = False  # Si True, exclut les jobs sans description
-    min_score: int = 0 
+# UserProfile (le profil) et SearchPreferences (les filtres) vivent dans matching.py
 
 # La requête complète envoyée par le site web au serveur
 class MatchRequest(BaseModel):
     user_profile: UserProfile
     preferences: Optional[SearchPreferences] = None
+    cursor: Optional[str] = None  # "next_cursor" de la réponse précédente -> page suivante
+    page_size: Optional[int] = Field(None, ge=1, le=MAX_PAGE_SIZE)  # Défaut: MATCH_PAGE_SIZE / COMPANY_PAGE_SIZE
 
 # La réponse que le serveur renvoie au site web
 class MatchResponse(BaseModel):
@@ -177,6 +263,17 @@ class MatchResponse(BaseModel):
     filtered: int = 0  # Combien de jobs ont été exclus par les filtres (debug)
     message: str = ""  # Message de statut
     matches: List[dict] = Field(default_factory=list)  # La liste des jobs triés
+    stats: dict = Field(default_factory=dict)  # Compteurs du scorer (scorés / élagués par le top-K)
+    next_cursor: Optional[str] = None  # Page suivante (cf. MatchRequest.cursor)
+
+# Plusieurs profils scorés en une passe (digest nocturne, comparaison de candidats)
+class BatchMatchRequest(BaseModel):
+    requests: List[MatchRequest] = Field(..., min_length=1, max_length=MATCH_BATCH_MAX_PROFILES)
+
+class BatchMatchResponse(BaseModel):
+    success: bool
+    total_jobs: int
+    results: List[MatchResponse] = Field(default_factory=list)  # Même ordre que les requêtes
 
 # Pour le scraping
 class ScrapeResponse(BaseModel):
@@ -189,16 +286,18 @@ class ScrapeResponse(BaseModel):
 # HELPERS
 # ============================================================
 
-def fetch_all_jobs(sb_client, batch_size=1000, require_desc=False):
+def fetch_all_jobs(sb_client, batch_size=1000, require_desc=False, columns="*", active_only=False):
     """Fetch ALL jobs from Supabase using pagination to bypass 1000-row limit."""
     all_jobs = []
     offset = 0
     while True:
-        q = sb_client.table("jobs").select("*")
+        q = sb_client.table("jobs").select(columns)
         if require_desc:
             q = q.not_.is_("job_description", "null")
+        if active_only:
+            q = q.not_.is_("is_active", "false")  # NULL = actif
 
-        r = q.range(offset, offset + batch_size - 1).execute()
+        r = timed("supabase", "jobs.select", q.range(offset, offset + batch_size - 1).execute)()
         batch = r.data or []
         all_jobs.extend(batch)
         if len(batch) < batch_size:
@@ -206,297 +305,585 @@ def fetch_all_jobs(sb_client, batch_size=1000, require_desc=False):
         offset += batch_size
     return all_jobs
 
-def normalize_skill(skill: str) -> str:
-    """Normalize a skill string for consistent matching."""
-    if not skill or not skill.strip():
-        return ""
-    normalized = skill.lower().strip()
-    return SKILL_SYNONYMS.get(normalized, normalized)
-
-
-def as_list(x):
-    """Safely convert stack to list (handles string, list, None)."""
-    if x is None:
-        return []
-    if isinstance(x, list):
-        return x
-    if isinstance(x, str):
-        s = x.strip()
-        # try json list
-        if s.startswith("[") and s.endswith("]"):
-            try:
-                return json.loads(s)
-            except:
-                pass
-        # fallback comma split
-        return [p.strip() for p in s.split(",") if p.strip()]
-    return []
-
 
-def contains_kw(text: str, kw: str) -> bool:
+# Projection "légère" du catalogue : seulement les colonnes du matching et des cartes.
+# job_description ne sert qu'à construire le blob (match_text) et n'est pas gardée en mémoire.
+MATCH_COLUMNS = ",".join([
+    "id", "external_id", "title", "company_name", "company_slug", "logo_url", "location",
+    "published_at", "contract_type", "apply_url", "suggested_outreach_roles",
+    # Features précalculées à l'ingestion (migrations/add_match_feature_columns.sql)
+    "match_text", "has_description", "match_skills", "role_keyword_hits", "is_senior",
+    "hiring_score", "match_features_version",
+])
+# Sources des features, pour les lignes dont les colonnes précalculées manquent ou sont périmées
+MATCH_SOURCE_SELECT = ",".join(["id", *MATCH_SOURCE_COLUMNS])
+# Projection tant que la migration n'est pas appliquée : la description est repliée dans match_text
+LEGACY_MATCH_COLUMNS = ",".join([
+    "id", "external_id", "title", "company_name", "company_slug", "logo_url", "location",
+    "published_at", "contract_type", "apply_url", "sector", "stack", "skills_extracted",
+    "suggested_outreach_roles", "job_description",
+])
+# Champs lourds chargés seulement pour les jobs renvoyés (top-K)
+DETAIL_COLUMNS = "external_id,enrichment_json"
+DETAIL_BATCH_SIZE = 200  # ids par requête (longueur d'URL du filtre in_)
+
+
+# Projection utilisée par le dernier chargement complet (les deltas utilisent la même)
+catalog_projection = {"columns": MATCH_COLUMNS}
+
+
+def load_match_catalog():
+    """Catalog rows for matching: lean projection with the features materialized at ingest time."""
+    with stage("fetch", endpoint="catalog"):
+        try:
+            jobs = fetch_all_jobs(supabase, columns=MATCH_COLUMNS, active_only=True)
+            catalog_projection["columns"] = MATCH_COLUMNS
+        except Exception as e:
+            print(f"[catalog] Materialized match columns unavailable ({e}), computing them from the descriptions")
+            jobs = fetch_all_jobs(supabase, columns=LEGACY_MATCH_COLUMNS, active_only=True)
+            catalog_projection["columns"] = LEGACY_MATCH_COLUMNS
+    observe_count("rows_fetched", len(jobs), endpoint="catalog")
+    return prepare_match_rows(jobs)
+
+
+def prepare_match_rows(jobs: List[dict]) -> List[dict]:
+    """Rows as fetched -> catalog rows (match features folded in, or computed when missing)."""
+    if catalog_projection["columns"] == LEGACY_MATCH_COLUMNS:
+        return [compact_job_row(j) for j in jobs]
+
+    # Jobs écrits sans les features (ou avec une ancienne version) : calculées ici en attendant le backfill
+    stale = [j for j in jobs if j.get("match_features_version") != MATCH_FEATURES_VERSION]
+    if stale:
+        sources = fetch_jobs_by("id", [j["id"] for j in stale], MATCH_SOURCE_SELECT)
+        for j in stale:
+            j.update(materialize_match_columns(sources.get(j["id"], j)))
+        print(f"[catalog] {len(stale)} jobs without up-to-date match features (run backfill_match_features.py)")
+    return jobs
+
+
+# Lignes déjà appliquées dans la fenêtre de recouvrement (relues à chaque delta) : sautées
+delta_overlap = DeltaOverlap(CATALOG_DELTA_OVERLAP_SECONDS)
+
+
+def latest_updated_at() -> str:
+    """High-water mark of the jobs table (JobCatalog.watermark). Fails without migrations/add_jobs_updated_at.sql."""
+    r = timed("supabase", "jobs.select", supabase.table("jobs").select("updated_at").order("updated_at", desc=True, nullsfirst=False).limit(1).execute)()
+    rows = r.data or []
+    return rows[0]["updated_at"] if rows and rows[0].get("updated_at") else "1970-01-01T00:00:00+00:00"
+
+
+def fetch_jobs_updated_since(since: str, batch_size: int = 1000):
     """
-    Check if keyword exists in text.
-    - Multi-word phrases: substring match (e.g., "machine learning" in text)
-    - Single words: word-boundary regex to avoid false positives
-      (e.g., "intern" should NOT match "internal")
+    Rows changed since the watermark (JobCatalog.delta_loader): (catalog rows, next watermark).
+    Paged on (updated_at, id). Inactive rows come back too: they are the tombstones.
     """
-    kw = kw.lower().strip()
-    if not kw:
-        return False
-    if " " in kw:
-        return kw in text
-    return re.search(rf"\b{re.escape(kw)}\b", text) is not None
-
-
-def infer_user_roles(objective: str) -> set:
-    """Infer role buckets from user objective text."""
-    if not objective:
-        return set()
-    txt = objective.lower()
-    matched_roles = set()
-    for role, keywords in ROLE_KEYWORDS.items():
-        if any(contains_kw(txt, kw) for kw in keywords):
-            matched_roles.add(role)
-    return matched_roles
+    start = delta_overlap.window_start(since)
+    columns = catalog_projection["columns"] + ",is_active,updated_at"
+    rows, last = [], None
+    with stage("delta_fetch", endpoint="catalog"):
+        while True:
+            q = supabase.table("jobs").select(columns).gte("updated_at", start)
+            if last is not None:
+                q = q.or_(f'updated_at.gt."{last[0]}",and(updated_at.eq."{last[0]}",id.gt."{last[1]}")')
+            batch = timed("supabase", "jobs.select", q.order("updated_at").order("id").limit(batch_size).execute)().data or []
+            rows.extend(batch)
+            if len(batch) < batch_size:
+                break
+            last = (batch[-1]["updated_at"], batch[-1]["id"])
+    observe_count("delta_rows_fetched", len(rows), endpoint="catalog")
+
+    fresh = delta_overlap.fresh(rows, start)
+    watermark = max([since] + [r["updated_at"] for r in rows], key=datetime.fromisoformat)
+    return prepare_match_rows(fresh), watermark
+
+
+def fetch_jobs_by(key: str, ids: List, columns: str) -> Dict:
+    """Selected columns of the given jobs, keyed by `key` (one query per DETAIL_BATCH_SIZE ids)."""
+    ids = [x for x in dict.fromkeys(ids) if x is not None]
+    rows = {}
+    for i in range(0, len(ids), DETAIL_BATCH_SIZE):
+        r = timed("supabase", "jobs.select", supabase.table("jobs").select(columns).in_(key, ids[i:i + DETAIL_BATCH_SIZE]).execute)()
+        for row in r.data or []:
+            rows[row[key]] = row
+    observe_count("rows_fetched", len(rows))
+    return rows
+
+
+def fetch_job_details(external_ids: List[str]) -> Dict[str, dict]:
+    """Heavy fields of the given jobs (JobCatalog.detail_loader)."""
+    return fetch_jobs_by("external_id", external_ids, DETAIL_COLUMNS)
+
+
+async def job_details(catalog, external_ids: List[str]) -> Dict[str, dict]:
+    """Heavy fields of the given jobs ({} if they cannot be loaded)."""
+    try:
+        with stage("details"):
+            return await run_blocking(job_catalog.details, catalog, external_ids)
+    except Exception as e:
+        # Les cartes restent utilisables sans le diagnostic IA
+        print(f"[catalog] Could not load job details: {e}")
+        return {}
 
-# ============================================================
-# 4. JOB MATCH ALGORITHM (Version Finale MVP)
-# ============================================================
 
-def compute_job_match_score(user_profile, job_data: dict, preferences: Optional[SearchPreferences] = None) -> Optional[dict]:
-    """
-    Calcule un score (0-100) pour un job.
-    Gère les Bonus (Alternance) et Malus (Senior).
-    """
-    
-    # --- 1. PRÉPARATION ---
-    job_title = job_data.get("title") or ""
-    job_desc = job_data.get("job_description") or ""
-    stack = as_list(job_data.get("stack"))
-    skills_extracted = as_list(job_data.get("skills_extracted"))
-    contract_type = job_data.get("contract_type") or ""
-    
-    # Le Blob pour tout scanner d'un coup
-    job_full_text = f"{job_title} {job_desc} {job_data.get('sector', '')} {' '.join(stack)} {' '.join(skills_extracted)}".lower()
-    contract_blob = f"{contract_type} {job_title}".lower()
+async def attach_details(catalog, matches: List[dict]) -> List[dict]:
+    """Fill in the heavy fields (enrichment_json) of the returned matches, in place."""
+    details = await job_details(catalog, [m["job_id"] for m in matches])
+    for m in matches:
+        row = details.get(m["job_id"])
+        if row is not None:
+            m["enrichment_json"] = row.get("enrichment_json")
+    return matches
 
-    # --- 2. FILTRES "KILL SWITCH" ---
-    
-    # A. Mots Exclus (Strict : Si je déteste, je jette)
-    if preferences:
-        for kw in preferences.exclude_keywords:
-            if contains_kw(job_full_text, kw.lower()):
-                return None 
-
-        # B. Must Have (Strict)
-        if preferences.must_have_keywords:
-            if not any(contains_kw(job_full_text, kw.lower()) for kw in preferences.must_have_keywords):
-                return None
-
-    # C. Filtre Contrat "Soft" (On ne jette plus, on note juste si c'est le bon)
-    is_target_contract = True
-    if preferences and preferences.contract_types:
-        if not any(contains_kw(contract_blob, ct.lower()) for ct in preferences.contract_types):
-            is_target_contract = False # Ce n'est pas le contrat idéal, on appliquera une pénalité plus tard
-
-    # D. Enriched Only (Jobs sans description = moins pertinents)
-    has_description = bool(job_desc.strip())
-    if preferences and preferences.enriched_only and not has_description:
-        return None  # Mode strict: on exclut les jobs sans description
-
-    # --- 3. CALCUL DES POINTS ---
-
-    # A. INTENT FIT (Max 60 pts)
-    intent_score = 0
-    matched_intent_keywords = []
-    
-    # BONUS: Direct title match with user objective (e.g., "GenAI Engineer" in both)
-    user_obj_lower = user_profile.objectif.lower()
-    job_title_lower = job_title.lower()
-    
-    # Extract key terms from user objective (2+ char words)
-    obj_terms = [w for w in re.split(r'\W+', user_obj_lower) if len(w) >= 2]
-    title_match_bonus = 0
-    for term in obj_terms:
-        if term in job_title_lower:
-            title_match_bonus += 15
-            if term not in matched_intent_keywords:
-                matched_intent_keywords.append(term)
-    title_match_bonus = min(40, title_match_bonus)  # Cap at 40 pts
-    
-    # On utilise ton objectif pour deviner les roles
-    user_roles = infer_user_roles(user_profile.objectif)
-    
-    # Si on a coché des rôles explicites dans les préférences, on utilise PREFERENCE_ROLES (plus strict)
-    if preferences and preferences.target_roles:
-        for role in preferences.target_roles:
-            # PREFERENCE_ROLES a des keywords plus spécifiques (llm, rag, embedding...)
-            keywords = PREFERENCE_ROLES.get(role, ROLE_KEYWORDS.get(role, []))
-            role_hits = 0
-            for kw in keywords:
-                if contains_kw(job_full_text, kw):
-                    role_hits += 10
-                    if kw not in matched_intent_keywords:
-                        matched_intent_keywords.append(kw)
-            intent_score += min(30, role_hits)
-    else:
-        # Fallback: on utilise ROLE_KEYWORDS (plus général)
-        for role in user_roles:
-            keywords = ROLE_KEYWORDS.get(role, [])
-            role_hits = 0
-            for kw in keywords:
-                if contains_kw(job_full_text, kw):
-                    role_hits += 10
-                    if kw not in matched_intent_keywords:
-                        matched_intent_keywords.append(kw)
-            intent_score += min(30, role_hits)
-    
-    intent_score = min(60, intent_score)
-    
-    # STRICT INTENT: Si activé et aucun match d'intention, on jette
-    if preferences and preferences.strict_intent and intent_score == 0:
-        return None
 
+# Catalogue des jobs gardé en mémoire (rechargé en arrière-plan, cf. job_catalog.py)
+catalog_indexers = {
+    "keywords": build_keyword_index,    # must_have / exclude -> set operations
+    "companies": build_company_index,   # /match-by-company : classement par entreprise
+}
+if MATCH_ENGINE == "vector":
+    catalog_indexers["vectors"] = build_vector_index    # matrices pour le scoring NumPy
+
+def catalog_snapshot_tag() -> str:
+    """Features version + digest of the code building the features / indexes (another tag = snapshot not restored)."""
+    digest = hashlib.sha1()
+    for name in ("matching.py", "keyword_matcher.py", "keyword_index.py", "company_index.py", "vector_scoring.py"):
+        with open(os.path.join(script_dir, name), "rb") as f:
+            digest.update(f.read())
+    return f"v{MATCH_FEATURES_VERSION}-{digest.hexdigest()[:12]}"
+
+
+job_catalog = JobCatalog(
+    loader=load_match_catalog,
+    featurize=build_job_features,
+    indexers=catalog_indexers,
+    detail_loader=fetch_job_details,
+    watermark=latest_updated_at,
+    delta_loader=fetch_jobs_updated_since,
+    row_of=lambda features: features.job,  # fiche compacte (CatalogJob) : les lignes chargées sont libérées
+    snapshot_path=CATALOG_SNAPSHOT_PATH or None,
+    snapshot_tag=catalog_snapshot_tag(),
+)
 
-    # B. SKILL FIT (Max 30 pts)
-    user_skills_clean = {normalize_skill(s) for s in user_profile.skills}
-    
-    # Expansion des tags (Frontend -> React, JS...)
-    all_job_skills = set(stack) | set(skills_extracted)
-    for tag in stack:
-        if tag and tag.lower() in ROLE_TO_SKILLS:
-            all_job_skills.update(ROLE_TO_SKILLS[tag.lower()])
-            
-    job_skills_clean = {normalize_skill(s) for s in all_job_skills if s}
-    
-    # Intersection
-    matched_skills = user_skills_clean & job_skills_clean
-    overlap_count = len(matched_skills)
-    
-    skill_score = 0
-    if overlap_count > 0:
-        skill_score = min(30, 10 + overlap_count * 5)
+# Scoring multi-process pour les gros catalogues (moteur Python, MATCH_WORKERS > 1)
+parallel_scorer = ParallelScorer()
+if MATCH_ENGINE == "python" and parallel_scorer.enabled:
+    job_catalog.subscribe(parallel_scorer.publish)
 
+# Cache des réponses /match et /match-by-company (vidé à chaque rechargement du catalogue)
+match_cache = MatchCache()
+job_catalog.subscribe(match_cache.clear)
 
-    # C. HIRING SIGNAL & SENIOR PENALTY (Max 10 pts... ou Malus)
-    hiring_score = 5 # Base
-    
-    target_terms = ["alternance", "apprentissage", "contrat pro", "internship"] # Le Graal
-    junior_terms = ["junior", "stage", "intern", "entry level", "débutant"]      # Bien
-    senior_terms = ["senior", "lead", "principal", "staff", "manager", "head of", "director", "5+ years", "10 ans", "expert"] # Attention
 
-    is_senior = False
-    
-    # 1. Check Seniority (Le Piège)
-    if any(contains_kw(contract_blob, t) for t in senior_terms):
-        is_senior = True
-        hiring_score = 0 # On enlève les points "Hiring"
-    
-    # 2. Check Bonus (Le Graal)
-    elif any(contains_kw(contract_blob, t) for t in target_terms):
-        hiring_score = 20 # Super Bonus (dépasse le max théorique de 10, c'est fait exprès pour booster)
+# Rafraîchissement planifié (Algolia, descriptions, catalogue) dans le process de l'API (REFRESH_SCHEDULER=1).
+# Créé au démarrage seulement : son dossier d'état privé n'est pas requis quand il est désactivé
+refresh_scheduler: Optional[RefreshScheduler] = None
 
-    # 3. Check Junior
-    elif any(contains_kw(contract_blob, t) for t in junior_terms):
-        hiring_score = 10
 
+def sync_catalog() -> dict:
+    """Scheduled catalog task: delta sync (full reload when due); a follower worker asks the leader."""
+    if job_catalog.role == "follower":
+        job_catalog.request_refresh()
+        return {"forwarded_to_leader": True}
+    snap = job_catalog.sync()
+    return {"version": snap.version, "jobs": len(snap.jobs)}
 
-    # --- 4. SCORE FINAL & PENALTIES ---
-    total_score = intent_score + skill_score + hiring_score + title_match_bonus
-    
-    # Pénalité 1 : Ce n'est pas le contrat demandé (ex: CDI au lieu d'Alternance)
-    if not is_target_contract:
-        total_score = total_score * 0.7  # On garde 70% du score
 
-    # Pénalité 2 : C'est un poste Senior (ex: Lead Dev)
-    if is_senior:
-        total_score = total_score * 0.5  # Grosse pénalité
+def start_refresh_scheduler():
+    """Register the refresh tasks (writes with the admin client when available) and start them."""
+    global refresh_scheduler
+    try:
+        refresh_scheduler = RefreshScheduler()
+    except OSError as e:
+        print(f"[!] No private directory for the refresh state ({e}). Refresh scheduler disabled.")
+        return
+    client = supabase_admin if supabase_admin else supabase
+    refresh_scheduler.record = supabase_run_recorder(client)
+    # Les jobs ont changé : le catalogue se resynchronise sans attendre le TTL
+    add_stationf_tasks(refresh_scheduler, client, on_change=job_catalog.request_refresh)
+    # Un catalogue par process (hors mode partagé) : pas de verrou entre process
+    refresh_scheduler.add("catalog", sync_catalog, REFRESH_CATALOG_SECONDS, exclusive=False)
+    refresh_scheduler.start()
+
+
+async def catalog_snapshot():
+    """Current catalog snapshot; the cold-start load runs in the I/O pool, off the event loop."""
+    if job_catalog.loaded:
+        return job_catalog.snapshot()
+    with stage("catalog_load"):
+        return await run_blocking(job_catalog.snapshot)
+
+
+def render_json(payload: BaseModel) -> Response:
+    """
+    JSON response rendered once (same JSON FastAPI would send), so it can be cached.
+    Build the payload with Model.model_construct(...): the dicts it carries are
+    already final, validating them again is wasted work.
+    """
+    with stage("render"):
+        if JSON_RENDERER == "orjson":
+            response = FastJSONResponse(content=payload)
+        else:
+            response = JSONResponse(content=jsonable_encoder(payload))
+    observe_bytes(len(response.body))
+    return response
 
-    # Pénalité 3 : Pas de description (on sait moins si ça match vraiment)
-    if not has_description:
-        total_score = total_score * 0.8  # Légère pénalité
 
-    # On s'assure que ça reste propre entre 0 et 100
-    total_score = min(100, int(total_score))
+# Classements complets gardés côté serveur pour la pagination par curseur
+result_pages = ResultPages()
 
-    # Filtre Final (Min Score)
-    if preferences and total_score < preferences.min_score:
-        return None
 
-    # --- 5. RESULTAT ---
-    
-    # Confiance du match (pour l'affichage UI)
-    confidence = "low"
-    if total_score >= 80: confidence = "very high"
-    elif total_score >= 60: confidence = "high"
-    elif total_score >= 40: confidence = "medium"
+# Streaming opt-in : "Accept: application/x-ndjson" -> une ligne JSON par enregistrement
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_line(record: dict) -> bytes:
+    if JSON_RENDERER == "orjson":
+        return fast_dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
 
-    return {
-        "job_id": job_data.get("external_id"),
-        "title": job_title,
-        "company": job_data.get("company_name"),
-        "company_slug": job_data.get("company_slug"),      # NEW: For URL building
-        "logo_url": job_data.get("logo_url"),              # NEW: Company logo from Algolia
-        "location": job_data.get("location"),              # NEW: City, Country
-        "published_at": job_data.get("published_at"),      # NEW: Publication date
-        "contract_type": contract_type,
-        "score": total_score,
-        "details": {
-            "intent": intent_score, 
-            "skill": skill_score, 
-            "hiring_score": hiring_score,
-            "penalties": {
-                "senior_penalty": is_senior,
-                "wrong_contract": not is_target_contract,
-                "no_description": not has_description
-            }
-        },
-        "matched_skills": list(matched_skills),
-        "matched_intent": matched_intent_keywords[:5],
-        "url": job_data.get("apply_url"),
-        "match_confidence": confidence,
-        # AI enrichment fields
-        "suggested_outreach_roles": job_data.get("suggested_outreach_roles", []),
-        "enrichment_json": job_data.get("enrichment_json", {})
-    }
+
+def stream_match_records(header: dict, matches: List[dict], cache_key: Optional[str] = None, result: Optional[RankedResult] = None):
+    """
+    NDJSON body of /match: {"type": "header", totals...}, then one
+    {"type": "match", "rank": n, ...match} per job (best first), then {"type": "end"}.
+    Each line is serialized just before it is sent; the full body is cached at the end
+    (with the RankedResult behind its next_cursor, cf. cached_page).
+    """
+    lines = []
+    size = 0
+    try:
+        for record in itertools.chain(
+            [{"type": "header", **header}],
+            ({"type": "match", "rank": rank, **match} for rank, match in enumerate(matches, 1)),
+            [{"type": "end", "count": len(matches)}],
+        ):
+            line = ndjson_line(record)
+            lines.append(line)
+            size += len(line)
+            yield line
+    except Exception as e:
+        # Headers are already sent: report the error in-band
+        yield ndjson_line({"type": "error", "detail": str(e)})
+        return
+    observe_bytes(size, endpoint="/match")
+    if cache_key:
+        match_cache.put(cache_key, (b"".join(lines), result))
+
+
+def cached_page(cache_key: str) -> Optional[bytes]:
+    """
+    Body of a cached /match or /match-by-company page. The cache entry holds the
+    RankedResult of its next_cursor: it is put back in result_pages, so the
+    cursor of a cached page stays valid as long as the page is served.
+    """
+    cached = match_cache.get(cache_key)
+    if cached is None:
+        return None
+    body, result = cached
+    if result is not None:
+        result_pages.keep(result)
+    observe_bytes(len(body))
+    return body
+
+
+async def rank_matches(catalog, query: MatchQuery, limit: Optional[int] = None):
+    """Ranked matches for one query, with the configured engine."""
+    if limit and parallel_scorer.accepts(catalog):
+        try:
+            return await parallel_scorer.rank(catalog, query, limit)
+        except Exception as e:
+            print(f"[parallel] Scoring failed, falling back to in-process: {e}")
+    if "vectors" in catalog.indexes:
+        return rank_catalog_vectorized(query, catalog.features, catalog.indexes["vectors"], catalog.indexes["keywords"], limit)
+    return rank_catalog(query, catalog.features, catalog.indexes.get("keywords"), limit)
+
+
+async def rank_matches_batch(catalog, queries: List[MatchQuery], limit: int):
+    """rank_matches for many queries on the same snapshot (one matrix pass with the vector engine)."""
+    if "vectors" in catalog.indexes:
+        return rank_catalog_vectorized_batch(queries, catalog.features, catalog.indexes["vectors"], catalog.indexes["keywords"], limit)
+    return [await rank_matches(catalog, query, limit) for query in queries]
+
+
+async def evaluate_matches(catalog, query: MatchQuery):
+    """Scores of every matching job (ScoredJobs, catalog order), with the configured engine."""
+    if parallel_scorer.accepts(catalog):
+        try:
+            return await parallel_scorer.evaluate(catalog, query)
+        except Exception as e:
+            print(f"[parallel] Scoring failed, falling back to in-process: {e}")
+    if "vectors" in catalog.indexes:
+        return evaluate_catalog_vectorized(query, catalog.features, catalog.indexes["vectors"], catalog.indexes["keywords"])
+    return evaluate_catalog(query, catalog.features, catalog.indexes.get("keywords"))
+
+
+def observe_ranking(ranking):
+    """Per-request counters of a MatchRanking (jobs scored / pruned / filtered / returned)."""
+    observe_count("scored", ranking.stats.get("scored", 0))
+    observe_count("pruned", ranking.stats.get("pruned", 0))
+    observe_count("matched", ranking.matched)
+    observe_count("filtered", ranking.filtered)
+    observe_count("returned", len(ranking.matches))
+
+
+@app.on_event("startup")
+async def start_job_catalog():
+    mark_startup("import")
+    await run_blocking(create_supabase_clients)
+    await run_blocking(job_catalog.start)  # restaure CATALOG_SNAPSHOT_PATH avant de servir
+    if REFRESH_SCHEDULER:
+        start_refresh_scheduler()
+    mark_startup("startup")
+
+
+@app.on_event("shutdown")
+async def stop_job_catalog():
+    if refresh_scheduler is not None:
+        refresh_scheduler.stop()
+    job_catalog.stop()
+    parallel_scorer.shutdown()
+    blocking_io.shutdown()
 
 
 # ============================================================
 # MATCH ENDPOINT
 # ============================================================
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: stage durations, per-request counts, outbound latencies."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once a catalog snapshot can be served (from Supabase or
+    restored from CATALOG_SNAPSHOT_PATH), 503 before. Reports the snapshot age
+    and the sync state ("restored" = served from disk, delta sync catching up;
+    "following" = worker serving the generations written by the leader worker).
+    """
+    stats = job_catalog.stats()
+    body = {
+        "ready": stats["loaded"],
+        "sync_state": stats["sync_state"],
+        "role": stats["role"],
+        "snapshot_age_seconds": stats["age_seconds"],
+        "version": stats["version"],
+        "jobs": stats["jobs"],
+        "watermark": stats["watermark"],
+        "last_error": stats["last_error"],
+    }
+    return JSONResponse(content=body, status_code=200 if stats["loaded"] else 503)
+
+
+@app.get("/refresh/runs")
+async def refresh_runs():
+    """Refresh scheduler: tasks (interval, next run, last run) and run history, newest first."""
+    if refresh_scheduler is None:
+        return {"enabled": False, "tasks": {}, "runs": []}
+    return {"enabled": True, **refresh_scheduler.stats()}
+
+
+@app.get("/match/stats")
+async def match_stats():
+    """Catalog state + result cache hit/miss counters (debug / monitoring)."""
+    return {
+        "catalog": job_catalog.stats(),
+        "cache": match_cache.stats(),
+        "cursors": result_pages.stats(),
+        "startup_seconds": startup_timings,
+    }
+
+
 @app.post("/match", response_model=MatchResponse)
-async def match_jobs(req: MatchRequest):
+async def match_jobs(req: MatchRequest, request: Request):
+    """
+    Ranked matches, MATCH_PAGE_SIZE (200) per page. When there are more,
+    `next_cursor` fetches the next page without rescoring (cf. match_pages.py).
+    With "Accept: application/x-ndjson" the response is streamed: a header
+    record with the totals, then the matches one per line.
+    """
     try:
+        streaming = wants_ndjson(request)
+
+        # Page suivante : on découpe le classement gardé côté serveur
+        if req.cursor:
+            result, rows, cursor = await load_page(req.cursor, "jobs")
+            header = {**result.totals, "message": "Matching computed successfully.", "next_cursor": cursor}
+            with stage("results"):
+                matches = result.scored.results(rows)
+            return render_match_page(header, await attach_details(result.snapshot, matches), streaming)
+
         user_profile = req.user_profile
         prefs = req.preferences or SearchPreferences()
+        page_size = req.page_size or MATCH_PAGE_SIZE
+
+        # Jobs served from the in-memory catalog (no Supabase round trip)
+        catalog = await catalog_snapshot()
+
+        # Same profile + preferences on the same catalog -> cached response
+        endpoint = f"/match:{page_size}" + (":ndjson" if streaming else "")
+        cache_key = match_cache_key(endpoint, user_profile, prefs, catalog.version)
+        cached = cached_page(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type=NDJSON_MEDIA_TYPE if streaming else "application/json")
+
+        with stage("query"):
+            query = MatchQuery(user_profile, prefs)
+
+        total = len(catalog.jobs)
+        with stage("score"):
+            ranking = await rank_matches(catalog, query, limit=page_size)  # keep UI manageable (top-K, cf. matching.top_k_catalog)
+        observe_ranking(ranking)
+
+        totals = {"success": True, "total_jobs": total, "matched": ranking.matched, "filtered": ranking.filtered}
+        result = cursor = None
+        if ranking.matched > len(ranking.matches):
+            result = RankedResult("jobs", catalog, query, totals, request=cursor_request(user_profile, prefs))
+            result_pages.create(result)
+            cursor = next_cursor(result, 0, page_size, ranking.matched)
+
+        header = {**totals, "message": "Matching computed successfully.", "stats": ranking.stats, "next_cursor": cursor}
+        return render_match_page(header, await attach_details(catalog, ranking.matches), streaming, cache_key, result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Fetch all jobs using pagination helper
-        jobs = fetch_all_jobs(supabase)
 
-        total = len(jobs)
-        matches = []
-        filtered = 0
+@app.post("/match/batch", response_model=BatchMatchResponse)
+async def match_jobs_batch(req: BatchMatchRequest):
+    """
+    /match for many profiles at once: one catalog snapshot, every profile scored
+    in one pass, first page (top page_size) of each. `next_cursor` pages
+    continue through /match. Results are in the order of `requests`.
+    """
+    try:
+        if any(r.cursor for r in req.requests):
+            raise HTTPException(status_code=400, detail="Cursors are not accepted by /match/batch, use /match")
+
+        catalog = await catalog_snapshot()
+        with stage("query"):
+            queries = [MatchQuery(r.user_profile, r.preferences or SearchPreferences()) for r in req.requests]
+        observe_count("profiles", len(queries))
+
+        # Profils groupés par taille de page : une passe de scoring par groupe
+        by_size: Dict[int, List[int]] = {}
+        for i, r in enumerate(req.requests):
+            by_size.setdefault(r.page_size or MATCH_PAGE_SIZE, []).append(i)
+        rankings = [None] * len(queries)
+        with stage("score"):
+            for page_size, indices in by_size.items():
+                group = await rank_matches_batch(catalog, [queries[i] for i in indices], page_size)
+                for i, ranking in zip(indices, group):
+                    rankings[i] = ranking
+        for ranking in rankings:
+            observe_ranking(ranking)
+
+        # Champs lourds de tous les jobs renvoyés : un seul chargement
+        await attach_details(catalog, [m for ranking in rankings for m in ranking.matches])
+
+        total = len(catalog.jobs)
+        results = []
+        for query, request, ranking in zip(queries, req.requests, rankings):
+            totals = {"success": True, "total_jobs": total, "matched": ranking.matched, "filtered": ranking.filtered}
+            cursor = None
+            if ranking.matched > len(ranking.matches):
+                result = RankedResult("jobs", catalog, query, totals, request=cursor_request(request.user_profile, request.preferences))
+                result_pages.create(result)
+                cursor = next_cursor(result, 0, request.page_size or MATCH_PAGE_SIZE, ranking.matched)
+            results.append(MatchResponse.model_construct(
+                **totals, message="Matching computed successfully.", matches=ranking.matches,
+                stats=ranking.stats, next_cursor=cursor,
+            ))
+
+        return render_json(BatchMatchResponse.model_construct(success=True, total_jobs=total, results=results))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        for j in jobs:
-            r = compute_job_match_score(user_profile, j, prefs)
-            if r is None:
-                filtered += 1
-                continue
-            matches.append(r)
 
-        matches.sort(key=lambda x: x["score"], reverse=True)
+def render_match_page(
+    header: dict, matches: List[dict], streaming: bool,
+    cache_key: Optional[str] = None, result: Optional[RankedResult] = None,
+) -> Response:
+    """MatchResponse (JSON) or NDJSON stream of one page; cached (with result, the RankedResult of its cursor) when cache_key is given."""
+    mark_startup("first_match")
+    if streaming:
+        return StreamingResponse(stream_match_records(header, matches, cache_key, result), media_type=NDJSON_MEDIA_TYPE)
+    response = render_json(MatchResponse.model_construct(**header, matches=matches))
+    if cache_key:
+        match_cache.put(cache_key, (response.body, result))
+    return response
+
+
+def cursor_request(user_profile: UserProfile, prefs: Optional[SearchPreferences]) -> dict:
+    """Request carried by the cursors of a result (JSON): any worker can rank it again."""
+    return {
+        "user_profile": user_profile.model_dump(),
+        "preferences": (prefs or SearchPreferences()).model_dump(),
+    }
+
+
+async def rerank_cursor(kind: str, request: Optional[dict]) -> RankedResult:
+    """RankedResult for a cursor this worker does not hold: its request ranked on the current catalog, under a new id."""
+    if request is None:
+        raise HTTPException(status_code=410, detail="Cursor expired, request the first page again")
+    try:
+        user_profile = UserProfile.model_validate(request.get("user_profile"))
+        prefs = SearchPreferences.model_validate(request.get("preferences"))
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    catalog = await catalog_snapshot()
+    with stage("query"):
+        query = MatchQuery(user_profile, prefs)
+    with stage("score"):
+        scored = await evaluate_matches(catalog, query)
+    if kind == "jobs":
+        totals = {"success": True, "total_jobs": len(catalog.jobs), "matched": len(scored.positions), "filtered": scored.filtered}
+        result = RankedResult(kind, catalog, query, totals, scored, request=request)
+    else:
+        with stage("sort"):
+            order = catalog.indexes["companies"].rank(scored)
+        totals = {"success": True, "total_companies": len(order), "total_jobs": len(scored.positions)}
+        result = RankedResult(kind, catalog, query, totals, scored, request=request)
+        result.order = order
+    result_pages.create(result)  # pages suivantes (curseurs du nouvel id) servies par ce worker sans reclasser
+    return result
 
-        return MatchResponse(
-            success=True,
-            total_jobs=total,
-            matched=len(matches),
-            filtered=filtered,
-            message="Matching computed successfully.",
-            matches=matches[:200],  # keep UI manageable
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+async def load_page(cursor: str, kind: str):
+    """(RankedResult, page of its ranking, cursor of the next page) for a cursor."""
+    try:
+        result_id, offset, page_size, cursor_kind, request = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_kind != kind:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    result = result_pages.get(result_id)
+    if result is None or result.kind != kind:
+        # Curseur d'un autre worker (ou résultat expiré) : la requête qu'il porte est reclassée ici
+        result = await rerank_cursor(kind, request)
+
+    # Premier accès au-delà de la page 1 : on score tout une fois (sans dicts) et on classe
+    if result.order is None:
+        if result.scored is None:
+            with stage("score"):
+                result.scored = await evaluate_matches(result.snapshot, result.query)
+        with stage("sort"):
+            if kind == "jobs":
+                result.order = rank_rows(result.scored)
+            else:
+                result.order = result.snapshot.indexes["companies"].rank(result.scored)
+
+    page = result.order[offset:offset + page_size]
+    return result, page, next_cursor(result, offset, page_size, len(result.order))
 
 
 # ============================================================
@@ -508,6 +895,7 @@ class CompanyMatchResponse(BaseModel):
     total_companies: int
     total_jobs: int
     companies: List[dict] = Field(default_factory=list)
+    next_cursor: Optional[str] = None  # Page suivante (cf. MatchRequest.cursor)
 
 @app.post("/match-by-company", response_model=CompanyMatchResponse)
 async def match_jobs_by_company(req: MatchRequest):
@@ -515,105 +903,130 @@ async def match_jobs_by_company(req: MatchRequest):
     Same as /match, but groups results by company.
     Returns a structure that matches the frontend design:
     - Each company has: name, logo_url, location, score (avg), jobs[]
+    COMPANY_PAGE_SIZE (25) companies per page, `next_cursor` for the next ones.
     """
     try:
+        # Page suivante : on découpe le classement gardé côté serveur
+        if req.cursor:
+            result, page, cursor = await load_page(req.cursor, "companies")
+            companies = await company_cards(result.snapshot, result.scored, page)
+            return render_json(CompanyMatchResponse.model_construct(**result.totals, companies=companies, next_cursor=cursor))
+
         user_profile = req.user_profile
         prefs = req.preferences or SearchPreferences()
+        page_size = req.page_size or COMPANY_PAGE_SIZE
+
+        # Jobs served from the in-memory catalog (no Supabase round trip)
+        catalog = await catalog_snapshot()
+
+        cache_key = match_cache_key(f"/match-by-company:{page_size}", user_profile, prefs, catalog.version)
+        cached = cached_page(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+        with stage("query"):
+            query = MatchQuery(user_profile, prefs)
+
+        # Compute match scores, then build cards only for the jobs of the top companies
+        with stage("score"):
+            scored = await evaluate_matches(catalog, query)
+        observe_count("matched", len(scored.positions))
+        observe_count("filtered", scored.filtered)
+        with stage("sort"):
+            ranked, total_companies = catalog.indexes["companies"].top(scored, page_size)
+        companies_list = await company_cards(catalog, scored, ranked)
+
+        totals = {"success": True, "total_companies": total_companies, "total_jobs": len(scored.positions)}
+        result = cursor = None
+        if total_companies > page_size:
+            result = RankedResult("companies", catalog, query, totals, scored, request=cursor_request(user_profile, prefs))
+            result_pages.create(result)
+            cursor = next_cursor(result, 0, page_size, total_companies)
+
+        response = render_json(CompanyMatchResponse.model_construct(
+            **totals,
+            companies=companies_list[:page_size],  # Top 25 (optimized with Tier 1 and force: false)
+            next_cursor=cursor,
+        ))
+        match_cache.put(cache_key, (response.body, result))
+        return response
 
-        # Fetch all jobs using pagination helper
-        jobs = fetch_all_jobs(supabase)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Compute match scores
-        matches = []
-        for j in jobs:
-            r = compute_job_match_score(user_profile, j, prefs)
-            if r is not None:
-                matches.append(r)
 
+def company_job_card(query: MatchQuery, features, score: int) -> dict:
+    """One job of a company card."""
+    job = features.job
+    return {
+        "id": job.get("external_id"),
+        "title": job.get("title") or "",
+        "type": job.get("contract_type") or "",
+        "score": score,
+        "tag": "Offre Officielle",  # Default tag
+        "url": job.get("apply_url"),
+        "published_at": job.get("published_at"),
+        "location": job.get("location"),
+        "matched_skills": list(query.user_skills & features.skills),
+        "match_confidence": match_confidence(score),
+    }
 
-        # Group by company
-        companies_dict = {}
-        for match in matches:
-            company_name = match.get("company") or "Unknown"
-            
-            if company_name not in companies_dict:
-                companies_dict[company_name] = {
-                    "name": company_name,
-                    "slug": match.get("company_slug", ""),
-                    "logo_url": match.get("logo_url"),
-                    "location": match.get("location", ""),
-                    "jobs": [],
-                    "total_score": 0,
-                    "job_count": 0,
-                    "suggested_roles": match.get("suggested_outreach_roles", []),
-                    "enrichment_json": match.get("enrichment_json", {})
-                }
-            
-            # Add job to company
-            companies_dict[company_name]["jobs"].append({
-                "id": match.get("job_id"),
-                "title": match.get("title"),
-                "type": match.get("contract_type"),
-                "score": match.get("score"),
-                "tag": "Offre Officielle",  # Default tag
-                "url": match.get("url"),
-                "published_at": match.get("published_at"),
-                "location": match.get("location"),
-                "matched_skills": match.get("matched_skills", []),
-                "match_confidence": match.get("match_confidence")
-            })
-            companies_dict[company_name]["total_score"] += match.get("score", 0)
-            companies_dict[company_name]["job_count"] += 1
-
-        # Build final list with MAX scores (best job dictates company relevance)
-        companies_list = []
-        for company_data in companies_dict.values():
-            # Use MAX score instead of AVERAGE to highlight companies with at least one great fit
-            # If a company has 1 perfect job and 10 irrelevant ones, it IS a perfect match for that job.
-            avg_score = max((j["score"] for j in company_data["jobs"]), default=0)
-            
-            if "OVRSEA" in company_data["name"]:
-                print(f"DEBUG_COMPANY: {company_data['name']} has MAX SCORE: {avg_score}")
 
-            # Generate logo initials if no logo_url
-            logo = company_data["logo_url"]
-            if not logo:
-                logo = company_data["name"][:2].upper() if company_data["name"] else "??"
-            
+async def company_cards(catalog, scored, ranked: List[tuple]) -> List[dict]:
+    """
+    Company cards for (company slot, rows of `scored`) pairs, already ranked
+    (CompanyIndex.top / rank). Company info comes from the company index, the
+    location from the company's first matched job, the AI diagnostic from the
+    job carrying the company's enrichment.
+    """
+    companies = catalog.indexes["companies"]
+    features = scored.features
+
+    # Une ligne de détails (enrichment_json) par entreprise
+    enrichment_ids = []
+    for slot, rows in ranked:
+        pos = companies.enrichment_positions[slot]
+        if pos is None:
+            pos = scored.positions[rows[0]]
+        enrichment_ids.append(features[pos].job.get("external_id"))
+    details = await job_details(catalog, enrichment_ids)
+
+    with stage("group"):
+        cards = []
+        for (slot, rows), enrichment_id in zip(ranked, enrichment_ids):
+            jobs = [company_job_card(scored.query, features[scored.positions[r]], scored.scores[r][0]) for r in rows]
+            jobs.sort(key=lambda x: x["score"], reverse=True)
+            name = companies.names[slot]
+
             # Get AI suggestions if available
-            enrichment = company_data.get("enrichment_json") or {}
+            enrichment = (details.get(enrichment_id) or {}).get("enrichment_json") or {}
             suggestions = enrichment.get("suggestions", []) if isinstance(enrichment, dict) else []
             ai_match_reason = None
             if suggestions:
                 # Use first suggestion's rationale as matchReason
                 ai_match_reason = suggestions[0].get("rationale", "")
-            
-            companies_list.append({
-                "id": hash(company_data["name"]) % 10000,  # Generate stable ID
-                "name": company_data["name"],
-                "slug": company_data["slug"],
+
+            # Generate logo initials if no logo_url
+            logo_url = companies.logo_urls[slot]
+            logo = logo_url or (name[:2].upper() if name else "??")
+
+            cards.append({
+                "id": companies.card_ids[slot],
+                "name": name,
+                "slug": companies.slugs[slot],
                 "logo": logo,
-                "logo_url": company_data["logo_url"],
-                "location": company_data["location"],
-                "score": avg_score,
-                "matchReason": ai_match_reason or f"Match basé sur {company_data['job_count']} opportunité(s) détectée(s).",
-                "jobs": sorted(company_data["jobs"], key=lambda x: x["score"], reverse=True),
-                "suggested_roles": company_data.get("suggested_roles", []),
+                "logo_url": logo_url,
+                "location": features[scored.positions[rows[0]]].job.get("location"),
+                # MAX score (best job dictates company relevance)
+                "score": jobs[0]["score"] if jobs else 0,
+                "matchReason": ai_match_reason or f"Match basé sur {len(jobs)} opportunité(s) détectée(s).",
+                "jobs": jobs,
+                "suggested_roles": companies.suggested_roles[slot],
                 "ai_suggestions": suggestions  # Full AI suggestions with title, rationale, confidence
             })
-
-        # Sort companies by score (highest first)
-        companies_list.sort(key=lambda x: x["score"], reverse=True)
-
-        return CompanyMatchResponse(
-            success=True,
-            total_companies=len(companies_list),
-            total_jobs=len(matches),
-            companies=companies_list[:25]  # Top 25 (optimized with Tier 1 and force: false)
-        )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return cards
 
 
 # ============================================================
@@ -627,8 +1040,10 @@ async def scrape_stationf():
     Handles pagination and incremental saving.
     """
     try:
-        llm = ChatGoogle(model="gemini-2.5-flash", api_key=api_key)
-        controller = Controller()
+        browser_use = await run_blocking(load_browser_use)
+        job_service = await run_blocking(load_job_service)
+        llm = browser_use.ChatGoogle(model="gemini-2.5-flash", api_key=api_key)
+        controller = browser_use.Controller()
 
         # Define Pydantic models for the tool
         class JobItem(BaseModel):
@@ -669,7 +1084,7 @@ async def scrape_stationf():
                         "source": "stationf",
                         "location": "Paris (Station F)",
                     }
-                    supabase.table("jobs").upsert(record, on_conflict="external_id").execute()
+                    await run_blocking(timed("supabase", "jobs.upsert", supabase.table("jobs").upsert(record, on_conflict="external_id").execute))
                     count += 1
 
                 return f"Saved {count} jobs to DB."
@@ -697,13 +1112,13 @@ async def scrape_stationf():
         2. STOP when Next button gone.
         """
 
-        agent = Agent(llm=llm, task=task, controller=controller, flash_mode=False)
+        agent = browser_use.Agent(llm=llm, task=task, controller=controller, flash_mode=False)
         history = await agent.run()
         _ = history.final_result()
 
         print("Scraping phase complete. Starting enrichment phase...")
 
-        response = supabase.table("jobs").select("*").eq("source", "stationf").execute()
+        response = await run_blocking(timed("supabase", "jobs.select", supabase.table("jobs").select("*").eq("source", "stationf").execute))
         db_jobs = response.data or []
 
         if not db_jobs:
@@ -774,8 +1189,9 @@ async def scrape_stationf():
                         "job_description": job_description[:4000] if job_description else None,
                         "skills_extracted": skills_extracted,
                     }
+                    update_data.update(materialize_match_columns({**job, **update_data}))
 
-                    supabase.table("jobs").update(update_data).eq("external_id", job["external_id"]).execute()
+                    await run_blocking(timed("supabase", "jobs.update", supabase.table("jobs").update(update_data).eq("external_id", job["external_id"]).execute))
                     enriched_count += 1
                     jobs_scraped += 1
 
@@ -784,13 +1200,16 @@ async def scrape_stationf():
                 except Exception as e:
                     print(f"Failed to process job {job.get('title', 'unknown')}: {e}")
                     try:
-                        supabase.table("jobs").update(
-                            {"sector": sector, "stack": stack, "pitch": pitch, "description": description}
-                        ).eq("external_id", job["external_id"]).execute()
+                        update_data = {"sector": sector, "stack": stack, "pitch": pitch, "description": description}
+                        update_data.update(materialize_match_columns({**job, **update_data}))
+                        await run_blocking(timed("supabase", "jobs.update", supabase.table("jobs").update(update_data).eq("external_id", job["external_id"]).execute))
                         enriched_count += 1
                     except:
                         pass
 
+        # Les jobs ont changé : on recharge le catalogue sans attendre le TTL
+        job_catalog.request_refresh()
+
         return ScrapeResponse(
             success=True,
             count=len(db_jobs),
@@ -987,7 +1406,7 @@ async def enrich_structured(limit: int = 30, force: bool = False, version: int =
     - Stores raw JSON in enrichment_json for debugging
     """
     try:
-        resp = supabase.table("jobs").select("*").eq("source", "stationf").execute()
+        resp = await run_blocking(timed("supabase", "jobs.select", supabase.table("jobs").select("*").eq("source", "stationf").execute))
         jobs = resp.data or []
 
         # Only jobs that have job_description (and optionally not already enriched to this version)
@@ -1004,6 +1423,7 @@ async def enrich_structured(limit: int = 30, force: bool = False, version: int =
 
         print(f"🔬 Starting structured enrichment (limit={len(to_process)}, version={version})")
 
+        genai = await run_blocking(load_gemini)
         model = genai.GenerativeModel("gemini-2.5-flash")
 
         processed = 0
@@ -1025,7 +1445,7 @@ async def enrich_structured(limit: int = 30, force: bool = False, version: int =
             prompt = ENRICH_PROMPT.format(title=title, company=company, description=description)
 
             try:
-                res = model.generate_content(prompt)
+                res = await run_blocking(timed("gemini", "generate_content", model.generate_content), prompt)
                 raw_text = getattr(res, "text", None) or str(res)
 
                 json_str = extract_json_object(raw_text)
@@ -1050,7 +1470,7 @@ async def enrich_structured(limit: int = 30, force: bool = False, version: int =
                 }
 
                 if not dry_run:
-                    supabase.table("jobs").update(update_data).eq("external_id", job["external_id"]).execute()
+                    await run_blocking(timed("supabase", "jobs.update", supabase.table("jobs").update(update_data).eq("external_id", job["external_id"]).execute))
 
                 ok += 1
                 details.append(
@@ -1075,7 +1495,10 @@ async def enrich_structured(limit: int = 30, force: bool = False, version: int =
                 details.append({"title": title, "company": company, "error": "runtime", "detail": str(e)[:500]})
                 print(f"    ❌ Error: {e}")
 
-        return EnrichResponse(
+        if ok and not dry_run:
+            job_catalog.request_refresh()
+
+        return render_json(EnrichResponse.model_construct(
             success=True,
             processed=processed,
             success_count=ok,
@@ -1084,7 +1507,7 @@ async def enrich_structured(limit: int = 30, force: bool = False, version: int =
             dry_run=dry_run,
             message=f"Enrichment complete: {ok} success, {failed} failed",
             details=details,
-        )
+        ))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1138,7 +1561,7 @@ async def enrich_lazy_top50(req: EnrichRequest):
             print(f"📋 Fetching profile for user: {user_id}")
             client_to_use = supabase_admin if supabase_admin else supabase
             
-            profile_resp = client_to_use.table("profiles").select("*").eq("user_id", user_id).single().execute()
+            profile_resp = await run_blocking(timed("supabase", "profiles.select", client_to_use.table("profiles").select("*").eq("user_id", user_id).single().execute))
             if profile_resp.data:
                 profile = profile_resp.data
                 user_skills_list = profile.get("skills") or ["Python", "React", "Data"]
@@ -1162,8 +1585,12 @@ async def enrich_lazy_top50(req: EnrichRequest):
             # Fetch jobs ONLY for these companies (not all 2000+)
             companies_dict: Dict[str, dict] = {}
             
-            for name in company_names[:limit]:
-                resp = supabase.table("jobs").select("*").eq("company_name", name).execute()
+            # Une requête par entreprise, lancées en parallèle
+            names = company_names[:limit]
+            responses = await asyncio.gather(*(
+                run_blocking(timed("supabase", "jobs.select", supabase.table("jobs").select("*").eq("company_name", name).execute)) for name in names
+            ))
+            for name, resp in zip(names, responses):
                 jobs_for_company = resp.data or []
                 
                 if not jobs_for_company:
@@ -1199,7 +1626,9 @@ async def enrich_lazy_top50(req: EnrichRequest):
                 objectif=user_objective
             )
             
-            jobs = fetch_all_jobs(supabase, require_desc=True)
+            query = MatchQuery(user_profile_for_matching, None)
+            job_features = [f for f in (await catalog_snapshot()).features if f.has_description]
+            jobs = [f.job for f in job_features]
             print(f"   Found {len(jobs)} jobs with descriptions")
             
             if not jobs:
@@ -1209,7 +1638,8 @@ async def enrich_lazy_top50(req: EnrichRequest):
                 )
             
             companies_dict: Dict[str, dict] = {}
-            for job in jobs:
+            for features in job_features:
+                job = features.job
                 cn = job.get("company_name") or "Unknown"
                 if cn not in companies_dict:
                     companies_dict[cn] = {"name": cn, "jobs": [], "max_score": 0, "job_ids": [], "already_enriched": False}
@@ -1221,7 +1651,7 @@ async def enrich_lazy_top50(req: EnrichRequest):
                 companies_dict[cn]["jobs"].append(job)
                 companies_dict[cn]["job_ids"].append(job.get("id"))
                 
-                match_result = compute_job_match_score(user_profile_for_matching, job, None)
+                match_result = score_job(query, features)
                 job_score = match_result.get("score", 0) if match_result else 0
                 companies_dict[cn]["max_score"] = max(companies_dict[cn]["max_score"], job_score)
             
@@ -1230,8 +1660,19 @@ async def enrich_lazy_top50(req: EnrichRequest):
                 companies_list = [c for c in companies_list if not c["already_enriched"]]
             top_companies = companies_list[:limit]
             print(f"   Processing Top {len(top_companies)} companies")
+
+            # Le catalogue ne garde pas les descriptions : une requête pour les 5 jobs de contexte par entreprise
+            if not dry_run:
+                context_jobs = [j for c in top_companies for j in c["jobs"][:5]]
+                descriptions = await run_blocking(fetch_jobs_by, "id", [j.get("id") for j in context_jobs], "id,job_description")
+                for c in top_companies:
+                    c["jobs"] = [
+                        {**j, "job_description": (descriptions.get(j.get("id")) or {}).get("job_description")} if i < 5 else j
+                        for i, j in enumerate(c["jobs"])
+                    ]
         
         # Initialize Gemini model
+        genai = await run_blocking(load_gemini)
         model = genai.GenerativeModel("gemini-2.5-flash-lite")
         
         enriched = 0
@@ -1282,7 +1723,7 @@ async def enrich_lazy_top50(req: EnrichRequest):
                 
                 print(f"   → {company_name} ({len(company['jobs'])} jobs)...", end=" ")
                 
-                res = model.generate_content(prompt)
+                res = await run_blocking(timed("gemini", "generate_content", model.generate_content), prompt)
                 raw_text = getattr(res, "text", None) or str(res)
                 
                 # Debug: Log raw response
@@ -1300,15 +1741,17 @@ async def enrich_lazy_top50(req: EnrichRequest):
                 # Convert suggestions to list of role titles for storage
                 role_titles = [s.role_title for s in enrichment.suggestions]
                 
-                # Step 5: Update all jobs for this company with suggestions
-                for job_id in company["job_ids"]:
-                     # Use Admin client for writes if possible (safer for background tasks)
-                    client_to_use = supabase_admin if supabase_admin else supabase
-                    client_to_use.table("jobs").update({
+                # Step 5: Update all jobs for this company with suggestions (in parallel)
+                # Use Admin client for writes if possible (safer for background tasks)
+                client_to_use = supabase_admin if supabase_admin else supabase
+                await asyncio.gather(*(
+                    run_blocking(timed("supabase", "jobs.update", client_to_use.table("jobs").update({
                         "suggested_outreach_roles": role_titles,
                         # Store full response for debugging and UI display (diagnostic, etc.)
-                        "enrichment_json": payload  
-                    }).eq("id", job_id).execute()
+                        "enrichment_json": payload
+                    }).eq("id", job_id).execute))
+                    for job_id in company["job_ids"]
+                ))
                 
                 print("✅")
                 enriched += 1
@@ -1320,8 +1763,7 @@ async def enrich_lazy_top50(req: EnrichRequest):
                 })
                 
                 # Rate limiting: 0.5 second delay (Tier 1 limits allow much higher RPM)
-                import time
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
                 
             except Exception as e:
                 print(f"❌ {str(e)[:50]}")
@@ -1333,7 +1775,10 @@ async def enrich_lazy_top50(req: EnrichRequest):
                     "error": str(e)
                 })
         
-        return LazyEnrichResponse(
+        if enriched:
+            job_catalog.request_refresh()
+
+        return render_json(LazyEnrichResponse.model_construct(
             success=True,
             companies_processed=len(top_companies),
             companies_enriched=enriched,
@@ -1341,7 +1786,7 @@ async def enrich_lazy_top50(req: EnrichRequest):
             dry_run=dry_run,
             message=f"Lazy enrichment complete: {enriched} enriched, {failed} failed",
             details=details
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1366,7 +1811,8 @@ async def api_find_emails(request: FindEmailsRequest):
     3. Email Permutation + SMTP Verification
     """
     try:
-        result = find_contact(
+        result = await run_blocking(
+            timed("contact_finder", "find_contact", await run_blocking(load_find_contact)),
             company_name=request.company_name,
             domain_override=request.domain,
             first_name=request.first_name,
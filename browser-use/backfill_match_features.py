@@ -0,0 +1,97 @@
+"""
+Match Features Backfill
+-----------------------
+Fills the matching columns (match_text, match_skills, role_keyword_hits,
+is_senior, hiring_score...) of the jobs written before
+migrations/add_match_feature_columns.sql, or with an older
+MATCH_FEATURES_VERSION. Run it again after bumping the version.
+
+Until a row is backfilled the API computes its features at catalog load.
+
+Usage:
+    python backfill_match_features.py [--batch-size N] [--all] [--dry-run]
+"""
+
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+from matching import MATCH_FEATURES_VERSION, MATCH_SOURCE_COLUMNS, materialize_match_columns
+
+# Load env
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+
+if not SUPABASE_URL or not SUPABASE_KEY:
+    print("[ERROR] Missing SUPABASE_URL or SUPABASE_KEY in .env")
+    sys.exit(1)
+
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+def fetch_batch(after_id, batch_size: int, recompute_all: bool) -> list:
+    """Next `batch_size` jobs (by id) whose features must be (re)computed."""
+    q = supabase.table("jobs").select(",".join(["id", *MATCH_SOURCE_COLUMNS])).order("id").limit(batch_size)
+    if after_id is not None:
+        q = q.gt("id", after_id)
+    if not recompute_all:
+        q = q.or_(f"match_features_version.is.null,match_features_version.neq.{MATCH_FEATURES_VERSION}")
+    return q.execute().data or []
+
+
+def backfill(batch_size: int = 500, recompute_all: bool = False, dry_run: bool = False):
+    print(f"{'='*60}")
+    print("MATCH FEATURES BACKFILL")
+    print(f"{'='*60}")
+    print(f"Mode: {'DRY RUN' if dry_run else 'LIVE'}")
+    print(f"Features version: {MATCH_FEATURES_VERSION}")
+    print(f"Scope: {'all jobs' if recompute_all else 'missing or outdated features'}")
+    print()
+
+    updated = 0
+    errors = 0
+    after_id = None
+
+    while True:
+        jobs = fetch_batch(after_id, batch_size, recompute_all)
+        if not jobs:
+            break
+        after_id = jobs[-1]["id"]
+
+        for job in jobs:
+            columns = materialize_match_columns(job)
+            if dry_run:
+                updated += 1
+                continue
+            try:
+                supabase.table("jobs").update(columns).eq("id", job["id"]).execute()
+                updated += 1
+            except Exception as e:
+                print(f"    [X] Job {job['id']}: {e}")
+                errors += 1
+
+        print(f"[+] {updated} jobs {'to update' if dry_run else 'updated'} ({errors} errors)")
+
+        if len(jobs) < batch_size:
+            break
+
+    print()
+    print(f"{'='*60}")
+    print("DONE!")
+    print(f"  {'Would update' if dry_run else 'Updated'}: {updated}")
+    print(f"  Errors: {errors}")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the precomputed matching columns of the jobs table")
+    parser.add_argument("--batch-size", type=int, default=500, help="Jobs fetched per query (default: 500)")
+    parser.add_argument("--all", action="store_true", help="Recompute every job, not only missing/outdated ones")
+    parser.add_argument("--dry-run", action="store_true", help="Compute without writing to the DB")
+    args = parser.parse_args()
+
+    backfill(batch_size=args.batch_size, recompute_all=args.all, dry_run=args.dry_run)
@@ -0,0 +1,291 @@
+"""
+Matching Benchmark Suite
+========================
+
+Reproducible timings of the matching engine on the checked-in
+jobs_scraped.json (731 jobs) and on synthetic scale-ups of it.
+
+Scenarios (per catalog size, several UserProfile / SearchPreferences fixtures):
+    catalog_load        featurize + indexes of the whole catalog (JobCatalog.refresh)
+    score_job           compute_job_match_score, one job dict per op
+    match               POST /match (top 200, rendered JSON)
+    match_by_company    POST /match-by-company (top 25 companies)
+    group_by_company    company ranking + cards of the top 25 companies (CompanyIndex.top, company_cards)
+    render_match        MatchResponse of 200 matches -> JSON bytes (serialization, JSON_RENDERER)
+
+The endpoints run in-process (FastAPI TestClient) against an in-memory catalog:
+no Supabase, no response cache (MATCH_CACHE_SIZE=0), no cursor detail fetch.
+Synthetic copies get their own id / external_id / company name, so /match-by-company
+has as many companies per job as the real catalog.
+
+Reported per scenario: ops/sec, p50 / p99 latency (ms), peak memory allocated
+during one op (tracemalloc; for catalog_load = the catalog itself).
+
+Baseline:
+    python benchmark_matching.py --save-baseline     # store the current numbers
+    python benchmark_matching.py                     # compare; exit 1 on regression
+A scenario regresses when its p50 or its peak memory grows by more than
+--tolerance (default 25%). Timings depend on the machine: store the baseline
+on the machine that runs the comparison.
+
+Usage:
+    python benchmark_matching.py [--sizes 731,10000,100000] [--engine vector|python] [--json-renderer orjson|stdlib]
+                                 [--iterations N] [--baseline PATH] [--save-baseline]
+                                 [--output results.json] [--tolerance 0.25]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource  # Unix only (peak RSS)
+except ImportError:
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "benchmark_baseline.json")
+DEFAULT_SIZES = "731,10000,100000"
+
+# Jeux de test représentatifs : (nom, user_profile, preferences)
+FIXTURES = [
+    ("alternance_backend",
+     {"skills": ["Python", "React", "SQL"], "objectif": "Je cherche une alternance Backend"},
+     {"contract_types": ["alternance"]}),
+    ("data_engineer",
+     {"skills": ["python", "sql", "docker"], "objectif": "Data engineer"},
+     None),
+    ("genai_strict",
+     {"skills": ["python", "machine learning"], "objectif": "GenAI Engineer / LLM"},
+     {"target_roles": ["ai_engineer", "ml_engineer"], "exclude_keywords": ["senior"], "strict_intent": True, "min_score": 10}),
+    ("fullstack_cdi",
+     {"skills": ["js", "node", "react"], "objectif": "Développeur Fullstack"},
+     {"contract_types": ["alternance", "CDI"]}),
+    ("devops_keywords",
+     {"skills": ["docker", "aws"], "objectif": "DevOps"},
+     {"must_have_keywords": ["docker OR kubernetes"], "enriched_only": True, "min_score": 20}),
+]
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+def summarize(latencies, peak_bytes: int) -> dict:
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / total, 2) if total else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 50), 4),
+        "p99_ms": round(1000 * percentile(latencies, 99), 4),
+        "peak_kb": round(peak_bytes / 1024, 1),
+    }
+
+
+def timed(func, calls):
+    """Latency of func(*args) for each args of `calls`, then the peak memory of one extra call."""
+    latencies = []
+    for args in calls:
+        t0 = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    func(*calls[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return latencies, peak
+
+
+def scaled_catalog(jobs, size: int):
+    """`size` rows like the lean catalog projection: copies of jobs_scraped.json with unique ids / companies."""
+    from matching import materialize_match_columns
+
+    base = []
+    for job in jobs:
+        row = dict(job)
+        row.setdefault("suggested_outreach_roles", [])
+        row.update(materialize_match_columns(row))
+        row.pop("job_description", None)
+        base.append(row)
+
+    rows = []
+    for i in range(size):
+        copy_no, src = divmod(i, len(base))
+        row = dict(base[src])
+        row["id"] = i + 1
+        if copy_no:
+            row["external_id"] = f"{row.get('external_id')}-{copy_no}"
+            row["company_name"] = f"{row.get('company_name') or 'Unknown'} #{copy_no}"
+        rows.append(row)
+    return rows
+
+
+def run_size(A, client, jobs, size: int, iterations: int) -> dict:
+    from matching import MatchQuery, SearchPreferences, UserProfile, compute_job_match_score
+    from match_pages import ResultPages
+
+    results = {}
+    rows = scaled_catalog(jobs, size)
+    A.result_pages = ResultPages()  # les classements gardés pour les curseurs retiennent l'ancien catalogue
+    A.job_catalog.loader = lambda: rows
+
+    # catalog_load : une mesure de temps, puis un 2e chargement tracé (pic mémoire = le catalogue)
+    t0 = time.perf_counter()
+    A.job_catalog.refresh()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    A.job_catalog.refresh()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    results["catalog_load"] = summarize([elapsed], peak)
+
+    fixtures = [
+        (UserProfile(**user), SearchPreferences(**prefs) if prefs else None, {"user_profile": user, "preferences": prefs})
+        for _, user, prefs in FIXTURES
+    ]
+
+    # score_job : l'appel ponctuel (profil, dict job, préférences), sur un échantillon du catalogue
+    sample = rows[:2000]
+    calls = [(user, job, prefs) for user, prefs, _ in fixtures for job in sample]
+    results["score_job"] = summarize(*timed(compute_job_match_score, calls))
+
+    def post(path, body):
+        response = client.post(path, json=body)
+        if response.status_code != 200:
+            raise SystemExit(f"[X] {path} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    bodies = [(body,) for _, _, body in fixtures] * iterations
+    results["match"] = summarize(*timed(lambda body: post("/match", body), bodies))
+    results["match_by_company"] = summarize(*timed(lambda body: post("/match-by-company", body), bodies))
+
+    # Classement par entreprise / serialization seuls, sur les jobs déjà scorés de chaque profil
+    catalog = A.job_catalog.snapshot()
+    scored_jobs = [
+        (asyncio.run(A.evaluate_matches(catalog, MatchQuery(user, prefs or SearchPreferences()))),)
+        for user, prefs, _ in fixtures
+    ]
+
+    # Une seule boucle asyncio : asyncio.run par op mesurerait aussi sa création / fermeture
+    loop = asyncio.new_event_loop()
+
+    def group(scored):
+        ranked, _ = catalog.indexes["companies"].top(scored, 25)
+        return loop.run_until_complete(A.company_cards(catalog, scored, ranked))
+
+    try:
+        results["group_by_company"] = summarize(*timed(group, scored_jobs * iterations))
+    finally:
+        loop.close()
+    pages = [(post("/match", body).json()["matches"],) for _, _, body in fixtures]
+    results["render_match"] = summarize(*timed(
+        lambda matches: A.render_json(A.MatchResponse.model_construct(
+            success=True, total_jobs=size, matched=len(matches), matches=matches,
+        )).body, pages * iterations
+    ))
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float):
+    """Print each scenario against the baseline; return the regressed keys."""
+    regressions = []
+    print()
+    print(f"{'scenario':42} {'ops/sec':>12} {'p50 ms':>10} {'p99 ms':>10} {'peak KB':>11}   vs baseline (p50 / peak)")
+    for key, cur in current.items():
+        base = baseline.get(key)
+        line = f"{key:42} {cur['ops_per_sec']:12.2f} {cur['p50_ms']:10.3f} {cur['p99_ms']:10.3f} {cur['peak_kb']:11.1f}"
+        if base:
+            d_p50 = (cur["p50_ms"] / base["p50_ms"] - 1) if base["p50_ms"] else 0.0
+            d_peak = (cur["peak_kb"] / base["peak_kb"] - 1) if base["peak_kb"] else 0.0
+            regressed = d_p50 > tolerance or d_peak > tolerance
+            line += f"   {d_p50:+7.1%} / {d_peak:+7.1%}" + ("   [REGRESSION]" if regressed else "")
+            if regressed:
+                regressions.append(key)
+        else:
+            line += "   (no baseline)"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the matching engine on jobs_scraped.json")
+    parser.add_argument("--jobs", default=os.path.join(BASE_DIR, "jobs_scraped.json"))
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Catalog sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--engine", choices=["vector", "python"], default=os.getenv("MATCH_ENGINE", "vector"))
+    parser.add_argument("--json-renderer", choices=["orjson", "stdlib"], default=os.getenv("JSON_RENDERER", "orjson"))
+    parser.add_argument("--iterations", type=int, default=10, help="Requests per fixture and scenario (default: 10)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with / save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these numbers in the baseline (merged by key)")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 / peak growth (default: 0.25)")
+    args = parser.parse_args()
+
+    # Le serveur est importé après la config : catalogue en mémoire, sans cache ni pool de process
+    os.environ["MATCH_ENGINE"] = args.engine
+    os.environ["JSON_RENDERER"] = args.json_renderer
+    os.environ["MATCH_CACHE_SIZE"] = "0"
+    os.environ["MATCH_WORKERS"] = "0"
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark")
+    sys.path.insert(0, BASE_DIR)
+    import api_server as A
+    from fastapi.testclient import TestClient
+
+    A.job_catalog.detail_loader = None
+    A.job_catalog.watermark = None
+    A.job_catalog.delta_loader = None
+    A.job_catalog.snapshot_path = None
+    client = TestClient(A.app)  # sans "with" : pas de thread de rafraîchissement
+
+    with open(args.jobs, encoding="utf-8") as f:
+        jobs = json.load(f)
+
+    current = {}
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        print(f"[bench] {args.engine} engine, {size} jobs...")
+        started = time.time()
+        for scenario, stats in run_size(A, client, jobs, size, args.iterations).items():
+            current[f"{args.engine}/{size}/{scenario}"] = stats
+        print(f"[bench] {size} jobs done in {time.time() - started:.1f}s")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+    regressions = compare(current, baseline, args.tolerance)
+
+    if resource is not None:
+        # ru_maxrss : Ko sous Linux
+        print(f"\nProcess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    meta = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "iterations": args.iterations,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": current}, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": {**baseline, **current}}, f, indent=2, sort_keys=True)
+        print(f"[bench] Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n[X] {len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
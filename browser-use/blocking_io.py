@@ -0,0 +1,46 @@
+"""
+Blocking I/O off the Event Loop
+===============================
+
+supabase-py, google.generativeai (generate_content) and the contact finder
+(DuckDuckGo, Pappers, DNS, SMTP) are synchronous. Called directly from an
+`async def` handler they freeze the uvicorn event loop for the whole network
+round-trip: every other request, `/` health checks included, waits.
+
+`run_blocking(func, *args)` runs the call in a bounded thread pool and awaits
+it, so the loop keeps serving and concurrent requests overlap their I/O.
+The pool is bounded so a burst of slow calls (Gemini, SMTP) cannot spawn
+threads without limit: extra calls queue until a thread is free.
+The call runs in a copy of the caller's context (like asyncio.to_thread), so
+contextvars such as the request timer of metrics.py follow it.
+
+Usage:
+    resp = await run_blocking(supabase.table("jobs").select("*").execute)
+    res = await run_blocking(model.generate_content, prompt)
+
+Config (.env):
+    IO_THREADS=32
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+IO_THREADS = int(os.getenv("IO_THREADS", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="blocking-io")
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await func(*args, **kwargs) run in the I/O thread pool."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(_executor, call)
+
+
+def shutdown():
+    """Stop accepting calls; running ones finish in the background."""
+    _executor.shutdown(wait=False)
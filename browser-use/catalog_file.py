@@ -0,0 +1,158 @@
+"""
+Catalog Snapshot File
+=====================
+
+Binary file holding one generation of the featurized catalog
+(JobCatalog snapshot_path): written by one process, read by any number.
+
+Layout:
+    [header pickle][body pickle][pad to 64][buffer 0][pad]...[buffer n]
+
+- The body is pickled with protocol 5: the contiguous buffers it exposes (the
+  NumPy arrays of vector_scoring.VectorIndex, the positions of
+  keyword_index.KeywordIndex) are written out-of-band after the body instead
+  of being copied into it.
+- Readers mmap the file read-only (POSIX): those arrays come back as read-only
+  views on the mapping, so all the processes reading the same generation share
+  one copy of their pages (OS page cache). Python objects (rows, features,
+  token dicts) are unpickled in each process.
+- A new generation is written to a temp file then renamed over the previous
+  one: readers see the old file or the new one, never half a file, and a
+  reader still mapping the old file keeps a valid view of it.
+- Trusted local state (pickle): files are written 0600 and SnapshotFile
+  refuses a file owned by another user or writable by group / other. The
+  default location, private_state_dir(), is a 0700 directory of the current
+  user (`<temp dir>/jobtinder-<uid>`); the lock / refresh files next to the
+  snapshot are opened with open_private().
+
+Usage:
+    path = os.path.join(private_state_dir(), "catalog.snapshot")
+    write_snapshot_file(path, {"version": 3, "tag": tag}, (jobs, features, indexes))
+    snapshot = SnapshotFile(path)      # header only
+    if snapshot.header["tag"] == tag:
+        jobs, features, indexes = snapshot.load()
+"""
+
+import mmap
+import os
+import pickle
+import stat
+import tempfile
+from typing import IO, Any, List, Tuple
+
+# Version de la disposition du fichier (en-tête, corps, buffers) : à incrémenter si elle change
+FILE_FORMAT = 2
+
+_ALIGNMENT = 64  # NumPy n'exige que l'alignement de l'élément ; 64 = une ligne de cache
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def check_private(st: os.stat_result, path: str):
+    """Raise PermissionError unless path is owned by the current user and not writable by group / other."""
+    if os.name != "posix":
+        return
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by uid {st.st_uid}, not by the current user ({os.getuid()})")
+    if st.st_mode & 0o022:
+        raise PermissionError(f"{path} is writable by group or other (mode {stat.S_IMODE(st.st_mode):o})")
+
+
+def private_state_dir(name: str = "jobtinder") -> str:
+    """Directory for the local state files of the current user: <temp dir>/<name>-<uid>, created 0700."""
+    if os.name != "posix":
+        path = os.path.join(tempfile.gettempdir(), name)
+        os.makedirs(path, exist_ok=True)
+        return path
+    path = os.path.join(tempfile.gettempdir(), f"{name}-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    check_private(st, path)
+    return path
+
+
+def open_private(path: str) -> IO[str]:
+    """Open (create 0600 if missing) a small state file read/write, refusing one another user could tamper with."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    try:
+        check_private(os.fstat(fd), path)
+        return os.fdopen(fd, "r+")
+    except BaseException:
+        os.close(fd)
+        raise
+
+
+def write_snapshot_file(path: str, header: dict, body: Any) -> int:
+    """Write header + body to path atomically (temp file + rename); return the file size."""
+    out_of_band: List[memoryview] = []
+
+    def keep_out_of_band(buffer: pickle.PickleBuffer):
+        out_of_band.append(buffer.raw())
+        return False  # False = out-of-band
+
+    payload = pickle.dumps(body, protocol=5, buffer_callback=keep_out_of_band)
+    buffers: List[Tuple[int, int]] = []
+    offset = 0
+    for raw in out_of_band:
+        buffers.append((offset, raw.nbytes))
+        offset = _aligned(offset + raw.nbytes)
+    header = {**header, "format": FILE_FORMAT, "body_size": len(payload), "buffers": buffers}
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.remove(tmp_path)  # reste d'un process mort avec le même pid
+    except FileNotFoundError:
+        pass
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+    try:
+        with open(fd, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(payload)
+            data_start = _aligned(f.tell())
+            for (offset, _), raw in zip(buffers, out_of_band):
+                f.write(b"\0" * (data_start + offset - f.tell()))
+                f.write(raw)
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+class SnapshotFile:
+    """One snapshot file opened for reading: the header right away, the body on load()."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())  # identity of this generation (inode, mtime)
+            check_private(self.stat, path)  # pickle : seulement un fichier que personne d'autre n'a pu écrire
+            self.header = pickle.load(f)
+            if self.header.get("format") != FILE_FORMAT:
+                raise ValueError(f"unsupported snapshot file format {self.header.get('format')!r}")
+            self._body_start = f.tell()
+            if os.name == "posix":
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # Windows : un fichier mappé ne peut pas être remplacé, on lit une copie
+                f.seek(0)
+                self._data = f.read()
+
+    @property
+    def generation(self) -> Tuple[int, int, int]:
+        return (self.stat.st_ino, self.stat.st_mtime_ns, self.stat.st_size)
+
+    def load(self) -> Any:
+        """Unpickle the body; its out-of-band buffers are views on the file mapping."""
+        view = memoryview(self._data)
+        body_end = self._body_start + self.header["body_size"]
+        data_start = _aligned(body_end)
+        buffers = [view[data_start + offset:data_start + offset + size] for offset, size in self.header["buffers"]]
+        return pickle.loads(view[self._body_start:body_end], buffers=buffers)
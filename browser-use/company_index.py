@@ -0,0 +1,117 @@
+"""
+Company Aggregate Index
+=======================
+
+Lets /match-by-company rank companies without regrouping the matched jobs
+into per-company dicts on every request.
+
+CompanyIndex (built once per catalog snapshot, next to the keyword index):
+    - one slot per company (catalog order of first appearance)
+    - job position -> company slot
+    - per company: name, card id, job positions, slug / logo and outreach
+      suggestions
+    - `enrichment_positions`: the job carrying the company's AI enrichment
+      (enrich_lazy_top50 writes the same suggestions on every job it updates),
+      so the card's enrichment_json is one detail row per company
+
+Card fields are company-level, taken over every job of the company in the
+catalog, matched or not (the old per-request grouping took them from the
+company's first match, even when empty):
+    - slug, logo_url: first non-empty value in catalog order
+    - suggested_roles, enrichment: first job with outreach roles
+    - card id: crc32 of the name mod 10000, the same in every process and
+      snapshot file (hash() of a str changes with PYTHONHASHSEED)
+
+Per request, ranking is a max-reduction of the job scores into the company
+slots: company score = its best job score; ties keep the company seen first
+among the matches (same order as a stable sort of the old grouping).
+"""
+
+import heapq
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class CompanyIndex:
+    """Companies of one catalog snapshot (positions = index in snapshot.features)."""
+
+    def __init__(self, features: List):
+        self.slots: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.card_ids: List[int] = []
+        self.slugs: List[Optional[str]] = []
+        self.logo_urls: List[Optional[str]] = []
+        self.suggested_roles: List[list] = []
+        self.enrichment_positions: List[Optional[int]] = []
+        self.positions: List[array] = []
+        self.company_of = array("I")
+
+        for pos, f in enumerate(features):
+            job = f.job
+            name = job.get("company_name") or "Unknown"
+            slot = self.slots.get(name)
+            if slot is None:
+                slot = self.slots[name] = len(self.names)
+                self.names.append(name)
+                self.card_ids.append(zlib.crc32(name.encode("utf-8")) % 10000)
+                self.slugs.append(None)
+                self.logo_urls.append(None)
+                self.suggested_roles.append([])
+                self.enrichment_positions.append(None)
+                self.positions.append(array("I"))
+            self.company_of.append(slot)
+            self.positions[slot].append(pos)
+
+            if not self.slugs[slot]:
+                self.slugs[slot] = job.get("company_slug")
+            if not self.logo_urls[slot]:
+                self.logo_urls[slot] = job.get("logo_url")
+            roles = job.get("suggested_outreach_roles")
+            if roles and self.enrichment_positions[slot] is None:
+                self.suggested_roles[slot] = roles
+                self.enrichment_positions[slot] = pos
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _best(self, scored) -> Tuple[List[int], List[int], List[int]]:
+        """(best score per slot, first row per slot, slots in order of first match)."""
+        best = [-1] * len(self.names)
+        first = [-1] * len(self.names)
+        seen: List[int] = []
+        company_of = self.company_of
+        for row, (pos, score) in enumerate(zip(scored.positions, scored.scores)):
+            slot = company_of[pos]
+            total = score[0]
+            if first[slot] < 0:
+                first[slot] = row
+                seen.append(slot)
+            if total > best[slot]:
+                best[slot] = total
+        return best, first, seen
+
+    def _rows(self, scored, slots: List[int]) -> List[Tuple[int, List[int]]]:
+        """(slot, its rows of `scored` in catalog order) for the given slots, in that order."""
+        rows_by_slot: Dict[int, List[int]] = {slot: [] for slot in slots}
+        company_of = self.company_of
+        for row, pos in enumerate(scored.positions):
+            rows = rows_by_slot.get(company_of[pos])
+            if rows is not None:
+                rows.append(row)
+        return list(rows_by_slot.items())
+
+    def rank(self, scored) -> List[Tuple[int, List[int]]]:
+        """Every matched company with its rows, best company first."""
+        best, first, seen = self._best(scored)
+        return self._rows(scored, sorted(seen, key=lambda slot: (-best[slot], first[slot])))
+
+    def top(self, scored, limit: int) -> Tuple[List[Tuple[int, List[int]]], int]:
+        """The `limit` best companies (same order as rank) and the number of matched companies."""
+        best, first, seen = self._best(scored)
+        top = heapq.nsmallest(limit, seen, key=lambda slot: (-best[slot], first[slot]))
+        return self._rows(scored, top), len(seen)
+
+
+def build_company_index(features: List) -> CompanyIndex:
+    return CompanyIndex(features)
@@ -17,21 +17,31 @@ import json
 import time
 import argparse
 import requests
+from typing import Optional
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+from matching import MATCH_SOURCE_COLUMNS, materialize_match_columns
+
 # Load env
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("[ERROR] Missing SUPABASE_URL or SUPABASE_KEY in .env")
-    sys.exit(1)
+# Created on first use (CLI); the API scheduler passes its own client (refresh_scheduler.py)
+supabase: Optional[Client] = None
+
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+def get_supabase() -> Client:
+    global supabase
+    if supabase is None:
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            print("[ERROR] Missing SUPABASE_URL or SUPABASE_KEY in .env")
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
+        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return supabase
 
 # --- THE MAGIC FUNCTION ---
 
@@ -127,10 +137,12 @@ def extract_from_meta(soup: BeautifulSoup) -> dict:
 
 # --- MAIN ENRICHMENT LOGIC ---
 
-def enrich_jobs(limit: int = 50, dry_run: bool = False):
+def enrich_jobs(limit: int = 50, dry_run: bool = False, client: Optional[Client] = None) -> dict:
     """
     Fetch jobs with missing/short descriptions and enrich them.
+    Returns the run summary (candidates / success / errors).
     """
+    client = client or get_supabase()
     print(f"\n{'='*60}")
     print("FAST JOB DESCRIPTION ENRICHER")
     print(f"{'='*60}")
@@ -139,7 +151,9 @@ def enrich_jobs(limit: int = 50, dry_run: bool = False):
     print()
 
     # Fetch all jobs (we'll filter in Python for more control)
-    resp = supabase.table("jobs").select("id, title, company_name, apply_url, job_description").execute()
+    # (+ the other sources of the matching columns, recomputed with the new description)
+    columns = ", ".join(dict.fromkeys(["id", "company_name", "apply_url", *MATCH_SOURCE_COLUMNS]))
+    resp = client.table("jobs").select(columns).execute()
     
     all_jobs = resp.data or []
     
@@ -169,7 +183,7 @@ def enrich_jobs(limit: int = 50, dry_run: bool = False):
     
     if not jobs_to_enrich:
         print("[OK] All jobs already have descriptions!")
-        return
+        return {"candidates": 0, "success": 0, "errors": 0}
     
     # Process up to limit
     to_process = jobs_to_enrich[:limit]
@@ -207,9 +221,9 @@ def enrich_jobs(limit: int = 50, dry_run: bool = False):
         if not dry_run:
             # Update database
             try:
-                supabase.table("jobs").update({
-                    "job_description": description
-                }).eq("id", job_id).execute()
+                update_data = {"job_description": description}
+                update_data.update(materialize_match_columns({**job, **update_data}))
+                client.table("jobs").update(update_data).eq("id", job_id).execute()
                 print(f"    [OK] Updated in DB")
                 success_count += 1
             except Exception as e:
@@ -228,6 +242,7 @@ def enrich_jobs(limit: int = 50, dry_run: bool = False):
     print(f"  Success: {success_count}")
     print(f"  Errors: {error_count}")
     print(f"{'='*60}")
+    return {"candidates": len(jobs_to_enrich), "success": success_count, "errors": error_count}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""
+Fast JSON Responses
+===================
+
+The match endpoints return hundreds of dicts that the server built itself
+(matches, company cards). FastAPI's default path validates them again
+through Pydantic, walks them with jsonable_encoder, then encodes the copy
+with the stdlib json module.
+
+- Build the response model with `Model.model_construct(...)` (no
+  validation: the dicts are already in their final shape).
+- `FastJSONResponse(content=model)` encodes it in one pass with orjson:
+  nested models become their field dicts, sets become lists, anything else
+  orjson does not know goes through jsonable_encoder. Same JSON as
+  JSONResponse(jsonable_encoder(model)), except NaN / Infinity -> null.
+
+orjson is optional: `ORJSON_AVAILABLE` tells whether it is installed; without
+it the server keeps the stdlib path (see JSON_RENDERER in api_server.py).
+
+Usage:
+    response = FastJSONResponse(content=MatchResponse.model_construct(success=True, ...))
+    line = dumps({"type": "match", **match}) + b"\\n"
+"""
+
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not serialize natively."""
+    if isinstance(obj, BaseModel):
+        return dict(obj)  # shallow: nested values come back through orjson
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON of obj (response models included)."""
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by orjson, without jsonable_encoder (requires orjson)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
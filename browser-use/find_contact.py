@@ -23,6 +23,8 @@ from typing import List, Optional, Dict
 from dotenv import load_dotenv
 from duckduckgo_search import DDGS
 
+from metrics import outbound, timed
+
 # ============================================================
 # 0. CONFIG
 # ============================================================
@@ -62,7 +64,8 @@ def get_company_domain(brand_name: str) -> Optional[str]:
     try:
         with DDGS() as ddgs:
             for query in queries:
-                results = list(ddgs.text(query, max_results=10))
+                with outbound("duckduckgo", "text"):
+                    results = list(ddgs.text(query, max_results=10))
 
                 for r in results:
                     url = r.get("href", "")
@@ -112,7 +115,8 @@ def find_ceo_from_ddg(company_name: str) -> Optional[Dict]:
     try:
         with DDGS() as ddgs:
             for query in queries:
-                results = list(ddgs.text(query, max_results=5))
+                with outbound("duckduckgo", "text"):
+                    results = list(ddgs.text(query, max_results=5))
 
                 for r in results:
                     title = r.get("title", "")
@@ -280,7 +284,7 @@ def find_ceo_from_pappers(company_name: str) -> Optional[Dict]:
             "par_page": 1,
             "entreprise_cessee": "false"
         }
-        response = requests.get(search_url, params=search_params, timeout=10)
+        response = timed("pappers", "recherche", requests.get)(search_url, params=search_params, timeout=10)
 
         if response.status_code == 429:
             print("[!] Quota Pappers depasse !")
@@ -310,7 +314,7 @@ def find_ceo_from_pappers(company_name: str) -> Optional[Dict]:
                 "api_token": PAPPERS_API_TOKEN,
                 "siren": siren,
             }
-            fiche_resp = requests.get(fiche_url, params=fiche_params, timeout=10)
+            fiche_resp = timed("pappers", "entreprise", requests.get)(fiche_url, params=fiche_params, timeout=10)
 
             if fiche_resp.status_code == 200:
                 fiche_data = fiche_resp.json()
@@ -445,7 +449,7 @@ def generate_permutations(first: str, last: str, domain: str) -> List[str]:
 def get_mx_record(domain: str) -> Optional[str]:
     """Resout le serveur MX pour un domaine."""
     try:
-        records = dns.resolver.resolve(domain, 'MX')
+        records = timed("dns", "mx", dns.resolver.resolve)(domain, 'MX')
         return str(records[0].exchange)
     except Exception:
         return None
@@ -457,13 +461,14 @@ def verify_email_smtp(email: str, mx_host: str) -> str:
     Retourne : 'VALID', 'INVALID', 'UNKNOWN'
     """
     try:
-        server = smtplib.SMTP(timeout=5)
-        server.set_debuglevel(0)
-        server.connect(mx_host)
-        server.helo('scope-app.com')
-        server.mail('verify@scope-app.com')
-        code, _ = server.rcpt(email)
-        server.quit()
+        with outbound("smtp", "rcpt"):
+            server = smtplib.SMTP(timeout=5)
+            server.set_debuglevel(0)
+            server.connect(mx_host)
+            server.helo('scope-app.com')
+            server.mail('verify@scope-app.com')
+            code, _ = server.rcpt(email)
+            server.quit()
 
         if code == 250:
             return 'VALID'
@@ -8,6 +8,8 @@ import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+from matching import materialize_match_columns
+
 # Load environment variables
 load_dotenv()
 
@@ -21,7 +23,7 @@ def load_jobs(filepath: str) -> list:
 
 def map_to_supabase_schema(job: dict) -> dict:
     """Map scraped job to Supabase jobs table schema."""
-    return {
+    row = {
         "external_id": job.get("external_id"),
         "title": job.get("title"),
         "company_name": job.get("company_name"),
@@ -37,6 +39,8 @@ def map_to_supabase_schema(job: dict) -> dict:
         "scraped_at": job.get("scraped_at"),
         "is_active": True,
     }
+    row.update(materialize_match_columns(row))
+    return row
 
 def import_jobs(jobs: list, supabase: Client, batch_size: int = 100):
     """Import jobs to Supabase in batches."""
@@ -0,0 +1,595 @@
+"""
+In-process Job Catalog Cache
+============================
+
+Keeps the whole `jobs` table in memory for the life of the API process so the
+matching endpoints score against RAM instead of paging Supabase on every call.
+
+- First access loads the catalog synchronously (cold start).
+- A daemon thread reloads it every CATALOG_TTL_SECONDS.
+- Each reload builds a brand new CatalogSnapshot and swaps the reference in one
+  assignment: a request that grabbed the old snapshot keeps a consistent view.
+- If a reload fails, the previous snapshot keeps being served.
+- An optional `featurize(job)` hook derives per-job data (e.g. matching.JobFeatures)
+  while building the snapshot, so it is computed once per reload, not per request.
+- Optional `indexers` ({name: build(features)}) build catalog-wide structures
+  (e.g. keyword_index.KeywordIndex) stored in snapshot.indexes[name].
+- `subscribe(callback)` registers a callback(snapshot) run after each swap
+  (e.g. to ship the new catalog to worker processes), once the snapshot file
+  is written: `snapshot.path` is then the file holding that version.
+- Rows can be a lean projection: heavy fields (e.g. enrichment_json) are then
+  fetched with `details(snapshot, ids)` for the returned jobs only, in one call
+  to `detail_loader(ids)`, and kept for the life of the snapshot.
+- Delta sync (optional `watermark` + `delta_loader`): after a full load, a
+  refresh only fetches the rows changed since the high-water mark and applies
+  them to a copy of the catalog: changed rows are replaced (and re-featurized),
+  new rows appended, tombstones (`is_removed(row)`) dropped; unchanged rows keep
+  their features. The indexes are rebuilt from the features. No change = same
+  snapshot (caches stay valid). A full reload still runs every
+  CATALOG_FULL_RELOAD_SECONDS (catches hard deletes) and whenever a delta fails.
+- Optional `row_of(feature)`: snapshot.jobs keeps that compact row (e.g. the
+  matching.CatalogJob held by the features) instead of the loaded dict, so the
+  full rows are freed once featurized.
+- Warm restarts (optional `snapshot_path`): every reload / delta writes the
+  rows, features and indexes to a local binary file (pickle, written
+  atomically, mode 0600), with the delta watermark. `start()` restores it instead of
+  paging the whole table: the process serves that snapshot right away
+  (sync_state "restored") while the refresh thread catches up with a delta
+  since the saved watermark (or a full reload when due). Indexes missing from
+  the file are rebuilt. A file written with another `snapshot_tag` (e.g. a
+  digest of the featurize / index code) is ignored. File layout and sharing:
+  catalog_file.py (NumPy arrays of the indexes are mapped, not copied).
+- Several workers (uvicorn --workers N, `shared=True`, needs snapshot_path):
+  one leader, elected with an exclusive lock on `<snapshot_path>.lock`, loads
+  and syncs the catalog and writes each generation to snapshot_path. The
+  other workers never page the table: they swap to each new generation of the
+  file (sync_state "following"), mapping its arrays read-only, and turn
+  request_refresh() into a request to the leader (`<snapshot_path>.refresh`).
+  A follower asked for the catalog before the leader's first file exists
+  waits for it (up to CATALOG_SHARED_WAIT_SECONDS), then loads it itself.
+  When the leader exits, its lock is released and a follower takes over.
+
+Usage:
+    catalog = JobCatalog(
+        loader=lambda: fetch_all_jobs(supabase),
+        featurize=build_job_features,
+        indexers={"keywords": build_keyword_index},
+    )
+    catalog.start()                 # restore snapshot_path, then background refresh
+    jobs = catalog.get_jobs()       # served from memory
+    feats = catalog.snapshot().features
+    catalog.request_refresh()       # after a write, reload without waiting the TTL
+
+    catalog = JobCatalog(
+        loader=lambda: fetch_all_jobs(supabase),
+        watermark=latest_updated_at,            # called right before each full load
+        delta_loader=fetch_jobs_updated_since,  # since -> (changed rows, next watermark)
+        snapshot_path=os.path.join(private_state_dir(), "catalog.snapshot"),
+        shared=True,                            # one loader for all the uvicorn workers
+    )
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from catalog_file import SnapshotFile, open_private, write_snapshot_file
+
+try:
+    import fcntl  # Unix only: leader election between the workers
+except ImportError:
+    fcntl = None
+
+# Durée de vie du cache (secondes) avant rechargement en arrière-plan
+CATALOG_TTL_SECONDS = int(os.getenv("CATALOG_TTL_SECONDS", "300"))
+# Avec la synchro par delta : rechargement complet au moins toutes les N secondes
+CATALOG_FULL_RELOAD_SECONDS = int(os.getenv("CATALOG_FULL_RELOAD_SECONDS", "3600"))
+# Plusieurs workers : un seul charge le catalogue, les autres suivent le fichier de snapshot
+CATALOG_SHARED = os.getenv("CATALOG_SHARED", "0") == "1"
+# Intervalle de scrutation du fichier de snapshot par les workers suiveurs (secondes)
+CATALOG_SHARED_POLL_SECONDS = int(os.getenv("CATALOG_SHARED_POLL_SECONDS", "2"))
+# Démarrage à froid d'un suiveur : attente max du premier fichier du leader avant de charger lui-même (secondes)
+CATALOG_SHARED_WAIT_SECONDS = int(os.getenv("CATALOG_SHARED_WAIT_SECONDS", "30"))
+
+
+class DeltaOverlap:
+    """
+    Re-read window of a delta_loader. Rows are read from `overlap_seconds` before
+    the watermark (updated_at is the start of the writing transaction: a slow
+    write can commit with an older timestamp); rows already applied (same key,
+    same updated_at) are skipped. Timestamps are ISO 8601 strings.
+    """
+
+    def __init__(self, overlap_seconds: int, key: str = "id", stamp: str = "updated_at"):
+        self.overlap_seconds = overlap_seconds
+        self.key = key
+        self.stamp = stamp
+        self._applied: Dict[Any, str] = {}  # key -> updated_at, dans la fenêtre
+
+    def window_start(self, since: str) -> str:
+        return (datetime.fromisoformat(since) - timedelta(seconds=self.overlap_seconds)).isoformat()
+
+    def fresh(self, rows: List[dict], start: str) -> List[dict]:
+        """Rows not applied yet; forgets the rows older than the window start."""
+        fresh = [r for r in rows if self._applied.get(r[self.key]) != r[self.stamp]]
+        for r in fresh:
+            self._applied[r[self.key]] = r[self.stamp]
+        cutoff = datetime.fromisoformat(start)
+        for key in [k for k, ts in self._applied.items() if datetime.fromisoformat(ts) < cutoff]:
+            del self._applied[key]
+        return fresh
+
+
+def is_inactive(row: dict) -> bool:
+    """Default tombstone: a soft-deleted job (is_active = false)."""
+    return row.get("is_active") is False
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one point in time."""
+
+    def __init__(
+        self,
+        jobs: List[dict],
+        version: int,
+        features: Optional[List[Any]] = None,
+        indexes: Optional[Dict[str, Any]] = None,
+    ):
+        self.jobs = jobs
+        self.features = features if features is not None else []  # aligned with jobs
+        self.indexes = indexes or {}
+        self.details: Dict[Any, Optional[dict]] = {}  # id -> heavy fields (None = not found)
+        self.version = version
+        self.path: Optional[str] = None  # snapshot file holding this version (catalog_file.py), once saved
+        self.loaded_at = time.time()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.loaded_at
+
+
+class JobCatalog:
+    """
+    Process-wide job cache with TTL-based background refresh.
+
+    - loader(): returns the full list of job dicts (e.g. fetch_all_jobs)
+    - ttl_seconds: delay between two background reloads
+    - featurize(job): optional per-job derivation stored in snapshot.features
+    - indexers: optional {name: build(features)} stored in snapshot.indexes
+    - detail_loader(ids): optional {id: heavy fields} for rows loaded without them
+    - watermark(): optional high-water mark of the table, taken before a full load
+    - delta_loader(since): optional (rows changed since the mark, next mark)
+    - key: column identifying a row across syncs
+    - is_removed(row): tombstone test for the delta rows
+    - row_of(feature): optional compact row stored in snapshot.jobs (needs featurize)
+    - snapshot_path: optional local file holding the last snapshot (warm restarts)
+    - snapshot_tag: written in that file; a file with another tag is not restored
+    - shared: one loader (leader) for all the processes using snapshot_path
+    - shared_poll_seconds: how often followers check the file for a new generation
+    - shared_wait_seconds: how long a follower with no snapshot waits for the leader's file
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], List[dict]],
+        ttl_seconds: int = CATALOG_TTL_SECONDS,
+        featurize: Optional[Callable[[dict], Any]] = None,
+        indexers: Optional[Dict[str, Callable[[List[Any]], Any]]] = None,
+        detail_loader: Optional[Callable[[List[Any]], Dict[Any, dict]]] = None,
+        watermark: Optional[Callable[[], Any]] = None,
+        delta_loader: Optional[Callable[[Any], Tuple[List[dict], Any]]] = None,
+        key: str = "id",
+        is_removed: Callable[[dict], bool] = is_inactive,
+        full_reload_seconds: int = CATALOG_FULL_RELOAD_SECONDS,
+        row_of: Optional[Callable[[Any], dict]] = None,
+        snapshot_path: Optional[str] = None,
+        snapshot_tag: Any = None,
+        shared: bool = CATALOG_SHARED,
+        shared_poll_seconds: int = CATALOG_SHARED_POLL_SECONDS,
+        shared_wait_seconds: int = CATALOG_SHARED_WAIT_SECONDS,
+    ):
+        self.loader = loader
+        self.detail_loader = detail_loader
+        self.featurize = featurize
+        self.indexers = indexers or {}
+        self.ttl_seconds = ttl_seconds
+        self.watermark = watermark
+        self.delta_loader = delta_loader
+        self.key = key
+        self.is_removed = is_removed
+        self.full_reload_seconds = full_reload_seconds
+        self.row_of = row_of if featurize else None
+        self.snapshot_path = snapshot_path
+        self.snapshot_tag = snapshot_tag
+        self.sync_state = "empty"  # empty -> restored (from snapshot_path) / following -> synced
+        self.shared_poll_seconds = shared_poll_seconds
+        self.shared_wait_seconds = shared_wait_seconds
+        self.role = "standalone"   # shared: "leader" (loads, writes the file) or "follower" (reads it)
+        if shared and snapshot_path and fcntl is None:
+            print("[catalog] Shared catalog needs fcntl (Unix): every worker loads its own catalog")
+        elif shared and snapshot_path:
+            self.role = "follower"
+        self._lock_file = None
+        self._generation: Optional[Tuple[int, int, int]] = None  # snapshot file currently served
+        self._refresh_seen = 0.0
+        self._since: Any = None           # high-water mark of the current snapshot (None = no delta)
+        self._full_loaded_at = 0.0
+        self._last_delta: Dict[str, int] = {}
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._load_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self._listeners: List[Callable[[CatalogSnapshot], None]] = []
+
+    # ----------------------------
+    # Read side
+    # ----------------------------
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, loading it synchronously on first use."""
+        snap = self._snapshot
+        if snap is None:
+            with self._load_lock:
+                snap = self._snapshot
+                if snap is None:
+                    snap = self._restore() or self._wait_for_leader() or self._reload()
+        return snap
+
+    @property
+    def loaded(self) -> bool:
+        """True once a snapshot exists (snapshot() will not block on a load)."""
+        return self._snapshot is not None
+
+    def get_jobs(self) -> List[dict]:
+        """Return the cached job list (do not mutate it)."""
+        return self.snapshot().jobs
+
+    def details(self, snapshot: CatalogSnapshot, ids: List[Any]) -> Dict[Any, dict]:
+        """Heavy fields of the given jobs; only ids never seen on this snapshot are fetched."""
+        if self.detail_loader is None:
+            return {}
+        missing = [i for i in dict.fromkeys(ids) if i not in snapshot.details]
+        if missing:
+            fetched = self.detail_loader(missing)
+            for i in missing:
+                snapshot.details[i] = fetched.get(i)
+        return {i: snapshot.details[i] for i in ids if snapshot.details.get(i) is not None}
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            "loaded": snap is not None,
+            "version": snap.version if snap else 0,
+            "jobs": len(snap.jobs) if snap else 0,
+            "age_seconds": round(snap.age_seconds, 1) if snap else None,
+            "ttl_seconds": self.ttl_seconds,
+            "last_error": self.last_error,
+            "delta_sync": self._since is not None,
+            "watermark": str(self._since) if self._since is not None else None,
+            "last_delta": self._last_delta,
+            "sync_state": self.sync_state,
+            "role": self.role,
+        }
+
+    # ----------------------------
+    # Write side
+    # ----------------------------
+
+    def refresh(self) -> CatalogSnapshot:
+        """Reload now (blocking). Concurrent callers share a single reload."""
+        with self._load_lock:
+            return self._reload()
+
+    def sync(self) -> CatalogSnapshot:
+        """Apply the rows changed since the last sync, or reload fully when a delta is not possible/due."""
+        with self._load_lock:
+            full_due = time.time() - self._full_loaded_at >= self.full_reload_seconds
+            if self._snapshot is None or self._since is None or full_due:
+                return self._reload()
+            try:
+                return self._apply_delta()
+            except Exception as e:
+                print(f"[catalog] Delta sync failed, reloading the full catalog: {e}")
+                return self._reload()
+
+    def subscribe(self, callback: Callable[[CatalogSnapshot], None]):
+        """Call callback(snapshot) after every reload (errors are logged, not raised)."""
+        self._listeners.append(callback)
+
+    def request_refresh(self):
+        """Ask the background thread (or, in a follower, the leader) to reload as soon as possible."""
+        if self.role == "follower":
+            try:
+                with open_private(f"{self.snapshot_path}.refresh"):
+                    pass
+                os.utime(f"{self.snapshot_path}.refresh")
+            except OSError as e:
+                print(f"[catalog] Could not ask the leader for a refresh: {e}")
+            return
+        self._wake.set()
+
+    def _reload(self) -> CatalogSnapshot:
+        started = time.time()
+        # Mark taken BEFORE the load: rows written during the load come back in the next delta
+        since = None
+        if self.delta_loader is not None and self.watermark is not None:
+            try:
+                since = self.watermark()
+            except Exception as e:
+                print(f"[catalog] No watermark, delta sync disabled until the next full load: {e}")
+        jobs = self.loader()
+        features = [self.featurize(j) for j in jobs] if self.featurize else None
+        if self.row_of is not None:
+            jobs = [self.row_of(f) for f in features]
+        indexes = {name: build(features) for name, build in self.indexers.items()}
+        version = (self._snapshot.version + 1) if self._snapshot else 1
+        snap = CatalogSnapshot(jobs, version, features, indexes)
+        self._since = since
+        self._full_loaded_at = started
+        print(f"[catalog] Loaded {len(jobs)} jobs (v{version}) in {time.time() - started:.2f}s")
+        self._publish(snap, save=True)
+        return snap
+
+    def _apply_delta(self) -> CatalogSnapshot:
+        started = time.time()
+        old = self._snapshot
+        rows, since = self.delta_loader(self._since)
+        changed = {row.get(self.key): row for row in rows}
+        if not changed:
+            moved = since != self._since
+            self._since = since
+            self._last_delta = {"rows": 0}
+            self.sync_state = "synced"
+            if moved:
+                self._save(old)  # même snapshot, nouveau watermark : un redémarrage repart de là
+            return old
+
+        jobs, features = [], []
+        counts = {"rows": len(changed), "updated": 0, "added": 0, "removed": 0}
+        for job, feature in zip(old.jobs, old.features or [None] * len(old.jobs)):
+            row = changed.pop(job.get(self.key), None)
+            if row is None:
+                jobs.append(job)
+                features.append(feature)
+            elif self.is_removed(row):
+                counts["removed"] += 1
+            else:
+                self._append_row(jobs, features, row)
+                counts["updated"] += 1
+        for row in changed.values():
+            if not self.is_removed(row):
+                self._append_row(jobs, features, row)
+                counts["added"] += 1
+
+        features = features if self.featurize else None
+        indexes = {name: build(features) for name, build in self.indexers.items()}
+        snap = CatalogSnapshot(jobs, old.version + 1, features, indexes)
+        self._since = since
+        self._last_delta = counts
+        self._publish(snap, save=True)
+        print(
+            f"[catalog] Delta v{snap.version}: {counts['updated']} updated, {counts['added']} added, "
+            f"{counts['removed']} removed ({len(jobs)} jobs) in {time.time() - started:.2f}s"
+        )
+        return snap
+
+    def _append_row(self, jobs: List[dict], features: List[Any], row: dict):
+        feature = self.featurize(row) if self.featurize else None
+        jobs.append(self.row_of(feature) if self.row_of is not None else row)
+        features.append(feature)
+
+    def _publish(self, snap: CatalogSnapshot, sync_state: str = "synced", save: bool = False):
+        self._snapshot = snap  # Atomic swap
+        self.sync_state = sync_state
+        self.last_error = None
+        if save:
+            self._save(snap)  # avant les listeners : ils peuvent lire snap.path
+        for callback in self._listeners:
+            try:
+                callback(snap)
+            except Exception as e:
+                print(f"[catalog] Listener {getattr(callback, '__name__', callback)} failed: {e}")
+
+    # ----------------------------
+    # On-disk snapshot
+    # ----------------------------
+
+    def _save(self, snap: CatalogSnapshot):
+        """Write the snapshot to snapshot_path as a new generation (not in followers)."""
+        if not self.snapshot_path or self.role == "follower":
+            return
+        started = time.time()
+        header = {
+            "tag": self.snapshot_tag,
+            "version": snap.version,
+            "loaded_at": snap.loaded_at,
+            "since": self._since,
+            "full_loaded_at": self._full_loaded_at,
+            "jobs": len(snap.jobs),
+        }
+        # Les lignes compactes sont celles des features : le mémo pickle ne les écrit qu'une fois
+        body = (snap.jobs, snap.features if self.featurize else None, snap.indexes)
+        try:
+            size = write_snapshot_file(self.snapshot_path, header, body)
+            snap.path = self.snapshot_path
+            print(
+                f"[catalog] Snapshot v{snap.version} saved to {self.snapshot_path} "
+                f"({size / 1e6:.1f} MB) in {time.time() - started:.2f}s"
+            )
+        except Exception as e:
+            print(f"[catalog] Could not save the snapshot: {e}")
+
+    def _restore(self) -> Optional[CatalogSnapshot]:
+        """Publish the snapshot saved in snapshot_path, if any and compatible (call with _load_lock held)."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        started = time.time()
+        try:
+            snapshot_file = SnapshotFile(self.snapshot_path)
+            header = snapshot_file.header
+            if header.get("tag") != self.snapshot_tag:
+                print(f"[catalog] Ignoring snapshot {self.snapshot_path} (tag {header.get('tag')!r})")
+                return None
+            current = self._snapshot
+            if current is not None and (header["version"], header["loaded_at"]) == (current.version, current.loaded_at):
+                # Même snapshot réécrit avec un nouveau watermark (delta vide) : rien à recharger
+                self._since = header["since"]
+                self._full_loaded_at = header["full_loaded_at"]
+                self._generation = snapshot_file.generation
+                return current
+            jobs, features, saved_indexes = snapshot_file.load()
+        except Exception as e:
+            print(f"[catalog] Could not restore the snapshot {self.snapshot_path}: {e}")
+            return None
+
+        indexes = {
+            name: saved_indexes[name] if name in saved_indexes else build(features)
+            for name, build in self.indexers.items()
+        }
+        snap = CatalogSnapshot(jobs, header["version"], features, indexes)
+        snap.loaded_at = header["loaded_at"]  # age = fraîcheur des données, pas du process
+        self._since = header["since"]
+        self._full_loaded_at = header["full_loaded_at"]
+        self._generation = snapshot_file.generation
+        snap.path = self.snapshot_path
+        print(
+            f"[catalog] Restored {len(jobs)} jobs (v{snap.version}, {snap.age_seconds:.0f}s old) "
+            f"from {self.snapshot_path} in {time.time() - started:.2f}s"
+        )
+        self._publish(snap, sync_state="following" if self.role == "follower" else "restored")
+        return snap
+
+    # ----------------------------
+    # Shared catalog (leader / followers)
+    # ----------------------------
+
+    def _try_lead(self) -> bool:
+        """Take the leader lock if no other process holds it (followers only)."""
+        if self.role != "follower":
+            return False
+        try:
+            lock_file = open_private(f"{self.snapshot_path}.lock")
+        except OSError as e:
+            print(f"[catalog] Cannot open the leader lock: {e}")
+            return False
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file  # held (open) for the life of the process
+        self.role = "leader"
+        print(f"[catalog] Worker {os.getpid()} leads the catalog refresh")
+        return True
+
+    def _follow(self):
+        """Follower loop: swap to each generation the leader writes; take over when the leader is gone."""
+        while not self._stop.is_set():
+            if self._try_lead():
+                return
+            try:
+                stat = os.stat(self.snapshot_path)
+                generation = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                generation = None  # le leader n'a encore rien écrit
+            if generation is not None and generation != self._generation:
+                with self._load_lock:
+                    self._restore()
+            self._stop.wait(timeout=self.shared_poll_seconds)
+
+    def _wait_for_leader(self) -> Optional[CatalogSnapshot]:
+        """Follower with nothing to serve: wait up to shared_wait_seconds for the leader's file (call with _load_lock held)."""
+        if self.role != "follower" or self.shared_wait_seconds <= 0:
+            return None
+        print(f"[catalog] Waiting up to {self.shared_wait_seconds}s for the leader's snapshot")
+        deadline = time.time() + self.shared_wait_seconds
+        seen = None
+        # Arrêt anticipé si ce worker devient leader entre-temps : plus personne n'écrirait le fichier
+        while self.role == "follower" and time.time() < deadline and not self._stop.is_set():
+            try:
+                stat = os.stat(self.snapshot_path)
+                generation = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                generation = None
+            if generation is not None and generation != seen:
+                seen = generation
+                snap = self._restore()
+                if snap is not None:
+                    return snap
+            time.sleep(min(self.shared_poll_seconds, 0.5))
+        print("[catalog] No snapshot from the leader, loading the catalog in this worker")
+        return None
+
+    def _refresh_requested(self) -> bool:
+        """Leader: a follower touched <snapshot_path>.refresh since the last check."""
+        if self.role != "leader":
+            return False
+        try:
+            requested_at = os.stat(f"{self.snapshot_path}.refresh").st_mtime
+        except OSError:
+            return False
+        if requested_at <= self._refresh_seen:
+            return False
+        self._refresh_seen = requested_at
+        return True
+
+    # ----------------------------
+    # Background refresh
+    # ----------------------------
+
+    def start(self):
+        """Restore the on-disk snapshot (if any), then start the background refresh thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._try_lead()
+        # Restauré avant de rendre la main : le process sert dès qu'il accepte des connexions
+        if self._snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self._restore()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-catalog-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._lock_file is not None:
+            self._lock_file.close()  # releases the lock: a follower takes over
+            self._lock_file = None
+            self.role = "follower"
+
+    def _run(self):
+        if self.role == "follower":
+            self._follow()  # returns once this worker becomes the leader (or on stop)
+        # Warm the cache (or catch up with the restored snapshot) right away so the first /match does not pay for it
+        if self.sync_state != "synced" and not self._stop.is_set():
+            self._safe_refresh()
+
+        # Leader : réveil fréquent pour les demandes de rafraîchissement des suiveurs
+        wait_seconds = min(self.ttl_seconds, self.shared_poll_seconds) if self.role == "leader" else self.ttl_seconds
+        last_sync = time.time()
+        while not self._stop.is_set():
+            woke = self._wake.wait(timeout=wait_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            due = self.role != "leader" or time.time() - last_sync >= self.ttl_seconds  # hors leader : délai = TTL
+            if woke or due or self._refresh_requested():
+                self._safe_refresh()
+                last_sync = time.time()
+
+    def _safe_refresh(self):
+        try:
+            self.sync()
+        except Exception as e:
+            # Keep serving the previous snapshot
+            self.last_error = str(e)
+            print(f"[catalog] Refresh failed, keeping previous snapshot: {e}")
@@ -10,6 +10,10 @@ from pydantic import BaseModel, Field
 import google.generativeai as genai
 from bs4 import BeautifulSoup
 
+from blocking_io import run_blocking
+from keyword_matcher import KeywordMatcher, compile_keywords
+from metrics import timed
+
 
 # ----------------------------
 # Models
@@ -47,13 +51,7 @@ def _extract_json_object(text: str) -> str:
 
 
 def _contains_kw(text: str, kw: str) -> bool:
-    kw = (kw or "").lower().strip()
-    if not kw:
-        return False
-    t = (text or "").lower()
-    if " " in kw:
-        return kw in t
-    return re.search(rf"\b{re.escape(kw)}\b", t) is not None
+    return compile_keywords((kw or "",)).search((text or "").lower())
 
 
 def _default_headers() -> Dict[str, str]:
@@ -92,6 +90,9 @@ COMMON_SKILLS = [
     "docker", "kubernetes", "aws", "gcp", "azure", "linux", "terraform", "ci/cd",
 ]
 
+# Compiled once: extract_skills scans each text in a single pass
+COMMON_SKILLS_MATCHER = KeywordMatcher(COMMON_SKILLS)
+
 SKILL_SYNONYMS = {
     "node.js": "nodejs",
     "node": "nodejs",
@@ -142,7 +143,7 @@ class JobService:
             url = f"https://duckduckgo.com/html/?q={q}"
             
             # On va vite (timeout 10s) et on se déguise (headers)
-            r = requests.get(url, headers=_default_headers(), timeout=10)
+            r = await run_blocking(timed("duckduckgo", "html_search", requests.get), url, headers=_default_headers(), timeout=10)
             if r.status_code != 200:
                 return ""
 
@@ -194,7 +195,7 @@ DESCRIPTION: {description}
 JOB_TITLES: {titles[:15]}
 """
 
-        res = self.model.generate_content(prompt)
+        res = await run_blocking(timed("gemini", "generate_content", self.model.generate_content), prompt)
         raw_text = getattr(res, "text", None) or str(res)
         json_str = _extract_json_object(raw_text)
         data = json.loads(json_str)
@@ -213,7 +214,7 @@ JOB_TITLES: {titles[:15]}
             return ""
 
         try:
-            r = requests.get(url, headers=_default_headers(), timeout=15)
+            r = await run_blocking(timed("web", "job_page", requests.get), url, headers=_default_headers(), timeout=15)
             if r.status_code != 200:
                 return ""
             text = _extract_visible_text_from_html(r.text)
@@ -232,10 +233,11 @@ JOB_TITLES: {titles[:15]}
         Returns a list of matched skills (normalized, deduplicated).
         """
         t = (text or "").lower()
+        hits = COMMON_SKILLS_MATCHER.find_all(t)
         found = []
 
         for s in COMMON_SKILLS:
-            if _contains_kw(t, s):
+            if s in hits:
                 found.append(_normalize_skill(s))
 
         # Deduplicate while preserving order
@@ -0,0 +1,283 @@
+"""
+Inverted Keyword Index & Boolean Keyword Queries
+=================================================
+
+Lets /match drop the jobs rejected by `must_have_keywords` / `exclude_keywords`
+BEFORE scoring, with set operations instead of a text scan per job.
+
+KeywordIndex (built once per catalog snapshot):
+    - token -> span of job positions (position = index in snapshot.features),
+      in increasing order, in one flat array('I'); 4 bytes per entry instead of
+      a set slot. Pickled (catalog snapshot file) as one out-of-band buffer:
+      the workers mapping the same file share the positions.
+    - phrases / punctuated keywords ("machine learning", "ci/cd") are resolved
+      on first use with a scan of the job blobs, then memoized.
+
+Query syntax (one query per list entry, entries are OR-ed like before):
+    python                      -> mot simple (word boundary)
+    machine learning            -> phrase (substring), as before
+    "machine learning" AND python
+    react OR vue
+    NOT stage
+    (python OR go) AND NOT "head of"
+
+Operators are only recognized in UPPERCASE. An entry without AND/OR/NOT or
+quotes is a plain keyword, exactly like the old behavior. An entry that does
+not parse is also treated as a plain keyword.
+"""
+
+import pickle
+import re
+from array import array
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from keyword_matcher import KeywordMatcher, compile_keywords
+
+_QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+_OPERATORS = {"AND", "OR", "NOT"}
+_WORD_RE = re.compile(r"\w+")
+
+
+# ============================================================
+# 1. INVERTED INDEX
+# ============================================================
+
+class KeywordIndex:
+    """
+    Inverted index over the `tokens` / `full_text` of JobFeatures
+    (or any other text/tokens pair, e.g. contract_blob / contract_tokens).
+    """
+
+    def __init__(self, features: List, text_attr: str = "full_text", tokens_attr: str = "tokens"):
+        self.features = features
+        self.size = len(features)
+        self.text_attr = text_attr
+        postings: Dict[str, Any] = {}
+        for pos, f in enumerate(features):
+            for token in getattr(f, tokens_attr):
+                positions = postings.get(token)
+                if positions is None:
+                    positions = postings[token] = array("I")
+                positions.append(pos)
+        # Un seul tableau plat : positions du slot i = _positions[_bounds[i]:_bounds[i + 1]].
+        # Le tableau de chaque token est libéré dès sa copie (token -> slot à sa place)
+        self._positions = array("I")
+        self._bounds = array("I", [0])
+        for slot, (token, positions) in enumerate(postings.items()):
+            self._positions.extend(positions)
+            self._bounds.append(len(self._positions))
+            postings[token] = slot
+        self._slots: Dict[str, int] = postings
+        self._texts = [getattr(f, text_attr) for f in features]
+        self._term_cache: Dict[str, FrozenSet[int]] = {}
+
+    def __getstate__(self) -> dict:
+        # Pickled into the catalog snapshot file: the arrays go out-of-band
+        # (protocol 5), the term cache is rebuilt on demand
+        state = dict(self.__dict__)
+        state["_positions"] = pickle.PickleBuffer(self._positions)
+        state["_bounds"] = pickle.PickleBuffer(self._bounds)
+        state["_term_cache"] = {}
+        return state
+
+    def __setstate__(self, state: dict):
+        # Out-of-band: read-only views on the mapped file; in-band: bytes
+        state["_positions"] = memoryview(state["_positions"]).cast("B").cast("I")
+        state["_bounds"] = memoryview(state["_bounds"]).cast("B").cast("I")
+        self.__dict__.update(state)
+
+    def all_positions(self) -> Set[int]:
+        return set(range(self.size))
+
+    def lookup(self, term: str) -> FrozenSet[int]:
+        """Positions of the jobs containing term (same semantics as contains_kw)."""
+        term = (term or "").lower().strip()
+        if not term:
+            return frozenset()
+        if _WORD_RE.fullmatch(term):
+            slot = self._slots.get(term)
+            if slot is None:
+                return frozenset()
+            return frozenset(self._positions[self._bounds[slot]:self._bounds[slot + 1]])
+
+        cached = self._term_cache.get(term)
+        if cached is None:
+            matcher = compile_keywords((term,))
+            cached = frozenset(pos for pos, text in enumerate(self._texts) if matcher.search(text))
+            if len(self._term_cache) < 4096:
+                self._term_cache[term] = cached
+        return cached
+
+
+def build_keyword_index(features: List) -> KeywordIndex:
+    return KeywordIndex(features)
+
+
+# ============================================================
+# 2. BOOLEAN QUERY AST
+# ============================================================
+
+class _Term:
+    def __init__(self, term: str):
+        self.term = term
+
+    def matches(self, text: str, tokens) -> bool:
+        return compile_keywords((self.term,)).search(text, tokens)
+
+    def evaluate(self, index: KeywordIndex) -> Set[int]:
+        return set(index.lookup(self.term))
+
+
+class _Not:
+    def __init__(self, child):
+        self.child = child
+
+    def matches(self, text: str, tokens) -> bool:
+        return not self.child.matches(text, tokens)
+
+    def evaluate(self, index: KeywordIndex) -> Set[int]:
+        return index.all_positions() - self.child.evaluate(index)
+
+
+class _And:
+    def __init__(self, children: list):
+        self.children = children
+
+    def matches(self, text: str, tokens) -> bool:
+        return all(c.matches(text, tokens) for c in self.children)
+
+    def evaluate(self, index: KeywordIndex) -> Set[int]:
+        result = self.children[0].evaluate(index)
+        for c in self.children[1:]:
+            if not result:
+                break
+            result &= c.evaluate(index)
+        return result
+
+
+class _Or:
+    def __init__(self, children: list):
+        self.children = children
+
+    def matches(self, text: str, tokens) -> bool:
+        return any(c.matches(text, tokens) for c in self.children)
+
+    def evaluate(self, index: KeywordIndex) -> Set[int]:
+        result: Set[int] = set()
+        for c in self.children:
+            result |= c.evaluate(index)
+        return result
+
+
+class _Parser:
+    """Recursive descent: or_expr := and_expr (OR and_expr)* ; and_expr := not_expr (AND not_expr)*"""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> str:
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected token: {self.peek()}")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else _Or(children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() == "AND":
+            self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else _And(children)
+
+    def parse_not(self):
+        if self.peek() == "NOT":
+            self.take()
+            return _Not(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        tok = self.peek()
+        if tok is None or tok in _OPERATORS or tok == ")":
+            raise ValueError("Expected a keyword")
+        if tok == "(":
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise ValueError("Missing ')'")
+            self.take()
+            return node
+        if tok.startswith('"'):
+            self.take()
+            return _Term(tok.strip('"').lower().strip())
+        # Consecutive bare words form a phrase ("machine learning")
+        words = []
+        while self.peek() is not None and self.peek() not in _OPERATORS and self.peek() not in ("(", ")") \
+                and not self.peek().startswith('"'):
+            words.append(self.take().lower())
+        return _Term(" ".join(words))
+
+
+def _is_boolean(entry: str) -> bool:
+    return '"' in entry or any(tok in _OPERATORS for tok in entry.split())
+
+
+def parse_keyword_query(entry: str):
+    """Parse one list entry. Returns None for a plain keyword (legacy semantics)."""
+    if not _is_boolean(entry):
+        return None
+    try:
+        return _Parser(_QUERY_TOKEN_RE.findall(entry)).parse()
+    except (ValueError, IndexError):
+        return None
+
+
+# ============================================================
+# 3. KEYWORD FILTER (une liste de préférences = OR des entrées)
+# ============================================================
+
+class KeywordFilter:
+    """
+    A `must_have_keywords` / `exclude_keywords` list compiled once per request.
+    Plain entries share one KeywordMatcher, boolean entries are parsed queries.
+    `search()` has the KeywordMatcher signature so score_job can use it as-is.
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        plain: List[str] = []
+        self.queries = []
+        for entry in entries:
+            node = parse_keyword_query(entry or "")
+            if node is None:
+                plain.append(entry)
+            else:
+                self.queries.append(node)
+        self.plain: KeywordMatcher = compile_keywords(plain)
+
+    def search(self, text: str, tokens=None) -> bool:
+        if self.plain.search(text, tokens):
+            return True
+        return any(q.matches(text, tokens) for q in self.queries)
+
+    def evaluate(self, index: KeywordIndex) -> Set[int]:
+        """Positions of the jobs matching at least one entry."""
+        result: Set[int] = set()
+        for kw in self.plain.keywords:
+            result |= index.lookup(kw)
+        for q in self.queries:
+            result |= q.evaluate(index)
+        return result
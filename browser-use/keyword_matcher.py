@@ -0,0 +1,124 @@
+"""
+Compiled Keyword Matcher
+========================
+
+Replaces the per-call `re.search(rf"\\b{kw}\\b", text)` pattern of `contains_kw`
+with a matcher compiled ONCE per keyword set, that finds every hit in a single
+pass over the text.
+
+Same semantics as `contains_kw`:
+    - Multi-word phrases ("machine learning"): plain substring match
+    - Single words ("intern"): word-boundary match ("internal" does NOT match)
+
+How:
+    - Pure word keywords (python, react, ia...) match iff they are a whole \\w+ token
+      of the text -> one tokenization pass + set lookups.
+    - The rest (phrases, "ci/cd", "c++", "5+ years"...) go through one lookahead
+      regex. Keywords that are prefixes of each other ("fine" / "fine-tuning")
+      are split into separate layers so overlapping hits are never lost.
+
+Usage:
+    matcher = compile_keywords(["junior", "stage", "entry level"])
+    matcher.search("stage data engineer")        # True
+    matcher.find_all("stage data engineer")      # {"stage"}
+
+Texts are expected to be lowercased by the caller (like contains_kw).
+"""
+
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Set
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """All \\w+ tokens of a (lowercased) text."""
+    return frozenset(_WORD_RE.findall(text or ""))
+
+
+def _normalize_kw(kw: str) -> str:
+    return (kw or "").lower().strip()
+
+
+def _kw_pattern(kw: str) -> str:
+    if " " in kw:
+        return re.escape(kw)
+    return rf"\b{re.escape(kw)}\b"
+
+
+def _split_layers(keywords: List[str]) -> List[List[str]]:
+    """
+    Group keywords so that no keyword of a layer is a prefix of another one.
+    Inside a layer at most one keyword can start at a given position,
+    so a lookahead alternation reports all of them.
+    """
+    layers: List[List[str]] = []
+    for kw in sorted(keywords, key=len):
+        for layer in layers:
+            if not any(kw.startswith(other) for other in layer):
+                layer.append(kw)
+                break
+        else:
+            layers.append([kw])
+    return layers
+
+
+class KeywordMatcher:
+    """Keyword set compiled once, matched in one pass."""
+
+    def __init__(self, keywords: Iterable[str]):
+        normalized = []
+        for kw in keywords:
+            kw = _normalize_kw(kw)
+            if kw and kw not in normalized:
+                normalized.append(kw)
+        self.keywords = tuple(normalized)
+
+        self._words = frozenset(kw for kw in normalized if _WORD_RE.fullmatch(kw))
+        others = [kw for kw in normalized if kw not in self._words]
+
+        # One regex for "any hit?", one lookahead regex per layer for "all hits"
+        self._any_re = re.compile("|".join(_kw_pattern(kw) for kw in others)) if others else None
+        self._layers = [
+            re.compile("(?=(" + "|".join(_kw_pattern(kw) for kw in sorted(layer, key=len, reverse=True)) + "))")
+            for layer in _split_layers(others)
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.keywords)
+
+    def find_all(self, text: str, tokens: Optional[FrozenSet[str]] = None) -> Set[str]:
+        """Return the set of (normalized) keywords present in text."""
+        if not text or not self.keywords:
+            return set()
+        hits: Set[str] = set()
+        if self._words:
+            if tokens is None:
+                tokens = tokenize(text)
+            hits.update(self._words & tokens)
+        for layer_re in self._layers:
+            hits.update(layer_re.findall(text))
+        return hits
+
+    def search(self, text: str, tokens: Optional[FrozenSet[str]] = None) -> bool:
+        """True if at least one keyword is present in text."""
+        if not text or not self.keywords:
+            return False
+        if self._any_re is not None and self._any_re.search(text):
+            return True
+        if self._words:
+            if tokens is None:
+                tokens = tokenize(text)
+            return not self._words.isdisjoint(tokens)
+        return False
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(keywords: tuple) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def compile_keywords(keywords: Iterable[str]) -> KeywordMatcher:
+    """Cached constructor: the same keyword list is only compiled once."""
+    return _compile_cached(tuple(keywords))
@@ -0,0 +1,127 @@
+"""
+Match Result Cache (LRU + TTL)
+==============================
+
+Many users send the same MatchRequest (same skills, same objective template,
+default SearchPreferences) and the frontend re-requests on navigation.
+The rendered response of /match and /match-by-company is cached under a
+canonical key, so a repeat request is a dict lookup.
+
+Canonical key (sha256 of):
+    - endpoint
+    - catalog version      -> a catalog reload never serves stale results
+    - skills               -> normalize_skill() of each, as a sorted set
+    - objective            -> lowercased, stripped
+    - preferences          -> sorted keys; OR-ed lists (exclude / must_have /
+                              contract_types) sorted, target_roles kept in order
+                              (it drives the order of `matched_intent`)
+
+The cache is also cleared on every catalog reload (JobCatalog.subscribe) so
+old entries do not hold memory until they expire.
+
+Config (.env):
+    MATCH_CACHE_SIZE=1024          # entries, 0 = disabled
+    MATCH_CACHE_TTL_SECONDS=300
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from matching import normalize_skill
+
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "1024"))
+MATCH_CACHE_TTL_SECONDS = int(os.getenv("MATCH_CACHE_TTL_SECONDS", "300"))
+
+# Listes de préférences dont l'ordre ne change pas le résultat (entrées OR-ées)
+_UNORDERED_PREFS = ("exclude_keywords", "must_have_keywords", "contract_types")
+
+
+def match_cache_key(endpoint: str, user_profile, preferences, catalog_version: int) -> str:
+    """Same key for requests that are guaranteed to produce the same response."""
+    prefs = preferences.model_dump() if preferences is not None else {}
+    for name in _UNORDERED_PREFS:
+        if name in prefs:
+            prefs[name] = sorted(prefs[name])
+    payload = {
+        "endpoint": endpoint,
+        "catalog": catalog_version,
+        "skills": sorted({normalize_skill(s) for s in user_profile.skills}),
+        "objective": (user_profile.objectif or "").lower().strip(),
+        "preferences": prefs,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MatchCache:
+    """Thread-safe LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = MATCH_CACHE_SIZE, ttl_seconds: int = MATCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, *_):
+        """Drop every entry. Accepts (and ignores) a snapshot: usable as a catalog listener."""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,196 @@
+"""
+Cursor Pagination for Match Results
+===================================
+
+/match stops at MATCH_PAGE_SIZE jobs and /match-by-company at
+COMPANY_PAGE_SIZE companies. When there is more, the response carries an
+opaque `next_cursor`; sending it back (MatchRequest.cursor) returns the next
+page without rescoring.
+
+- The first page is computed as usual (top-K) and registers a RankedResult:
+  the catalog snapshot it was computed on + the MatchQuery + the totals.
+- The first time a deeper page is asked, every match of that query is scored
+  once (no result dicts) and ranked; the ranking is kept in the RankedResult.
+  Later pages only slice it and build the dicts of that page.
+- The snapshot is held by reference: pages stay consistent even if the
+  catalog is reloaded meanwhile.
+- RankedResults live in an LRU+TTL store (MATCH_CURSOR_TTL_SECONDS), in the
+  process that served the first page. The cursor also carries the request
+  (user_profile + preferences): a worker that does not hold the result (other
+  uvicorn worker, result expired or evicted) validates it again, ranks it on
+  its current catalog and registers the result under a new id of its own
+  (the next cursors carry it). Such a page reflects the current catalog
+  rather than the first page's snapshot.
+- A first page served from the MatchCache carries the cursor it was rendered
+  with: the cache entry holds its RankedResult and puts it back in the store
+  (keep) on every hit, so a cached page never hands out an evicted cursor.
+  The store holds at least MATCH_CACHE_SIZE results.
+
+Cursor = base64url(zlib(JSON {"id", "offset", "page_size", "kind", "request"}))
++ "." + base64url(HMAC-SHA256). Only cursors issued by the server are
+accepted: a client cannot pick the result id nor make up a request to be
+ranked outside the MatchCache. The key is shared by every worker:
+MATCH_CURSOR_SECRET (required when several hosts serve the API), else a key
+generated once in catalog_file.private_state_dir() (cursor.key, 0600).
+Result ids must look like the ids ResultPages creates, and page_size is
+capped at MAX_PAGE_SIZE.
+
+Config (.env):
+    MATCH_PAGE_SIZE=200
+    COMPANY_PAGE_SIZE=25
+    MATCH_CURSOR_TTL_SECONDS=600
+    MATCH_CURSOR_MAX_RESULTS=1024   # at least MATCH_CACHE_SIZE
+    MATCH_CURSOR_SECRET=            # empty = key file shared by the workers of the host
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import zlib
+from typing import Any, List, Optional, Tuple
+
+from catalog_file import open_private, private_state_dir
+from match_cache import MATCH_CACHE_SIZE, MatchCache
+
+try:
+    import fcntl  # Unix only: one key for all the workers of the host
+except ImportError:
+    fcntl = None
+
+MATCH_PAGE_SIZE = int(os.getenv("MATCH_PAGE_SIZE", "200"))
+COMPANY_PAGE_SIZE = int(os.getenv("COMPANY_PAGE_SIZE", "25"))
+MATCH_CURSOR_TTL_SECONDS = int(os.getenv("MATCH_CURSOR_TTL_SECONDS", "600"))
+# Taille de page max (MatchRequest.page_size et curseurs)
+MAX_PAGE_SIZE = 1000
+# Taille max d'un curseur décompressé (protège contre un curseur forgé très compressible)
+_MAX_CURSOR_BYTES = 64 * 1024
+# Au moins autant que de réponses en cache : chaque réponse cachée garde son curseur vivant
+MATCH_CURSOR_MAX_RESULTS = max(int(os.getenv("MATCH_CURSOR_MAX_RESULTS", "1024")), MATCH_CACHE_SIZE)
+# Clé HMAC des curseurs, la même pour tous les workers (vide = fichier cursor.key du dossier d'état privé)
+MATCH_CURSOR_SECRET = os.getenv("MATCH_CURSOR_SECRET", "")
+# Forme des ids créés par ResultPages (secrets.token_urlsafe(12))
+_RESULT_ID = re.compile(r"[A-Za-z0-9_-]{16}\Z")
+_cursor_key: Optional[bytes] = None
+
+
+class RankedResult:
+    """Server-side state behind a cursor: one query on one catalog snapshot."""
+
+    def __init__(self, kind: str, snapshot, query, totals: dict, scored=None, request: Optional[dict] = None):
+        self.kind = kind          # "jobs" (/match) or "companies" (/match-by-company)
+        self.snapshot = snapshot  # CatalogSnapshot the first page was computed on
+        self.query = query        # MatchQuery
+        self.request = request    # {"user_profile", "preferences"} (JSON), carried by the cursors
+        self.totals = totals      # counters repeated on every page (total_jobs, matched...)
+        self.scored = scored      # ScoredJobs (every match, no dicts), computed on demand
+        self.order: Optional[List[Any]] = None  # rows, or (company, rows), best first
+        self.id: Optional[str] = None  # set by ResultPages.create
+
+
+class ResultPages:
+    """Short-lived store of RankedResults, addressed by random ids."""
+
+    def __init__(self, ttl_seconds: int = MATCH_CURSOR_TTL_SECONDS, max_results: int = MATCH_CURSOR_MAX_RESULTS):
+        self._results = MatchCache(max_entries=max_results, ttl_seconds=ttl_seconds)
+
+    def create(self, result: RankedResult) -> str:
+        result_id = secrets.token_urlsafe(12)
+        result.id = result_id
+        self._results.put(result_id, result)
+        return result_id
+
+    def keep(self, result: RankedResult):
+        """(Re)register a created result under its id, with a fresh TTL (cached page served again)."""
+        self._results.put(result.id, result)
+
+    def get(self, result_id: str) -> Optional[RankedResult]:
+        return self._results.get(result_id)
+
+    def stats(self) -> dict:
+        return self._results.stats()
+
+
+def load_cursor_key(path: str) -> bytes:
+    """Key stored at path (0600), generated by the first worker that asks for it."""
+    with open_private(path) as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # relâché à la fermeture
+        key = f.read().strip()
+        if not key:
+            key = secrets.token_hex(32)
+            f.write(key)
+    return key.encode("ascii")
+
+
+def cursor_key() -> bytes:
+    global _cursor_key
+    if _cursor_key is None:
+        if MATCH_CURSOR_SECRET:
+            _cursor_key = MATCH_CURSOR_SECRET.encode("utf-8")
+        else:
+            try:
+                _cursor_key = load_cursor_key(os.path.join(private_state_dir(), "cursor.key"))
+            except OSError as e:
+                print(f"[!] No private directory for the cursor key ({e}). Set MATCH_CURSOR_SECRET: "
+                      "cursors now only work on the worker that issued them.")
+                _cursor_key = secrets.token_bytes(32)
+    return _cursor_key
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    # validate=True : un caractère hors alphabet est une erreur (pas ignoré)
+    return base64.b64decode(text + "=" * (-len(text) % 4), altchars=b"-_", validate=True)
+
+
+def sign_cursor(body: str) -> str:
+    """body + "." + its HMAC."""
+    mac = hmac.new(cursor_key(), body.encode("ascii"), hashlib.sha256).digest()
+    return f"{body}.{_b64(mac)}"
+
+
+def encode_cursor(result_id: str, offset: int, page_size: int, kind: str, request: Optional[dict]) -> str:
+    payload = {"id": result_id, "offset": offset, "page_size": page_size, "kind": kind, "request": request}
+    raw = zlib.compress(json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 9)
+    return sign_cursor(_b64(raw))
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, int, str, Optional[dict]]:
+    """(result id, offset, page size, kind, request). Raises ValueError on a malformed or unsigned cursor."""
+    body = cursor.partition(".")[0]
+    try:
+        # Signature vérifiée avant de décompresser quoi que ce soit
+        if not hmac.compare_digest(sign_cursor(body).encode("ascii"), cursor.encode("utf-8")):
+            raise ValueError("bad signature")
+        raw = _unb64(body)
+        inflater = zlib.decompressobj()
+        data = inflater.decompress(raw, _MAX_CURSOR_BYTES)
+        if inflater.unconsumed_tail or not inflater.eof:
+            raise ValueError("cursor too large or truncated")
+        payload = json.loads(data.decode("utf-8"))
+        result_id, offset, page_size = payload["id"], payload["offset"], payload["page_size"]
+        kind, request = payload["kind"], payload["request"]
+    except (binascii.Error, zlib.error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(result_id, str) or not _RESULT_ID.match(result_id):
+        raise ValueError("Invalid cursor")
+    if not isinstance(kind, str) or not isinstance(request, (dict, type(None))):
+        raise ValueError("Invalid cursor")
+    if type(offset) is not int or type(page_size) is not int or offset < 0 or not 0 < page_size <= MAX_PAGE_SIZE:
+        raise ValueError("Invalid cursor")
+    return result_id, offset, page_size, kind, request
+
+
+def next_cursor(result: RankedResult, offset: int, page_size: int, total: int) -> Optional[str]:
+    """Cursor of the page after [offset, offset + page_size) of a registered result, None on the last page."""
+    if offset + page_size >= total:
+        return None
+    return encode_cursor(result.id, offset + page_size, page_size, result.kind, result.request)
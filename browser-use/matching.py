@@ -0,0 +1,827 @@
+"""
+Matching Engine
+===============
+
+Le moteur de scoring utilisé par /match et /match-by-company.
+
+Séparé en deux moitiés pour ne pas refaire le même travail à chaque requête :
+    - JobFeatures : tout ce qui ne dépend QUE du job (blob texte, tokens, skills
+      normalisés, signaux d'embauche, hits de mots-clés par rôle).
+      Calculé une fois quand le catalogue est (re)chargé.
+    - MatchQuery : tout ce qui ne dépend QUE de l'utilisateur (skills, rôles
+      inférés, filtres compilés). Calculé une fois par requête.
+
+score_job(query, features) combine les deux. score_catalog() score tout le
+catalogue en éliminant d'abord, via l'index inversé (keyword_index.py), les jobs
+rejetés par must_have/exclude. compute_job_match_score() garde l'ancienne
+signature (profil, dict job, préférences) pour les appels ponctuels.
+
+Quand on ne veut que les K meilleurs (/match : 200), top_k_catalog() garde un
+tas borné et saute les jobs dont le score maximum atteignable (score_upper_bound)
+ne peut pas entrer dans le top K. Seuls les jobs renvoyés deviennent des dicts.
+/match-by-company classe les entreprises à partir des scores (evaluate_catalog)
+via l'index des entreprises (company_index.py).
+
+Les JobFeatures les plus coûteuses (blob, skills, hits de rôles, signaux
+senior / embauche) sont aussi matérialisées en base à l'ingestion
+(materialize_match_columns) : une ligne qui les porte, à la version
+MATCH_FEATURES_VERSION, n'est pas recalculée au chargement.
+
+En mémoire, un job du catalogue ne garde que sa fiche (CatalogJob : slots,
+chaînes répétées internées) et ses features ; les valeurs identiques d'un job à
+l'autre (sets de skills, hits par rôle) ne sont stockées qu'une fois.
+"""
+
+import heapq
+import json
+import re
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from keyword_index import KeywordFilter, KeywordIndex
+from keyword_matcher import KeywordMatcher, compile_keywords, tokenize
+
+# ============================================================
+# 1. MATCHING CONSTANTS (Le Dictionnaire du Recruteur)
+# ============================================================
+# On définit ici les règles du jeu pour le matching.
+
+# Poids des critères pour le score final (Total = 100)
+MATCH_WEIGHTS = {
+    "skill_overlap": 65,  # Les compétences techniques comptent le plus
+    "objective_fit": 30,  # Est-ce que c'est le bon poste visé ?
+    "hiring_signal": 5,   # Bonus si mots clés "junior", "alternance"...
+}
+
+# Synonymes pour normaliser les compétences (Ex: "js" devient "javascript")
+# Ça évite de rater un match juste à cause d'une abréviation.
+SKILL_SYNONYMS: Dict[str, str] = {
+    "js": "javascript",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "react.js": "react",
+    "next": "nextjs",
+    "next.js": "nextjs",
+    "py": "python",
+    "postgres": "postgresql",
+}
+
+# Si le job mentionne "Frontend", on suppose qu'il faut ces skills :
+ROLE_TO_SKILLS: Dict[str, List[str]] = {
+    "frontend": ["react", "javascript", "typescript", "html", "css"],
+    "backend": ["nodejs", "python", "fastapi", "django", "express", "sql"],
+    "data science": ["python", "sql", "machine learning"],
+    "ml": ["python", "machine learning", "ml", "ai"],  # Ajouté pour ML/AI
+}
+
+# Mots-clés pour deviner le rôle si ce n'est pas explicite
+ROLE_KEYWORDS: Dict[str, List[str]] = {
+    "frontend": ["frontend", "react", "vue", "angular", "nextjs", "javascript", "typescript"],
+    "backend": ["backend", "api", "fastapi", "django", "nodejs", "express", "python", "java", "spring"],
+    "fullstack": ["full stack", "fullstack", "frontend", "backend"],
+    "data": ["data", "data engineer", "data analyst", "sql", "etl", "warehouse"],
+    "ml_ai": ["ml", "machine learning", "ai", "ia", "intelligence artificielle", "deep learning", "nlp", "genai", "gen ai", "llm", "rag", "gpt"],
+    "devops": ["devops", "sre", "docker", "kubernetes", "ci/cd", "cloud", "aws", "gcp", "azure"],
+    "security": ["security", "cyber", "pentest", "soc", "siem"],
+}
+
+# Rôles explicites (quand l'utilisateur sélectionne "Je veux des jobs AI")
+# Plus strict que ROLE_KEYWORDS - utilisé pour le filtre d'intention
+PREFERENCE_ROLES: Dict[str, List[str]] = {
+    "ai_engineer": ["ai", "ia", "intelligence artificielle", "genai", "llm", "rag", "embedding", "fine-tuning", "nlp"],
+    "ml_engineer": ["machine learning", "ml", "deep learning", "model", "training", "inference", "pipeline"],
+    "backend": ["backend", "api", "fastapi", "django", "express", "microservices"],
+    "frontend": ["frontend", "react", "nextjs", "vue", "angular", "typescript"],
+    "data_engineer": ["data engineer", "etl", "pipeline", "warehouse", "spark", "airflow", "dbt"],
+}
+
+# Signaux d'embauche (cherchés dans "contrat + titre")
+TARGET_TERMS = ["alternance", "apprentissage", "contrat pro", "internship"]  # Le Graal
+JUNIOR_TERMS = ["junior", "stage", "intern", "entry level", "débutant"]      # Bien
+SENIOR_TERMS = ["senior", "lead", "principal", "staff", "manager", "head of", "director", "5+ years", "10 ans", "expert"]  # Attention
+
+# Matchers compilés une seule fois (cf. keyword_matcher.py)
+TARGET_MATCHER = KeywordMatcher(TARGET_TERMS)
+JUNIOR_MATCHER = KeywordMatcher(JUNIOR_TERMS)
+SENIOR_MATCHER = KeywordMatcher(SENIOR_TERMS)
+# Tous les mots-clés de rôles : un seul passage sur le texte du job
+ROLE_MATCHER = KeywordMatcher(
+    [kw for kws in ROLE_KEYWORDS.values() for kw in kws]
+    + [kw for kws in PREFERENCE_ROLES.values() for kw in kws]
+)
+
+# Mots-clés d'intention quand l'utilisateur coche un rôle (PREFERENCE_ROLES prioritaire)
+INTENT_ROLE_KEYWORDS: Dict[str, List[str]] = {**ROLE_KEYWORDS, **PREFERENCE_ROLES}
+
+# Version des colonnes de matching stockées en base (migrations/add_match_feature_columns.sql).
+# À incrémenter dès que le calcul des JobFeatures ou les constantes ci-dessus changent :
+# les lignes d'une autre version sont recalculées au chargement, puis par backfill_match_features.py.
+MATCH_FEATURES_VERSION = 1
+
+# Colonnes dont dépendent les features : si l'une change, les colonnes matérialisées sont périmées
+MATCH_SOURCE_COLUMNS = ("title", "job_description", "sector", "stack", "skills_extracted", "contract_type")
+
+# ============================================================
+# 2. PYDANTIC MODELS (Le Contrat d'Interface)
+# ============================================================
+
+# Ce que le Frontend nous envoie pour définir l'utilisateur
+class UserProfile(BaseModel):
+    skills: List[str] = Field(default_factory=list) # Ex: ["Python", "React"]
+    objectif: str = ""  # Ex: "Je cherche une alternance Backend"
+
+# Les préférences de recherche (Filtres)
+class SearchPreferences(BaseModel):
+    target_roles: List[str] = Field(default_factory=list)  # Ex: ["backend", "ai_engineer"]
+    exclude_keywords: List[str] = Field(default_factory=list)  # Mots à éviter (syntaxe AND/OR/NOT acceptée)
+    must_have_keywords: List[str] = Field(default_factory=list)  # Mots obligatoires (syntaxe AND/OR/NOT acceptée)
+    contract_types: List[str] = Field(default_factory=list)  # Ex: ["alternance", "CDI"]
+    strict_intent: bool = False  # Si True, exclut les jobs sans match d'intention
+    enriched_only: bool = False  # Si True, exclut les jobs sans description
+    min_score: int = 0
+
+
+# ============================================================
+# 3. HELPERS
+# ============================================================
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill string for consistent matching."""
+    if not skill or not skill.strip():
+        return ""
+    normalized = skill.lower().strip()
+    return SKILL_SYNONYMS.get(normalized, normalized)
+
+
+def as_list(x):
+    """Safely convert stack to list (handles string, list, None)."""
+    if x is None:
+        return []
+    if isinstance(x, list):
+        return x
+    if isinstance(x, str):
+        s = x.strip()
+        # try json list
+        if s.startswith("[") and s.endswith("]"):
+            try:
+                return json.loads(s)
+            except:
+                pass
+        # fallback comma split
+        return [p.strip() for p in s.split(",") if p.strip()]
+    return []
+
+
+def contains_kw(text: str, kw: str) -> bool:
+    """
+    Check if keyword exists in text.
+    - Multi-word phrases: substring match (e.g., "machine learning" in text)
+    - Single words: word-boundary regex to avoid false positives
+      (e.g., "intern" should NOT match "internal")
+    Hot paths should use a KeywordMatcher over the whole keyword set instead.
+    """
+    return compile_keywords((kw,)).search(text)
+
+
+def infer_user_roles(objective: str) -> set:
+    """Infer role buckets from user objective text."""
+    if not objective:
+        return set()
+    hits = ROLE_MATCHER.find_all(objective.lower())
+    matched_roles = set()
+    for role, keywords in ROLE_KEYWORDS.items():
+        if any(kw in hits for kw in keywords):
+            matched_roles.add(role)
+    return matched_roles
+
+
+# ============================================================
+# 4. JOB FEATURES (calculées une fois par job, au chargement du catalogue)
+# ============================================================
+
+# Champs gardés en mémoire pour construire les cartes (le reste de la ligne est jeté)
+CATALOG_JOB_FIELDS = (
+    "id", "external_id", "title", "company_name", "company_slug", "logo_url", "location",
+    "published_at", "contract_type", "apply_url", "suggested_outreach_roles", "enrichment_json",
+)
+# Valeurs très répétées d'un job à l'autre : une seule copie de chaque chaîne
+_INTERNED_FIELDS = frozenset({"company_name", "company_slug", "logo_url", "location", "contract_type", "title"})
+
+# Valeurs identiques partagées entre jobs (sets de skills, rôles de contact...)
+_SHARED: Dict[object, object] = {}
+_SHARED_MAX = 100_000
+
+
+def _shared(value):
+    """The stored copy equal to `value` (hashable), so equal values are kept once."""
+    found = _SHARED.get(value)
+    if found is None:
+        if len(_SHARED) >= _SHARED_MAX:
+            _SHARED.clear()
+        found = _SHARED[value] = value
+    return found
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class CatalogJob(Mapping):
+    """
+    Compact, read-only job row kept by the catalog: only CATALOG_JOB_FIELDS, in
+    slots, with repeated strings interned. Reads like the row dict it replaces
+    (get, [], `in`, {**job}); a field absent from the source row stays absent.
+    """
+
+    __slots__ = CATALOG_JOB_FIELDS
+
+    def __init__(self, row: dict):
+        for name in CATALOG_JOB_FIELDS:
+            if name in row:
+                value = row[name]
+                if name in _INTERNED_FIELDS:
+                    value = _intern(value)
+                elif name == "suggested_outreach_roles" and isinstance(value, list):
+                    value = _shared(tuple(_intern(v) for v in value))
+                setattr(self, name, value)
+
+    def __getitem__(self, key):
+        if key in _CATALOG_JOB_FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (name for name in CATALOG_JOB_FIELDS if hasattr(self, name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CatalogJob({dict(self)!r})"
+
+
+_CATALOG_JOB_FIELD_SET = frozenset(CATALOG_JOB_FIELDS)
+
+
+@lru_cache(maxsize=4096)
+def _hits_by_role(kw_hits: FrozenSet[str]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """(role_hits, intent_hits) for a set of keyword hits, shared by every job with the same hits."""
+    role_hits = {role: [kw for kw in kws if kw in kw_hits] for role, kws in ROLE_KEYWORDS.items()}
+    intent_hits = {role: [kw for kw in kws if kw in kw_hits] for role, kws in INTENT_ROLE_KEYWORDS.items()}
+    return role_hits, intent_hits
+
+
+class JobFeatures:
+    """
+    Everything the scorer needs from a job that does NOT depend on the user.
+    `job` is the compact CatalogJob used to build the response; the source row
+    (description, stack, materialized columns...) is not kept.
+    Shared values (skills, role_hits, intent_hits) must not be mutated.
+    """
+
+    __slots__ = (
+        "job", "title_lower", "full_text", "contract_blob", "contract_tokens",
+        "skills", "has_description", "is_senior", "hiring_score",
+        "role_hits", "intent_hits",
+    )
+
+    def __init__(self, job: dict):
+        job_title = job.get("title") or ""
+        contract_type = job.get("contract_type") or ""
+        # Features déjà matérialisées à l'ingestion (et à jour) ?
+        stored = job.get("match_features_version") == MATCH_FEATURES_VERSION
+
+        self.job = job if isinstance(job, CatalogJob) else CatalogJob(job)
+        self.title_lower = sys.intern(job_title.lower())
+
+        # Le Blob pour tout scanner d'un coup (déjà calculé si la ligne est compacte)
+        self.full_text = job.get("match_text")
+        if self.full_text is None:
+            self.full_text = build_match_text(job)
+        self.contract_blob = sys.intern(f"{contract_type} {job_title}".lower())
+        self.contract_tokens: FrozenSet[str] = _shared(tokenize(self.contract_blob))
+
+        # Skills du job, avec expansion des tags (Frontend -> React, JS...)
+        if stored:
+            skills = (sys.intern(s) for s in job.get("match_skills") or ())
+        else:
+            stack = as_list(job.get("stack"))
+            all_job_skills = set(stack) | set(as_list(job.get("skills_extracted")))
+            for tag in stack:
+                if tag and tag.lower() in ROLE_TO_SKILLS:
+                    all_job_skills.update(ROLE_TO_SKILLS[tag.lower()])
+            skills = (sys.intern(normalize_skill(s)) for s in all_job_skills if s)
+        self.skills: FrozenSet[str] = _shared(frozenset(skills))
+
+        self.has_description = job.get("has_description")
+        if self.has_description is None:
+            self.has_description = bool((job.get("job_description") or "").strip())
+
+        # Hiring signal & senior penalty
+        if stored:
+            self.is_senior = bool(job.get("is_senior"))
+            self.hiring_score = job.get("hiring_score") or 0
+        else:
+            self.is_senior = False
+            self.hiring_score = 5  # Base
+            if SENIOR_MATCHER.search(self.contract_blob, self.contract_tokens):
+                self.is_senior = True
+                self.hiring_score = 0
+            elif TARGET_MATCHER.search(self.contract_blob, self.contract_tokens):
+                self.hiring_score = 20
+            elif JUNIOR_MATCHER.search(self.contract_blob, self.contract_tokens):
+                self.hiring_score = 10
+
+        # Mots-clés trouvés par rôle (dans l'ordre des listes, pour matched_intent)
+        if stored:
+            kw_hits = frozenset(job.get("role_keyword_hits") or ())
+        else:
+            kw_hits = frozenset(ROLE_MATCHER.find_all(self.full_text))
+        self.role_hits, self.intent_hits = _hits_by_role(kw_hits)
+
+    @property
+    def tokens(self) -> FrozenSet[str]:
+        """\\w+ tokens of full_text, computed on demand (not kept: the keyword index has them)."""
+        return tokenize(self.full_text)
+
+
+def build_job_features(job: dict) -> JobFeatures:
+    return JobFeatures(job)
+
+
+def build_match_text(job: dict) -> str:
+    """Le blob (minuscules) que le matching scanne : titre, description, secteur, stack, skills."""
+    job_title = job.get("title") or ""
+    job_desc = job.get("job_description") or ""
+    stack = as_list(job.get("stack"))
+    skills_extracted = as_list(job.get("skills_extracted"))
+    return f"{job_title} {job_desc} {job.get('sector', '')} {' '.join(stack)} {' '.join(skills_extracted)}".lower()
+
+
+def compact_job_row(job: dict) -> dict:
+    """
+    Ligne "légère" pour le catalogue : la description brute est remplacée par
+    le blob de matching (match_text) + has_description, qui suffisent au scoring.
+    """
+    row = dict(job)
+    row["match_text"] = build_match_text(job)
+    row["has_description"] = bool((job.get("job_description") or "").strip())
+    row.pop("job_description", None)
+    return row
+
+
+def materialize_match_columns(job: dict) -> dict:
+    """
+    Colonnes de matching à écrire avec le job (cf. migrations/add_match_feature_columns.sql).
+    `job` = la ligne telle qu'elle sera en base : une colonne source absente compte
+    comme NULL, exactement comme au chargement du catalogue.
+    """
+    features = JobFeatures({col: job.get(col) for col in MATCH_SOURCE_COLUMNS})
+    role_keyword_hits = {kw for hits in features.intent_hits.values() for kw in hits}
+    role_keyword_hits.update(kw for hits in features.role_hits.values() for kw in hits)
+    return {
+        "match_text": features.full_text,
+        "has_description": features.has_description,
+        "match_skills": sorted(features.skills),
+        "role_keyword_hits": sorted(role_keyword_hits),
+        "is_senior": features.is_senior,
+        "hiring_score": features.hiring_score,
+        "match_features_version": MATCH_FEATURES_VERSION,
+        "match_features_at": datetime.utcnow().isoformat(),
+    }
+
+
+# ============================================================
+# 5. MATCH QUERY (calculée une fois par requête)
+# ============================================================
+
+class MatchQuery:
+    """Everything the scorer needs from the user profile + preferences."""
+
+    def __init__(self, user_profile, preferences: Optional[SearchPreferences] = None):
+        self.user_profile = user_profile
+        self.preferences = preferences
+
+        # Termes clés de l'objectif (2+ chars) pour le bonus de titre
+        user_obj_lower = user_profile.objectif.lower()
+        self.obj_terms = [w for w in re.split(r'\W+', user_obj_lower) if len(w) >= 2]
+
+        # Si on a coché des rôles explicites dans les préférences, on utilise PREFERENCE_ROLES (plus strict)
+        # Sinon fallback: on devine les rôles depuis l'objectif (ROLE_KEYWORDS)
+        if preferences and preferences.target_roles:
+            self.intent_roles = list(preferences.target_roles)
+            self.use_preference_roles = True
+        else:
+            self.intent_roles = list(infer_user_roles(user_profile.objectif))
+            self.use_preference_roles = False
+
+        self.user_skills = {normalize_skill(s) for s in user_profile.skills}
+
+        # Filtres compilés une fois pour tout le catalogue (None = filtre inactif)
+        self.exclude = KeywordFilter(preferences.exclude_keywords) if preferences and preferences.exclude_keywords else None
+        self.must_have = KeywordFilter(preferences.must_have_keywords) if preferences and preferences.must_have_keywords else None
+        self.contracts = compile_keywords(preferences.contract_types) if preferences and preferences.contract_types else None
+        self.enriched_only = bool(preferences and preferences.enriched_only)
+        self.strict_intent = bool(preferences and preferences.strict_intent)
+        self.min_score = preferences.min_score if preferences else None
+
+    def candidate_positions(self, index: KeywordIndex) -> Optional[List[int]]:
+        """
+        Jobs (positions in the catalog) that pass must_have/exclude, computed
+        with set operations on the inverted index. None = no keyword filter.
+        """
+        if self.must_have is None and self.exclude is None:
+            return None
+        positions = self.must_have.evaluate(index) if self.must_have is not None else index.all_positions()
+        if self.exclude is not None and positions:
+            positions -= self.exclude.evaluate(index)
+        return sorted(positions)
+
+
+# ============================================================
+# 6. JOB MATCH ALGORITHM (Version Finale MVP)
+# ============================================================
+
+# (total_score, intent_score, skill_score, is_target_contract) : un job scoré, avant le dict résultat
+JobScore = Tuple[int, int, int, bool]
+
+
+def evaluate_job(query: MatchQuery, features: JobFeatures, check_keywords: bool = True) -> Optional[JobScore]:
+    """
+    Calcule un score (0-100) pour un job à partir de ses features précalculées.
+    Gère les Bonus (Alternance) et Malus (Senior).
+    Renvoie les composantes du score (None = job filtré), sans construire le dict.
+    check_keywords=False quand must_have/exclude ont déjà été appliqués via l'index.
+    """
+    # --- 1. FILTRES "KILL SWITCH" ---
+
+    if check_keywords:
+        # A. Mots Exclus (Strict : Si je déteste, je jette)
+        if query.exclude is not None and query.exclude.search(features.full_text, features.tokens):
+            return None
+
+        # B. Must Have (Strict)
+        if query.must_have is not None and not query.must_have.search(features.full_text, features.tokens):
+            return None
+
+    # C. Filtre Contrat "Soft" (On ne jette plus, on note juste si c'est le bon)
+    is_target_contract = True
+    if query.contracts is not None and not query.contracts.search(features.contract_blob, features.contract_tokens):
+        is_target_contract = False # Ce n'est pas le contrat idéal, on appliquera une pénalité plus tard
+
+    # D. Enriched Only (Jobs sans description = moins pertinents)
+    has_description = features.has_description
+    if query.enriched_only and not has_description:
+        return None  # Mode strict: on exclut les jobs sans description
+
+    # --- 2. CALCUL DES POINTS ---
+
+    # A. INTENT FIT (Max 60 pts) + BONUS titre
+    title_match_bonus, intent_score = intent_points(query, features)
+
+    # STRICT INTENT: Si activé et aucun match d'intention, on jette
+    if query.strict_intent and intent_score == 0:
+        return None
+
+    # B. SKILL FIT (Max 30 pts)
+    overlap_count = len(query.user_skills & features.skills)
+
+    skill_score = 0
+    if overlap_count > 0:
+        skill_score = min(30, 10 + overlap_count * 5)
+
+    # C. HIRING SIGNAL & SENIOR PENALTY (précalculés sur "contrat + titre")
+    hiring_score = features.hiring_score
+    is_senior = features.is_senior
+
+    # --- 3. SCORE FINAL & PENALTIES ---
+    total_score = intent_score + skill_score + hiring_score + title_match_bonus
+
+    # Pénalité 1 : Ce n'est pas le contrat demandé (ex: CDI au lieu d'Alternance)
+    if not is_target_contract:
+        total_score = total_score * 0.7  # On garde 70% du score
+
+    # Pénalité 2 : C'est un poste Senior (ex: Lead Dev)
+    if is_senior:
+        total_score = total_score * 0.5  # Grosse pénalité
+
+    # Pénalité 3 : Pas de description (on sait moins si ça match vraiment)
+    if not has_description:
+        total_score = total_score * 0.8  # Légère pénalité
+
+    # On s'assure que ça reste propre entre 0 et 100
+    total_score = min(100, int(total_score))
+
+    # Filtre Final (Min Score)
+    if query.min_score is not None and total_score < query.min_score:
+        return None
+
+    return total_score, intent_score, skill_score, is_target_contract
+
+
+def score_job(query: MatchQuery, features: JobFeatures, check_keywords: bool = True) -> Optional[dict]:
+    """Le dict résultat d'un job (None = job filtré)."""
+    score = evaluate_job(query, features, check_keywords)
+    if score is None:
+        return None
+    return build_match_result(query, features, *score)
+
+
+def score_upper_bound(query: MatchQuery, features: JobFeatures, intent_total: int) -> int:
+    """
+    Score maximum que ce job peut atteindre (>= celui de evaluate_job), sans
+    calculer l'overlap de skills ni le filtre contrat :
+        - intent_total : title bonus + intent, déjà connus (intent_points)
+        - skills : on suppose que min(skills user, skills job) matchent
+        - hiring + pénalités senior / sans description : précalculés
+    La pénalité contrat ne peut que baisser le score, on l'ignore.
+    """
+    overlap_max = min(len(query.user_skills), len(features.skills))
+    bound = intent_total + features.hiring_score
+    if overlap_max > 0:
+        bound += min(30, 10 + overlap_max * 5)
+    if features.is_senior:
+        bound = bound * 0.5
+    if not features.has_description:
+        bound = bound * 0.8
+    return min(100, int(bound))
+
+
+def intent_points(query: MatchQuery, features: JobFeatures) -> Tuple[int, int]:
+    """(title_match_bonus, intent_score) for one job."""
+    # BONUS: Direct title match with user objective (e.g., "GenAI Engineer" in both)
+    title_match_bonus = 0
+    for term in query.obj_terms:
+        if term in features.title_lower:
+            title_match_bonus += 15
+    title_match_bonus = min(40, title_match_bonus)  # Cap at 40 pts
+
+    intent_score = 0
+    hits_by_role = features.intent_hits if query.use_preference_roles else features.role_hits
+    for role in query.intent_roles:
+        intent_score += min(30, 10 * len(hits_by_role.get(role, ())))
+    return title_match_bonus, min(60, intent_score)
+
+
+def matched_intent_keywords(query: MatchQuery, features: JobFeatures) -> List[str]:
+    """Objective terms found in the title, then role keywords found in the job (dedup, in order)."""
+    matched = []
+    for term in query.obj_terms:
+        if term in features.title_lower and term not in matched:
+            matched.append(term)
+    hits_by_role = features.intent_hits if query.use_preference_roles else features.role_hits
+    for role in query.intent_roles:
+        for kw in hits_by_role.get(role, ()):
+            if kw not in matched:
+                matched.append(kw)
+    return matched
+
+
+def match_confidence(total_score: int) -> str:
+    """Confiance du match (pour l'affichage UI)."""
+    if total_score >= 80: return "very high"
+    if total_score >= 60: return "high"
+    if total_score >= 40: return "medium"
+    return "low"
+
+
+def build_match_result(
+    query: MatchQuery,
+    features: JobFeatures,
+    total_score: int,
+    intent_score: int,
+    skill_score: int,
+    is_target_contract: bool,
+) -> dict:
+    """Le dict renvoyé au frontend pour un job retenu."""
+    job_data = features.job
+    has_description = features.has_description
+
+    return {
+        "job_id": job_data.get("external_id"),
+        "title": job_data.get("title") or "",
+        "company": job_data.get("company_name"),
+        "company_slug": job_data.get("company_slug"),      # NEW: For URL building
+        "logo_url": job_data.get("logo_url"),              # NEW: Company logo from Algolia
+        "location": job_data.get("location"),              # NEW: City, Country
+        "published_at": job_data.get("published_at"),      # NEW: Publication date
+        "contract_type": job_data.get("contract_type") or "",
+        "score": total_score,
+        "details": {
+            "intent": intent_score,
+            "skill": skill_score,
+            "hiring_score": features.hiring_score,
+            "penalties": {
+                "senior_penalty": features.is_senior,
+                "wrong_contract": not is_target_contract,
+                "no_description": not has_description
+            }
+        },
+        "matched_skills": list(query.user_skills & features.skills),
+        "matched_intent": matched_intent_keywords(query, features)[:5],
+        "url": job_data.get("apply_url"),
+        "match_confidence": match_confidence(total_score),
+        # AI enrichment fields
+        "suggested_outreach_roles": job_data.get("suggested_outreach_roles", []),
+        "enrichment_json": job_data.get("enrichment_json", {})
+    }
+
+
+def compute_job_match_score(user_profile, job_data: dict, preferences: Optional[SearchPreferences] = None) -> Optional[dict]:
+    """
+    Calcule un score (0-100) pour un job (appel ponctuel, sans catalogue).
+    Pour scorer tout le catalogue, construire la MatchQuery une seule fois et
+    appeler score_job() sur les JobFeatures précalculées.
+    """
+    return score_job(MatchQuery(user_profile, preferences), JobFeatures(job_data))
+
+
+class ScoredJobs:
+    """
+    Jobs of one query that passed every filter (catalog order) with their score
+    components, BEFORE any result dict is built.
+    """
+
+    def __init__(self, query: MatchQuery, features: List[JobFeatures], positions: List[int], scores: List[JobScore], filtered: int):
+        self.query = query
+        self.features = features
+        self.positions = positions  # positions in the catalog
+        self.scores = scores        # aligned with positions
+        self.filtered = filtered    # jobs rejected by the filters
+
+    def results(self, rows: Optional[Iterable[int]] = None) -> List[dict]:
+        """Result dicts for the given rows (default: all), in that order."""
+        if rows is None:
+            rows = range(len(self.positions))
+        return [build_match_result(self.query, self.features[self.positions[r]], *self.scores[r]) for r in rows]
+
+
+def evaluate_positions(
+    query: MatchQuery,
+    features: List[JobFeatures],
+    positions: Iterable[int],
+    check_keywords: bool = True,
+) -> Tuple[List[int], List[JobScore]]:
+    """Score the jobs at `positions` (in that order): (kept positions, their JobScore)."""
+    kept, scores = [], []
+    for pos in positions:
+        score = evaluate_job(query, features[pos], check_keywords)
+        if score is not None:
+            kept.append(pos)
+            scores.append(score)
+    return kept, scores
+
+
+def evaluate_catalog(query: MatchQuery, features: List[JobFeatures], index: Optional[KeywordIndex] = None) -> ScoredJobs:
+    """
+    Score the whole catalog (in catalog order), without building result dicts.
+    With an index, jobs rejected by must_have/exclude are dropped before scoring.
+    """
+    positions = catalog_candidates(query, features, index)
+    kept, scores = evaluate_positions(query, features, positions, check_keywords=index is None)
+    return ScoredJobs(query, features, kept, scores, len(features) - len(kept))
+
+
+def catalog_candidates(query: MatchQuery, features: List[JobFeatures], index: Optional[KeywordIndex] = None):
+    """Positions to score: the keyword index candidates, or the whole catalog."""
+    candidates = None
+    if index is not None:
+        candidates = query.candidate_positions(index)
+    if candidates is None:
+        candidates = range(len(features))
+    return candidates
+
+
+def score_catalog(query: MatchQuery, features: List[JobFeatures], index: Optional[KeywordIndex] = None) -> Tuple[List[dict], int]:
+    """Score the whole catalog (in catalog order). Returns (matches, filtered)."""
+    scored = evaluate_catalog(query, features, index)
+    return scored.results(), scored.filtered
+
+
+class MatchRanking:
+    """Ranked result of one query: top matches + counters for the response."""
+
+    def __init__(self, matches: List[dict], matched: int, filtered: int, stats: Optional[dict] = None):
+        self.matches = matches    # sorted by score (desc), truncated to `limit`
+        self.matched = matched    # jobs that passed every filter
+        self.filtered = filtered  # jobs rejected by the filters
+        self.stats = stats or {}  # scorer counters (candidates / scored / pruned / materialized)
+
+
+def rank_catalog(
+    query: MatchQuery,
+    features: List[JobFeatures],
+    index: Optional[KeywordIndex] = None,
+    limit: Optional[int] = None,
+) -> MatchRanking:
+    """Score the catalog and sort by score (stable: ties keep catalog order)."""
+    if limit is not None and limit > 0:
+        return top_k_catalog(query, features, limit, index)
+
+    candidates = catalog_candidates(query, features, index)
+    kept, scores = evaluate_positions(query, features, candidates, check_keywords=index is None)
+    scored = ScoredJobs(query, features, kept, scores, len(features) - len(kept))
+    order = sorted(range(len(scored.positions)), key=lambda r: scored.scores[r][0], reverse=True)
+    if limit is not None:
+        order = order[:limit]
+    matches = scored.results(order)
+    stats = {"candidates": len(candidates), "scored": len(candidates), "pruned": 0, "materialized": len(matches)}
+    return MatchRanking(matches, len(scored.positions), scored.filtered, stats)
+
+
+def top_k_catalog(
+    query: MatchQuery,
+    features: List[JobFeatures],
+    k: int,
+    index: Optional[KeywordIndex] = None,
+) -> MatchRanking:
+    """
+    Top-K avec un tas borné (même résultat que trier tout le catalogue puis couper).
+    Les compteurs matched / filtered restent exacts ; seuls les K jobs retenus
+    deviennent des dicts.
+    """
+    candidates = catalog_candidates(query, features, index)
+    top, matched, scored, pruned = select_top_k(query, features, candidates, k, check_keywords=index is None)
+    matches = [build_match_result(query, features[-neg_pos], *score) for _, neg_pos, score in top]
+    stats = {"candidates": len(candidates), "scored": scored, "pruned": pruned, "materialized": len(matches)}
+    return MatchRanking(matches, matched, len(features) - matched, stats)
+
+
+def select_top_k(
+    query: MatchQuery,
+    features: List[JobFeatures],
+    positions: Iterable[int],
+    k: int,
+    check_keywords: bool = True,
+) -> Tuple[List[tuple], int, int, int]:
+    """
+    Les K meilleurs jobs parmi `positions` (parcourues dans l'ordre du catalogue).
+
+    Pour chaque job, on calcule d'abord score_upper_bound() : si même ce maximum
+    ne bat pas le K-ième score du tas, le job ne peut pas entrer dans le top K
+    (à score égal, le job arrivé avant gagne) -> on ne le score pas (élagué).
+
+    Renvoie (top, matched, scored, pruned) avec top = [(score, -position, JobScore)]
+    trié du meilleur au moins bon : des tops partiels se fusionnent avec heapq.nlargest.
+    """
+    min_score = query.min_score
+
+    heap: List[tuple] = []  # (score, -position, JobScore) : heap[0] = le moins bon du top K
+    matched = scored = pruned = 0
+    for pos in positions:
+        f = features[pos]
+
+        # Filtres qui ne dépendent pas du score
+        if check_keywords:
+            if query.exclude is not None and query.exclude.search(f.full_text, f.tokens):
+                continue
+            if query.must_have is not None and not query.must_have.search(f.full_text, f.tokens):
+                continue
+        if query.enriched_only and not f.has_description:
+            continue
+        title_match_bonus, intent_score = intent_points(query, f)
+        if query.strict_intent and intent_score == 0:
+            continue
+
+        bound = score_upper_bound(query, f, title_match_bonus + intent_score) if len(heap) == k else None
+        if bound is not None and bound <= heap[0][0]:
+            # Ne peut pas entrer dans le top K : on ne garde que le compteur
+            if min_score is None or min_score <= 0:
+                matched += 1
+                pruned += 1
+                continue
+            if bound < min_score:
+                pruned += 1
+                continue
+            # Score exact nécessaire pour savoir s'il passe min_score
+            scored += 1
+            if evaluate_job(query, f, check_keywords=False) is not None:
+                matched += 1
+            continue
+
+        scored += 1
+        score = evaluate_job(query, f, check_keywords=False)
+        if score is None:
+            continue
+        matched += 1
+        entry = (score[0], -pos, score)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    heap.sort(reverse=True)  # score desc, puis ordre du catalogue
+    return heap, matched, scored, pruned
+
+
+def rank_rows(scored: ScoredJobs) -> List[int]:
+    """Every row of `scored`, best score first (stable: ties keep catalog order)."""
+    return sorted(range(len(scored.positions)), key=lambda r: scored.scores[r][0], reverse=True)
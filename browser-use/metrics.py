@@ -0,0 +1,248 @@
+"""
+Prometheus Metrics & Per-Stage Timing
+=====================================
+
+Dependency-free histograms exposed in the Prometheus text format on GET /metrics,
+to tell where a slow /match spends its time (catalog, scoring, details,
+serialization...) and how slow the outbound services are.
+
+- `stage(name)`: times one step of the current request into
+  jobtinder_stage_seconds{endpoint, stage}. The request is tracked by
+  MetricsMiddleware through a contextvar, so stages recorded in helpers (and in
+  the I/O threads of blocking_io.run_blocking) land on the right endpoint.
+- `timed(service, operation, func)`: wraps an outbound call (Supabase, Gemini,
+  DuckDuckGo, Pappers, SMTP...) into jobtinder_outbound_seconds{service,
+  operation, outcome}. `outbound(service, operation)` is the `with` form.
+- `observe_count(kind, n)` / `observe_bytes(n)`: per-request sizes (rows
+  fetched, jobs scored / filtered, bytes serialized).
+- With SERVER_TIMING=1 the stages of a request are also sent back in a
+  `Server-Timing` header (browser devtools show them in the Timing tab).
+
+Usage:
+    app.add_middleware(MetricsMiddleware)
+    with stage("score"):
+        ranking = rank_catalog(...)
+    res = await run_blocking(timed("gemini", "generate_content", model.generate_content), prompt)
+
+Config (.env):
+    SERVER_TIMING=0    # 1 = Server-Timing header on instrumented endpoints
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Secondes : du scoring (ms) aux appels Gemini / chargements complets (dizaines de s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTES_BUCKETS = (1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216)
+STARTUP_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)
+REFRESH_BUCKETS = (1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (thread-safe)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        slot = bisect_left(self.buckets, value)  # first bucket with le >= value
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            cumulative = 0
+            for le, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                le_labels = ",".join(labels + [f'le="{_format_float(le)}"'])
+                lines.append(f"{self.name}_bucket{{{le_labels}}} {cumulative}")
+            base = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{base} {_format_float(values[-1])}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+REGISTRY: List[Histogram] = []
+
+STAGE_SECONDS = Histogram(
+    "jobtinder_stage_seconds", "Duration of one stage of a request (or of a catalog load).", ["endpoint", "stage"],
+)
+REQUEST_SECONDS = Histogram(
+    "jobtinder_request_seconds", "Total duration of the instrumented requests.", ["endpoint"],
+)
+OUTBOUND_SECONDS = Histogram(
+    "jobtinder_outbound_seconds", "Latency of the calls to external services.", ["service", "operation", "outcome"],
+)
+REQUEST_ITEMS = Histogram(
+    "jobtinder_request_items", "Rows fetched / jobs scored / jobs filtered... per request.", ["endpoint", "kind"],
+    buckets=COUNT_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    "jobtinder_response_bytes", "Serialized body size of the instrumented responses.", ["endpoint"],
+    buckets=BYTES_BUCKETS,
+)
+STARTUP_SECONDS = Histogram(
+    "jobtinder_startup_seconds", "Cold start: api_server import start -> import / startup done / first /match.", ["phase"],
+    buckets=STARTUP_BUCKETS,
+)
+REFRESH_RUN_SECONDS = Histogram(
+    "jobtinder_refresh_run_seconds", "Scheduled refresh runs (Algolia, descriptions, catalog) by outcome.", ["task", "status"],
+    buckets=REFRESH_BUCKETS,
+)
+
+
+# ============================================================
+# PER-REQUEST STAGES
+# ============================================================
+
+class RequestTimer:
+    """Stages of one HTTP request (set by MetricsMiddleware)."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.stages: List[Tuple[str, float]] = []
+        self.instrumented = False
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={1000 * seconds:.1f}" for name, seconds in self.stages)
+
+
+_current_request: ContextVar[Optional[RequestTimer]] = ContextVar("jobtinder_request_timer", default=None)
+
+
+def _endpoint(endpoint: Optional[str]) -> str:
+    if endpoint:
+        return endpoint
+    timer = _current_request.get()
+    if timer is not None:
+        timer.instrumented = True
+        return timer.endpoint
+    return "background"
+
+
+@contextmanager
+def stage(name: str, endpoint: Optional[str] = None):
+    """Time the block as stage `name` of the current request (or of `endpoint`)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, endpoint=_endpoint(endpoint), stage=name)
+        timer = _current_request.get()
+        if timer is not None and endpoint is None:
+            timer.stages.append((name, elapsed))
+
+
+def observe_count(kind: str, value: int, endpoint: Optional[str] = None):
+    REQUEST_ITEMS.observe(value, endpoint=_endpoint(endpoint), kind=kind)
+
+
+def observe_bytes(value: int, endpoint: Optional[str] = None):
+    RESPONSE_BYTES.observe(value, endpoint=_endpoint(endpoint))
+
+
+# ============================================================
+# OUTBOUND CALLS
+# ============================================================
+
+@contextmanager
+def outbound(service: str, operation: str):
+    """Time the block as one call to an external service (outcome = ok / error)."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OUTBOUND_SECONDS.observe(time.perf_counter() - started, service=service, operation=operation, outcome=outcome)
+
+
+def timed(service: str, operation: str, func: Callable) -> Callable:
+    """func, with each call timed as an outbound call (see `outbound`)."""
+    def wrapper(*args, **kwargs):
+        with outbound(service, operation):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# ============================================================
+# EXPOSITION
+# ============================================================
+
+def render_metrics() -> str:
+    """Every histogram, Prometheus text format 0.0.4."""
+    lines: List[str] = []
+    for histogram in REGISTRY:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: tracks the stages of each HTTP request, observes the total
+    duration of the requests that recorded a stage, and adds the Server-Timing
+    header when enabled.
+    """
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer(scope.get("path", ""))
+        token = _current_request.set(timer)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if self.server_timing and message["type"] == "http.response.start" and timer.stages:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timer.server_timing().encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            if timer.instrumented:
+                REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=timer.endpoint)
@@ -0,0 +1,232 @@
+"""
+Parallel Scoring (process pool)
+===============================
+
+Optional multi-core scoring for large catalogs with the pure-Python engine.
+Scoring is CPU-bound Python: in the API process it holds the GIL and the
+uvicorn event loop for the whole request. Here it runs in a persistent pool of
+worker processes and the endpoint just awaits the partial results.
+
+- The pool is created once and kept for the life of the API process. Its
+  workers are started by a fork server (spawn on Windows), never forked from
+  the API process: by then it runs threads (I/O pool, catalog refresh,
+  scheduler) and a forked child could inherit a lock held by one of them.
+- Workers read the catalog from the snapshot file the JobCatalog wrote for
+  that version (snapshot.path, catalog_file.py): nothing is pickled for them.
+  Each worker loads the file the first time it sees that version, then keeps
+  the JobFeatures in memory for the next requests. Without a snapshot file
+  (CATALOG_SNAPSHOT_PATH disabled), publish writes one in a private temp dir.
+  (The snapshot rows are compact CatalogJob records: the features cannot be
+  rebuilt from them.)
+- A request splits the candidate positions into contiguous chunks, every
+  worker returns the partial top K of its chunk (matching.select_top_k), and
+  the parent merges them with heapq.nlargest: same ranking as one process.
+- Below MATCH_PARALLEL_MIN_JOBS jobs the IPC costs more than it saves:
+  the caller keeps scoring in-process (see `accepts`).
+- If a worker dies (e.g. killed for memory), the pool is dropped, the call
+  raises and the caller scores in-process; the next catalog reload recreates it.
+
+Config (.env):
+    MATCH_WORKERS=4                  # 0/1 = disabled (default)
+    MATCH_PARALLEL_MIN_JOBS=20000    # catalog size from which the pool is used
+"""
+
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from catalog_file import SnapshotFile, write_snapshot_file
+from matching import (
+    MatchQuery,
+    MatchRanking,
+    ScoredJobs,
+    build_match_result,
+    evaluate_positions,
+    select_top_k,
+)
+
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "0"))
+MATCH_PARALLEL_MIN_JOBS = int(os.getenv("MATCH_PARALLEL_MIN_JOBS", "20000"))
+
+# Chunks per worker: a few more chunks than workers smooths out uneven chunks
+_CHUNKS_PER_WORKER = 2
+
+
+# ============================================================
+# WORKER SIDE (runs in the pool processes)
+# ============================================================
+
+_worker_catalog = {"key": None, "features": None}
+
+
+def _worker_features(path: str, version: int):
+    """JobFeatures of catalog `version` from its snapshot file (loaded once per version)."""
+    if _worker_catalog["key"] != (path, version):
+        snapshot_file = SnapshotFile(path)
+        if snapshot_file.header.get("version") != version:
+            # Le fichier contient déjà une version plus récente : l'appelant score en local
+            raise RuntimeError(f"{path} holds catalog v{snapshot_file.header.get('version')}, not v{version}")
+        _worker_catalog["features"] = snapshot_file.load()[1]
+        _worker_catalog["key"] = (path, version)
+    return _worker_catalog["features"]
+
+
+def _warm_up(path: str, version: int) -> int:
+    return len(_worker_features(path, version))
+
+
+def _top_k_chunk(path: str, version: int, user_profile, preferences, positions: List[int], k: int):
+    query = MatchQuery(user_profile, preferences)
+    return select_top_k(query, _worker_features(path, version), positions, k, check_keywords=False)
+
+
+def _evaluate_chunk(path: str, version: int, user_profile, preferences, positions: List[int]):
+    query = MatchQuery(user_profile, preferences)
+    return evaluate_positions(query, _worker_features(path, version), positions, check_keywords=False)
+
+
+def _pool_context():
+    """Fork server (POSIX) or spawn: workers never inherit the API process's threads and locks."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["parallel_scoring"])  # matching importé une fois, dans le serveur
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+# ============================================================
+# PARENT SIDE
+# ============================================================
+
+class ParallelScorer:
+    """
+    Persistent process pool scoring catalog partitions.
+
+    Usage:
+        scorer = ParallelScorer()
+        job_catalog.subscribe(scorer.publish)
+        if scorer.accepts(catalog):
+            ranking = await scorer.rank(catalog, query, limit=200)
+    """
+
+    def __init__(self, workers: int = MATCH_WORKERS, min_jobs: int = MATCH_PARALLEL_MIN_JOBS):
+        self.workers = workers
+        self.min_jobs = min_jobs
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._dir: Optional[str] = None
+        self._published = {}  # catalog version -> snapshot file
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def accepts(self, snapshot) -> bool:
+        """True if this snapshot should be scored by the pool."""
+        return (
+            self.enabled
+            and len(snapshot.features) >= self.min_jobs
+            and snapshot.version in self._published
+        )
+
+    def publish(self, snapshot):
+        """Catalog listener: ship a new snapshot to the workers."""
+        if not self.enabled or len(snapshot.jobs) < self.min_jobs:
+            return
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+
+            path = snapshot.path
+            if path is None:
+                # Pas de fichier de snapshot : on en écrit un (features seules), dossier privé
+                if self._dir is None:
+                    self._dir = tempfile.mkdtemp(prefix="jobtinder-catalog-")
+                path = os.path.join(self._dir, "catalog.snapshot")
+                write_snapshot_file(path, {"version": snapshot.version}, (None, snapshot.features, {}))
+            # The file only holds the latest version: older snapshots are scored in-process
+            self._published = {snapshot.version: path}
+            pool = self._pool
+
+        # Workers load their features now rather than on the first request
+        for _ in range(self.workers):
+            pool.submit(_warm_up, path, snapshot.version)
+        print(f"[parallel] Published catalog v{snapshot.version} ({len(snapshot.jobs)} jobs) to {self.workers} workers")
+
+    def _chunks(self, positions: List[int]) -> List[List[int]]:
+        if not positions:
+            return [[]]
+        size = -(-len(positions) // (self.workers * _CHUNKS_PER_WORKER))
+        return [positions[i:i + size] for i in range(0, len(positions), size)]
+
+    def _candidates(self, snapshot, query: MatchQuery) -> List[int]:
+        index = snapshot.indexes.get("keywords")
+        positions = query.candidate_positions(index) if index is not None else None
+        if positions is None:
+            positions = list(range(len(snapshot.features)))
+        return positions
+
+    async def rank(self, snapshot, query: MatchQuery, limit: int) -> MatchRanking:
+        """Same result as matching.rank_catalog(..., limit), scored by the pool."""
+        path = self._published.get(snapshot.version)
+        if path is None:
+            raise RuntimeError(f"catalog v{snapshot.version} is no longer published")
+        candidates = self._candidates(snapshot, query)
+        futures = [
+            self._pool.submit(_top_k_chunk, path, snapshot.version, query.user_profile, query.preferences, chunk, limit)
+            for chunk in self._chunks(candidates)
+        ]
+        parts = await self._gather(futures)
+
+        top = heapq.nlargest(limit, itertools.chain.from_iterable(p[0] for p in parts))
+        matched = sum(p[1] for p in parts)
+        matches = [build_match_result(query, snapshot.features[-neg_pos], *score) for _, neg_pos, score in top]
+        stats = {
+            "candidates": len(candidates),
+            "scored": sum(p[2] for p in parts),
+            "pruned": sum(p[3] for p in parts),
+            "materialized": len(matches),
+            "workers": len(futures),
+        }
+        return MatchRanking(matches, matched, len(snapshot.features) - matched, stats)
+
+    async def evaluate(self, snapshot, query: MatchQuery) -> ScoredJobs:
+        """Same result as matching.evaluate_catalog, scored by the pool."""
+        path = self._published.get(snapshot.version)
+        if path is None:
+            raise RuntimeError(f"catalog v{snapshot.version} is no longer published")
+        futures = [
+            self._pool.submit(_evaluate_chunk, path, snapshot.version, query.user_profile, query.preferences, chunk)
+            for chunk in self._chunks(self._candidates(snapshot, query))
+        ]
+        parts = await self._gather(futures)
+
+        positions = [pos for kept, _ in parts for pos in kept]
+        scores = [score for _, part_scores in parts for score in part_scores]
+        return ScoredJobs(query, snapshot.features, positions, scores, len(snapshot.features) - len(positions))
+
+    async def _gather(self, futures) -> list:
+        try:
+            return await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        except BrokenProcessPool:
+            print("[parallel] A worker died, dropping the pool until the next catalog reload")
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._dir:
+                shutil.rmtree(self._dir, ignore_errors=True)
+                self._dir = None
+            self._published.clear()
@@ -0,0 +1,352 @@
+"""
+Background Refresh Scheduler
+============================
+
+Keeps the jobs table and the in-memory catalog current without anyone running
+refresh_stationf_jobs.py / enrich_descriptions_fast.py by hand or hitting
+/scrape/stationf.
+
+- Each task (name, func() -> summary dict, interval) runs in its own daemon
+  thread every `interval_seconds`, plus a random jitter (0..REFRESH_JITTER_SECONDS)
+  so processes started together do not hit Algolia / Supabase at the same time.
+- Overlap prevention: a run of an `exclusive` task holds an exclusive lock on
+  `<REFRESH_STATE_DIR>/jobtinder_refresh_<task>.lock` (0600, in a 0700
+  directory of the current user by default), shared by every process of the
+  host running as that user (uvicorn workers, sidecar). A run that cannot take it is recorded
+  as "skipped". The lock file holds the end time of the last successful run:
+  a task that ran in another process (or before a restart) less than
+  `interval_seconds` ago is not run again. Without fcntl (Windows), only the
+  runs of one process are serialized.
+- A failed run is retried at the next interval, not right away.
+- Run history: every run is a dict (task, status "ok" / "failed" / "skipped",
+  started_at, duration_seconds, result or error, host, pid), kept in memory
+  (last REFRESH_HISTORY_SIZE), passed to the optional `record(run)` callback
+  (e.g. supabase_run_recorder: table refresh_runs, migrations/add_refresh_runs.sql)
+  and timed in jobtinder_refresh_run_seconds{task, status} (GET /metrics).
+- interval_seconds = 0: task registered (run() works) but not scheduled.
+
+Tasks:
+    algolia       refresh_stationf_jobs.refresh_jobs (upsert + flag expired jobs)
+    descriptions  enrich_descriptions_fast.enrich_jobs (REFRESH_DESCRIPTIONS_LIMIT jobs per run)
+    catalog       in the API only: JobCatalog.sync (its own thread already syncs every
+                  CATALOG_TTL_SECONDS; the API also asks for a sync after each
+                  successful algolia / descriptions run)
+
+Usage:
+    # In the API process (api_server.py, REFRESH_SCHEDULER=1): GET /refresh/runs
+    scheduler = RefreshScheduler(record=supabase_run_recorder(client))
+    add_stationf_tasks(scheduler, client, on_change=job_catalog.request_refresh)
+    scheduler.start()
+
+    # Sidecar (own process; the API picks the new rows up with its delta sync)
+    python refresh_scheduler.py
+    python refresh_scheduler.py --once algolia
+
+Config (.env):
+    REFRESH_SCHEDULER=0                 # 1 = run the tasks inside the API process
+    REFRESH_ALGOLIA_SECONDS=21600
+    REFRESH_DESCRIPTIONS_SECONDS=21600
+    REFRESH_DESCRIPTIONS_LIMIT=50
+    REFRESH_CATALOG_SECONDS=0
+    REFRESH_JITTER_SECONDS=120
+    REFRESH_STATE_DIR=/tmp
+    REFRESH_HISTORY_SIZE=50
+    REFRESH_RUNS_TABLE=refresh_runs     # "" = history in memory only
+"""
+
+import argparse
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Optional
+
+from dotenv import load_dotenv
+
+from catalog_file import open_private, private_state_dir
+from metrics import REFRESH_RUN_SECONDS
+
+try:
+    import fcntl  # Unix only: one run at a time across the processes of the host
+except ImportError:
+    fcntl = None
+
+# Load environment variables (sidecar; no-op for the variables the API already loaded)
+root_dir = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(root_dir, ".env"))
+load_dotenv(os.path.join(root_dir, "..", ".env.local"))
+
+# Planificateur dans le process de l'API (sinon : sidecar `python refresh_scheduler.py`)
+REFRESH_SCHEDULER = os.getenv("REFRESH_SCHEDULER", "0") == "1"
+# Intervalles entre deux runs (secondes, 0 = tâche non planifiée)
+REFRESH_ALGOLIA_SECONDS = int(os.getenv("REFRESH_ALGOLIA_SECONDS", "21600"))
+REFRESH_DESCRIPTIONS_SECONDS = int(os.getenv("REFRESH_DESCRIPTIONS_SECONDS", "21600"))
+REFRESH_CATALOG_SECONDS = int(os.getenv("REFRESH_CATALOG_SECONDS", "0"))
+# Jobs enrichis par run de la tâche descriptions
+REFRESH_DESCRIPTIONS_LIMIT = int(os.getenv("REFRESH_DESCRIPTIONS_LIMIT", "50"))
+# Délai aléatoire ajouté à chaque intervalle (secondes)
+REFRESH_JITTER_SECONDS = int(os.getenv("REFRESH_JITTER_SECONDS", "120"))
+# Fichiers de verrou (un par tâche) : fin du dernier run, partagés par les process de la machine
+# (vide = catalog_file.private_state_dir(), dossier 0700 de l'utilisateur)
+REFRESH_STATE_DIR = os.getenv("REFRESH_STATE_DIR", "")
+REFRESH_HISTORY_SIZE = int(os.getenv("REFRESH_HISTORY_SIZE", "50"))
+REFRESH_RUNS_TABLE = os.getenv("REFRESH_RUNS_TABLE", "refresh_runs")
+
+
+class RefreshTask:
+    """One scheduled job: func() -> summary dict, every interval_seconds (+ jitter)."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval_seconds: int,
+        exclusive: bool = True,
+        on_success: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.exclusive = exclusive  # one run at a time across processes (lock file)
+        self.on_success = on_success
+        self.next_run: Optional[float] = None
+        self.last_run: Optional[dict] = None
+        self.last_attempt = 0.0
+        self.finished_at = 0.0  # end of the last successful run in this process
+        self.lock = threading.Lock()  # one run at a time in this process
+        self.thread: Optional[threading.Thread] = None
+
+
+class RefreshScheduler:
+    """
+    Interval scheduler for the refresh jobs.
+
+    - record(run): optional callback for each run dict (errors are logged)
+    - state_dir: where the per-task lock files live (default: catalog_file.private_state_dir())
+    - jitter_seconds: random delay added to each interval
+    - history_size: runs kept in memory for stats()
+    """
+
+    def __init__(
+        self,
+        record: Optional[Callable[[dict], None]] = None,
+        state_dir: str = REFRESH_STATE_DIR,
+        jitter_seconds: int = REFRESH_JITTER_SECONDS,
+        history_size: int = REFRESH_HISTORY_SIZE,
+    ):
+        self.record = record
+        self.state_dir = state_dir or private_state_dir()
+        self.jitter_seconds = jitter_seconds
+        self.history: Deque[dict] = deque(maxlen=history_size)
+        self._tasks: Dict[str, RefreshTask] = {}
+        self._stop = threading.Event()
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval_seconds: int,
+        exclusive: bool = True,
+        on_success: Optional[Callable[[], None]] = None,
+    ):
+        """Register func under name; on_success() runs after each successful run (e.g. catalog refresh)."""
+        self._tasks[name] = RefreshTask(name, func, interval_seconds, exclusive, on_success)
+
+    # ----------------------------
+    # Runs
+    # ----------------------------
+
+    def run(self, name: str, force: bool = False) -> Optional[dict]:
+        """
+        Run a task now, in the calling thread. Returns its run dict, or None when
+        another process completed it less than interval_seconds ago (unless force).
+        """
+        task = self._tasks[name]
+        started = time.time()
+        if not task.lock.acquire(blocking=False):
+            return self._finish(task, started, "skipped", error="already running in this process")
+        lock_file = None
+        try:
+            if task.exclusive:
+                lock_file = open_private(self._lock_path(task))
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        task.last_attempt = started
+                        return self._finish(task, started, "skipped", error="running in another process")
+                if not force and started - self._last_finished(task) < task.interval_seconds:
+                    return None
+            task.last_attempt = started
+            print(f"[refresh] Running {name}...")
+            try:
+                result = task.func()
+            except Exception as e:
+                return self._finish(task, started, "failed", error=str(e))
+            task.finished_at = time.time()
+            if lock_file is not None:
+                lock_file.seek(0)
+                lock_file.truncate()
+                lock_file.write(str(task.finished_at))
+                lock_file.flush()
+            if task.on_success is not None:
+                try:
+                    task.on_success()
+                except Exception as e:
+                    print(f"[refresh] {name}: after-run hook failed: {e}")
+            return self._finish(task, started, "ok", result=result)
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # releases the lock
+            task.lock.release()
+
+    def _finish(self, task: RefreshTask, started: float, status: str, result: Any = None, error: Optional[str] = None) -> dict:
+        duration = time.time() - started
+        run = {
+            "task": task.name,
+            "status": status,
+            "started_at": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+            "duration_seconds": round(duration, 3),
+            "result": result,
+            "error": error,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+        }
+        task.last_run = run
+        self.history.append(run)
+        REFRESH_RUN_SECONDS.observe(duration, task=task.name, status=status)
+        print(f"[refresh] {task.name}: {status} in {duration:.1f}s" + (f" ({error})" if error else ""))
+        if self.record is not None:
+            try:
+                self.record(run)
+            except Exception as e:
+                print(f"[refresh] Could not record the {task.name} run: {e}")
+        return run
+
+    def _lock_path(self, task: RefreshTask) -> str:
+        return os.path.join(self.state_dir, f"jobtinder_refresh_{task.name}.lock")
+
+    def _last_finished(self, task: RefreshTask) -> float:
+        """End of the last successful run (any process for an exclusive task)."""
+        if not task.exclusive:
+            return task.finished_at
+        try:
+            with open_private(self._lock_path(task)) as f:
+                return max(float(f.read().strip() or 0), task.finished_at)
+        except (OSError, ValueError):
+            return task.finished_at
+
+    # ----------------------------
+    # Background threads
+    # ----------------------------
+
+    def start(self):
+        """One daemon thread per scheduled task (idempotent)."""
+        self._stop.clear()
+        for task in self._tasks.values():
+            if task.interval_seconds <= 0 or (task.thread and task.thread.is_alive()):
+                continue
+            task.thread = threading.Thread(target=self._loop, args=(task,), name=f"refresh-{task.name}", daemon=True)
+            task.thread.start()
+
+    def stop(self):
+        """Stop scheduling; a run in progress finishes in its (daemon) thread."""
+        self._stop.set()
+        for task in self._tasks.values():
+            if task.thread:
+                task.thread.join(timeout=5)
+                task.thread = None
+            task.next_run = None
+
+    def _loop(self, task: RefreshTask):
+        while not self._stop.is_set():
+            # Échéance : fin du dernier run (ici ou ailleurs) ou dernière tentative + intervalle
+            last = max(self._last_finished(task), task.last_attempt)
+            task.next_run = max(time.time(), last + task.interval_seconds) + random.uniform(0, self.jitter_seconds)
+            if self._stop.wait(timeout=max(0.0, task.next_run - time.time())):
+                break
+            self.run(task.name)
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "tasks": {
+                name: {
+                    "interval_seconds": task.interval_seconds,
+                    "exclusive": task.exclusive,
+                    "running": task.lock.locked(),
+                    "next_run_in_seconds": round(task.next_run - now, 1) if task.next_run else None,
+                    "last_run": task.last_run,
+                }
+                for name, task in self._tasks.items()
+            },
+            "runs": list(reversed(self.history)),  # newest first
+        }
+
+
+# ============================================================
+# STATION F TASKS & RUN HISTORY TABLE
+# ============================================================
+
+def add_stationf_tasks(scheduler: RefreshScheduler, client, on_change: Optional[Callable[[], None]] = None):
+    """Algolia refresh + description enrichment, writing with `client`; on_change() after each successful run."""
+
+    def refresh_algolia() -> dict:
+        from refresh_stationf_jobs import refresh_jobs  # requests / supabase : importés au premier run
+
+        return refresh_jobs(client)
+
+    def enrich_descriptions() -> dict:
+        from enrich_descriptions_fast import enrich_jobs  # bs4 : importé au premier run
+
+        return enrich_jobs(limit=REFRESH_DESCRIPTIONS_LIMIT, client=client)
+
+    scheduler.add("algolia", refresh_algolia, REFRESH_ALGOLIA_SECONDS, on_success=on_change)
+    scheduler.add("descriptions", enrich_descriptions, REFRESH_DESCRIPTIONS_SECONDS, on_success=on_change)
+
+
+def supabase_run_recorder(client, table: str = REFRESH_RUNS_TABLE) -> Optional[Callable[[dict], None]]:
+    """record callback inserting each run into `table` (None when table is "")."""
+    if not table:
+        return None
+
+    def record(run: dict):
+        client.table(table).insert(run).execute()
+
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduled Algolia refresh + description enrichment (API sidecar)")
+    parser.add_argument("--once", choices=["algolia", "descriptions"], help="Run one task now and exit")
+    args = parser.parse_args()
+
+    from supabase import create_client
+
+    supabase_url = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+    if not supabase_url or not supabase_key:
+        raise SystemExit("[X] SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (or SUPABASE_KEY) must be set in .env")
+    client = create_client(supabase_url, supabase_key)
+
+    scheduler = RefreshScheduler(record=supabase_run_recorder(client))
+    add_stationf_tasks(scheduler, client)
+    if args.once:
+        run = scheduler.run(args.once, force=True)
+        sys.exit(0 if run["status"] == "ok" else 1)
+
+    scheduler.start()
+    print(f"[refresh] Scheduler running (algolia every {REFRESH_ALGOLIA_SECONDS}s, descriptions every {REFRESH_DESCRIPTIONS_SECONDS}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,22 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
+# Created on first use (CLI); the API scheduler passes its own client (refresh_scheduler.py)
+supabase = None
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def refresh_jobs():
+def get_supabase():
+    global supabase
+    if supabase is None:
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
+        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return supabase
+
+
+def refresh_jobs(client=None) -> dict:
+    """Algolia -> jobs table; returns the run summary (scraped / upserted / flagged / errors)."""
+    client = client or get_supabase()
     print("[*] Starting Station F Job Refresh (via Algolia API)...")
 
     # 1. Scrape fresh data (Get list, don't auto-save yet to control the logic)
@@ -27,7 +37,7 @@ def refresh_jobs():
     # 2. Get existing active jobs from DB (source = algolia_stationf or stationf)
     print("[*] Fetching existing active jobs from DB...")
     # Fetch IDs and external_ids
-    resp = supabase.table("jobs").select("id, external_id").eq("is_active", True).execute()
+    resp = client.table("jobs").select("id, external_id").eq("is_active", True).execute()
     existing_jobs = resp.data or []
     
     # Map external_id -> db_id
@@ -54,7 +64,7 @@ def refresh_jobs():
         for i in range(0, len(db_ids_to_flag), batch_size):
             batch = db_ids_to_flag[i:i + batch_size]
             try:
-                supabase.table("jobs").update({
+                client.table("jobs").update({
                     "potentially_expired": True,
                     # We KEEP is_active=True as requested ("on les garde")
                     "last_checked_at": "now()"
@@ -75,6 +85,8 @@ def refresh_jobs():
         job["last_checked_at"] = "now()"
         # Ensure source is consistent
         job["source"] = "algolia_stationf"
+        # match_text, match_skills... come precomputed with the mapped job
+        # (algolia_scraper.map_algolia_hit_to_job): the API loads them as-is
         
         jobs_to_upsert.append(job)
 
@@ -87,7 +99,7 @@ def refresh_jobs():
         batch = jobs_to_upsert[i:i + batch_size]
         try:
             # Upsert on external_id
-            supabase.table("jobs").upsert(batch, on_conflict="external_id").execute()
+            client.table("jobs").upsert(batch, on_conflict="external_id").execute()
             upserted_count += len(batch)
             print(f"   [+] Batch {i//batch_size + 1} upserted ({len(batch)} jobs)")
         except Exception as e:
@@ -99,6 +111,12 @@ def refresh_jobs():
     print(f"   - Upserted/Updated: {upserted_count}")
     print(f"   - Flagged Expired: {len(missing_ids)}")
     print(f"   - Errors: {errors}")
+    return {
+        "scraped": len(scraped_ids),
+        "upserted": upserted_count,
+        "flagged_expired": len(missing_ids),
+        "errors": errors,
+    }
 
 if __name__ == "__main__":
     refresh_jobs()
@@ -0,0 +1,123 @@
+"""
+Startup Report
+==============
+
+Cold-start cost of the API server, measured in fresh interpreters:
+
+1. `python -X importtime -c "import api_server"`: total import time and the
+   slowest modules it imports (cumulative). Fails (exit 1) when one of
+   the heavy dependencies that only some endpoints use is imported eagerly:
+   browser_use, google.generativeai, duckduckgo_search, dns.resolver, bs4,
+   supabase.
+2. Cold start -> first /match: api_server import, startup hook (Supabase
+   clients, catalog thread), first POST /match, on the checked-in
+   jobs_scraped.json (in-memory catalog, no Supabase round trip). The same
+   phases are exposed by the server on GET /match/stats ("startup_seconds")
+   and GET /metrics (jobtinder_startup_seconds).
+
+Usage:
+    python startup_report.py [--top 15]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Chargés au premier usage par les endpoints qui en ont besoin, jamais à l'import
+LAZY_MODULES = ["browser_use", "google.generativeai", "duckduckgo_search", "dns.resolver", "bs4", "supabase"]
+
+# Premier /match d'un process neuf (catalogue = jobs_scraped.json)
+FIRST_MATCH_SCRIPT = """
+import json, os, sys
+sys.path.insert(0, {base_dir!r})
+import api_server as A
+from fastapi.testclient import TestClient
+
+with open(os.path.join({base_dir!r}, "jobs_scraped.json"), encoding="utf-8") as f:
+    jobs = json.load(f)
+for i, job in enumerate(jobs):
+    job.setdefault("id", i + 1)
+A.job_catalog.loader = lambda: jobs
+A.job_catalog.detail_loader = None
+A.job_catalog.watermark = None
+A.job_catalog.delta_loader = None
+A.job_catalog.snapshot_path = None  # cold start: no warm-restart snapshot
+
+with TestClient(A.app) as client:
+    response = client.post("/match", json={{"user_profile": {{"skills": ["Python", "SQL"], "objectif": "Data engineer"}}}})
+    assert response.status_code == 200, response.text[:200]
+    stats = client.get("/match/stats").json()
+print("STARTUP " + json.dumps(stats["startup_seconds"]))
+"""
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://localhost:54321")
+    env.setdefault("SUPABASE_KEY", "startup-report")
+    env["MATCH_WORKERS"] = "0"
+    return env
+
+
+def import_times():
+    """(module, self us, cumulative us, depth) of each import of api_server."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api_server"],
+        cwd=BASE_DIR, env=child_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"[X] import api_server failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def first_match_timings() -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", FIRST_MATCH_SCRIPT.format(base_dir=BASE_DIR)],
+        cwd=BASE_DIR, env=child_env(), capture_output=True, text=True,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            return json.loads(line[len("STARTUP "):])
+    raise SystemExit(f"[X] First /match failed:\n{proc.stdout[-1000:]}\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and cold start -> first /match of api_server")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imported packages to list (default: 15)")
+    args = parser.parse_args()
+
+    rows = import_times()
+    total = next(cumulative for name, _, cumulative, _ in rows if name == "api_server")
+    print(f"import api_server: {total / 1000:.0f} ms\n")
+    print(f"{'module imported by api_server':64} {'cumulative ms':>14}")
+    # Profondeur 1 = importé directement pendant l'import d'api_server (modules locaux compris)
+    top_level = [(name, cumulative) for name, _, cumulative, depth in rows if depth == 1]
+    for name, cumulative in sorted(top_level, key=lambda r: -r[1])[:args.top]:
+        print(f"{name:64} {cumulative / 1000:14.1f}")
+
+    imported = {name for name, _, _, _ in rows}
+    eager = [name for name in LAZY_MODULES if name in imported]
+
+    timings = first_match_timings()
+    print("\nCold start (seconds since the api_server import started):")
+    for phase, seconds in timings.items():
+        print(f"  {phase:12} {seconds:8.2f}")
+
+    if eager:
+        print(f"\n[X] Imported at startup instead of on first use: {', '.join(eager)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
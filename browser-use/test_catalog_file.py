@@ -0,0 +1,77 @@
+"""Snapshot file: round trip, private permissions, files others could write are refused."""
+
+import os
+import pickle
+import stat
+from array import array
+
+import pytest
+
+import catalog_file
+from catalog_file import SnapshotFile, open_private, private_state_dir, write_snapshot_file
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_round_trip_keeps_out_of_band_buffers(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    positions = array("I", range(100))
+    write_snapshot_file(path, {"version": 3}, ({"a": 1}, pickle.PickleBuffer(positions)))
+    snapshot = SnapshotFile(path)
+    assert snapshot.header["version"] == 3
+    body, buffer = snapshot.load()
+    assert body == {"a": 1}
+    assert list(memoryview(buffer).cast("B").cast("I")) == list(positions)
+
+
+@posix_only
+def test_snapshot_is_written_0600(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    write_snapshot_file(path, {}, [1, 2])
+    assert mode(path) == 0o600
+    assert os.listdir(tmp_path) == ["catalog.snapshot"]  # pas de fichier temporaire restant
+
+
+@posix_only
+@pytest.mark.parametrize("file_mode", [0o620, 0o602])
+def test_snapshot_writable_by_others_is_refused(tmp_path, file_mode):
+    path = str(tmp_path / "catalog.snapshot")
+    write_snapshot_file(path, {}, [1, 2])
+    os.chmod(path, file_mode)
+    with pytest.raises(PermissionError):
+        SnapshotFile(path)
+
+
+@posix_only
+def test_snapshot_of_another_user_is_refused(tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.snapshot")
+    write_snapshot_file(path, {}, [1, 2])
+    monkeypatch.setattr(catalog_file.os, "getuid", lambda: os.stat(path).st_uid + 1)
+    with pytest.raises(PermissionError):
+        SnapshotFile(path)
+
+
+@posix_only
+def test_private_state_dir_is_0700(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_file.tempfile, "gettempdir", lambda: str(tmp_path))
+    path = private_state_dir()
+    assert path == str(tmp_path / f"jobtinder-{os.getuid()}")
+    assert mode(path) == 0o700
+    os.chmod(path, 0o777)
+    with pytest.raises(PermissionError):
+        private_state_dir()
+
+
+@posix_only
+def test_open_private_creates_0600_and_refuses_shared_files(tmp_path):
+    path = str(tmp_path / "catalog.snapshot.lock")
+    with open_private(path) as f:
+        f.write("1")
+    assert mode(path) == 0o600
+    os.chmod(path, 0o666)
+    with pytest.raises(PermissionError):
+        open_private(path)
@@ -0,0 +1,53 @@
+"""Company index: card fields, stable card ids, ranking of matched companies."""
+
+import zlib
+from types import SimpleNamespace
+
+from company_index import CompanyIndex
+
+JOBS = [
+    {"company_name": "Acme", "company_slug": None, "logo_url": None},
+    {"company_name": "Globex", "company_slug": "globex", "logo_url": "g.png", "suggested_outreach_roles": ["CTO"]},
+    {"company_name": "Acme", "company_slug": "acme", "logo_url": "a.png"},
+    {"company_name": "Acme", "company_slug": "acme-2", "suggested_outreach_roles": ["VP Eng"]},
+    {"company_name": None},
+    {"company_name": "Initech", "company_slug": "", "logo_url": ""},
+    {"company_name": "Initech", "company_slug": "initech", "logo_url": "i.png"},
+]
+
+
+def index():
+    return CompanyIndex([SimpleNamespace(job=job) for job in JOBS])
+
+
+def scored(pairs):
+    """ScoredJobs stand-in: (catalog position, total score) in catalog order."""
+    return SimpleNamespace(positions=[p for p, _ in pairs], scores=[(s,) for _, s in pairs])
+
+
+def test_card_fields_come_from_the_whole_company():
+    companies = index()
+    acme = companies.slots["Acme"]
+    assert companies.names == ["Acme", "Globex", "Unknown", "Initech"]
+    assert (companies.slugs[acme], companies.logo_urls[acme]) == ("acme", "a.png")  # premières valeurs non vides
+    initech = companies.slots["Initech"]
+    assert (companies.slugs[initech], companies.logo_urls[initech]) == ("initech", "i.png")  # "" ne bloque pas la suite
+    assert companies.suggested_roles[acme] == ["VP Eng"]
+    assert companies.enrichment_positions[acme] == 3
+    assert companies.enrichment_positions[companies.slots["Unknown"]] is None
+
+
+def test_card_id_does_not_depend_on_the_hash_seed():
+    companies = index()
+    assert companies.card_ids == [zlib.crc32(name.encode("utf-8")) % 10000 for name in companies.names]
+    assert companies.card_ids[companies.slots["Acme"]] == 7872  # crc32(b"Acme") % 10000
+
+
+def test_rank_by_best_job_then_first_match():
+    companies = index()
+    matches = scored([(0, 40), (1, 70), (2, 70), (4, 10)])
+    ranked = companies.rank(matches)
+    # Acme et Globex à 70 : Acme a matché en premier
+    assert [(companies.names[slot], rows) for slot, rows in ranked] == [("Acme", [0, 2]), ("Globex", [1]), ("Unknown", [3])]
+    top, total = companies.top(matches, 2)
+    assert top == ranked[:2] and total == 3
@@ -0,0 +1,168 @@
+"""JobCatalog: delta sync, on-disk snapshot, shared catalog (leader / followers), delta overlap."""
+
+import os
+import threading
+
+import pytest
+
+from catalog_file import SnapshotFile
+from job_catalog import DeltaOverlap, JobCatalog, fcntl
+
+shared_only = pytest.mark.skipif(fcntl is None, reason="shared catalog needs fcntl")
+
+ROWS = [{"id": i, "title": f"job {i}"} for i in range(5)]
+
+
+def make_catalog(path, loads, name, **kwargs):
+    def loader():
+        loads.append(name)
+        return [dict(r) for r in ROWS]
+    return JobCatalog(loader=loader, featurize=lambda row: row["title"], snapshot_path=path, **kwargs)
+
+
+class Table:
+    """Fake jobs table: full loads, and deltas queued by the test."""
+
+    def __init__(self):
+        self.rows = [dict(r) for r in ROWS]
+        self.watermark = "t0"
+        self.deltas = []
+
+    def catalog(self, path=None, **kwargs):
+        return JobCatalog(
+            loader=lambda: [dict(r) for r in self.rows],
+            featurize=lambda row: row["title"],
+            watermark=lambda: self.watermark,
+            delta_loader=self.delta,
+            snapshot_path=path,
+            **kwargs,
+        )
+
+    def delta(self, since):
+        rows, watermark = self.deltas.pop(0) if self.deltas else ([], since)
+        return rows, watermark
+
+
+def test_delta_updates_adds_and_drops_tombstones():
+    table = Table()
+    catalog = table.catalog()
+    first = catalog.snapshot()
+    table.deltas.append(([
+        {"id": 1, "title": "job 1 (v2)"},
+        {"id": 3, "title": "job 3", "is_active": False},   # tombstone
+        {"id": 9, "title": "job 9"},                         # nouveau
+        {"id": 10, "title": "job 10", "is_active": False},  # tombstone d'un job jamais vu
+    ], "t1"))
+    snap = catalog.sync()
+    assert snap.version == first.version + 1
+    assert [j["id"] for j in snap.jobs] == [0, 1, 2, 4, 9]
+    assert snap.features == ["job 0", "job 1 (v2)", "job 2", "job 4", "job 9"]
+    assert snap.features[0] is first.features[0]  # lignes inchangées : features gardées
+    assert catalog.stats()["last_delta"] == {"rows": 4, "updated": 1, "added": 1, "removed": 1}
+    assert catalog.stats()["watermark"] == "t1"
+
+
+def test_repeated_rows_in_one_delta_apply_once():
+    table = Table()
+    catalog = table.catalog()
+    catalog.snapshot()
+    table.deltas.append(([{"id": 2, "title": "old"}, {"id": 2, "title": "new"}], "t1"))
+    snap = catalog.sync()
+    assert snap.features.count("new") == 1 and "old" not in snap.features
+    assert len(snap.jobs) == len(ROWS)
+
+
+def test_empty_delta_keeps_the_snapshot():
+    table = Table()
+    catalog = table.catalog()
+    first = catalog.snapshot()
+    assert catalog.sync() is first
+    assert catalog.stats()["last_delta"] == {"rows": 0}
+
+
+def test_empty_delta_saves_the_new_watermark(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    table = Table()
+    catalog = table.catalog(path)
+    first = catalog.snapshot()
+    saved = SnapshotFile(path).generation
+    assert catalog.sync() is first  # même watermark : pas de réécriture
+    assert SnapshotFile(path).generation == saved
+
+    table.deltas.append(([], "t1"))
+    assert catalog.sync() is first
+    header = SnapshotFile(path).header
+    assert (header["version"], header["since"]) == (first.version, "t1")
+
+    restarted = table.catalog(path)
+    assert restarted._restore().features == first.features
+    assert restarted.sync_state == "restored"
+    assert restarted.stats()["watermark"] == "t1"  # le prochain delta repart de t1
+
+
+def test_restore_skips_a_file_with_another_tag(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    table = Table()
+    table.catalog(path, snapshot_tag="v1").snapshot()
+    other = table.catalog(path, snapshot_tag="v2")
+    assert other._restore() is None
+
+
+def test_delta_overlap_skips_rows_already_applied():
+    overlap = DeltaOverlap(overlap_seconds=60)
+    start = overlap.window_start("2024-06-01T12:00:00+00:00")
+    assert start == "2024-06-01T11:59:00+00:00"
+    a = {"id": 1, "updated_at": "2024-06-01T11:59:30+00:00"}
+    b = {"id": 2, "updated_at": "2024-06-01T11:59:40+00:00"}
+    assert overlap.fresh([a, b], start) == [a, b]
+    b2 = {"id": 2, "updated_at": "2024-06-01T11:59:50+00:00"}
+    assert overlap.fresh([a, b2], start) == [b2]  # relu dans la fenêtre : sauté ; modifié : gardé
+
+    # Fenêtre suivante : les lignes sorties de la fenêtre sont oubliées
+    later = overlap.window_start("2024-06-01T12:00:45+00:00")
+    assert overlap.fresh([b2], later) == []
+    assert overlap._applied == {2: b2["updated_at"]}
+
+
+@shared_only
+def test_follower_keeps_its_snapshot_when_only_the_watermark_moved(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    table = Table()
+    leader = table.catalog(path, shared=True)
+    follower = table.catalog(path, shared=True)
+    assert leader._try_lead()
+    leader.snapshot()
+    followed = follower.snapshot()
+    table.deltas.append(([], "t1"))
+    leader.sync()
+    assert follower._restore() is followed
+    assert follower.stats()["watermark"] == "t1"
+    leader.stop()
+
+
+@shared_only
+def test_cold_follower_waits_for_the_leader_file(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    loads = []
+    leader = make_catalog(path, loads, "leader", shared=True)
+    follower = make_catalog(path, loads, "follower", shared=True, shared_poll_seconds=1, shared_wait_seconds=10)
+    assert leader._try_lead() and not follower._try_lead()
+    threading.Timer(0.3, leader.snapshot).start()  # le leader charge après la première demande du suiveur
+    snap = follower.snapshot()
+    assert loads == ["leader"]
+    assert follower.sync_state == "following"
+    assert snap.features == [r["title"] for r in ROWS]
+    leader.stop()
+
+
+@shared_only
+def test_cold_follower_loads_itself_when_no_leader_file_comes(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    loads = []
+    leader = make_catalog(path, loads, "leader", shared=True)
+    follower = make_catalog(path, loads, "follower", shared=True, shared_poll_seconds=1, shared_wait_seconds=1)
+    assert leader._try_lead()
+    assert len(follower.snapshot().jobs) == len(ROWS)
+    assert loads == ["follower"]
+    assert not os.path.exists(path)  # un suiveur n'écrit jamais le fichier
+    leader.stop()
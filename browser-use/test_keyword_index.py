@@ -0,0 +1,94 @@
+"""Boolean keyword queries: parser edge cases, index evaluation == per-job matching."""
+
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from keyword_index import KeywordFilter, KeywordIndex, parse_keyword_query
+from keyword_matcher import tokenize
+
+TEXTS = [
+    "senior python developer, machine learning platform",
+    "stage data engineer python sql",
+    "alternance react developer",
+    "head of engineering (go, kubernetes)",
+    "devops ci/cd, docker and kubernetes",
+    "vue.js frontend internship",
+    "not a tech job: sales",
+]
+
+
+def make_features(texts):
+    return [SimpleNamespace(full_text=t, tokens=tokenize(t)) for t in texts]
+
+
+@pytest.fixture
+def index():
+    return KeywordIndex(make_features(TEXTS))
+
+
+def scan(entries):
+    """Positions matched by a per-job scan (reference for the index)."""
+    f = KeywordFilter(entries)
+    return {pos for pos, text in enumerate(TEXTS) if f.search(text, tokenize(text))}
+
+
+@pytest.mark.parametrize("entry", [
+    "python",
+    "machine learning",
+    "(python OR go",         # unbalanced: plain keyword
+    "NOT",                    # operator alone: plain keyword
+    "python and go",          # lowercase operators: a phrase
+])
+def test_unparsable_or_plain_entries_are_plain_keywords(entry):
+    assert parse_keyword_query(entry) is None
+
+
+def test_operator_alone_matches_the_word():
+    assert scan(["NOT"]) == {6}
+
+
+def test_lowercase_and_is_a_phrase_not_an_operator():
+    assert scan(["python and go"]) == set()
+    assert scan(["docker and kubernetes"]) == {4}
+
+
+def test_quoted_phrase():
+    assert parse_keyword_query('"machine learning"') is not None
+    assert scan(['"machine learning"']) == {0}
+    assert scan(['"learning machine"']) == set()
+
+
+@pytest.mark.parametrize("entries, expected", [
+    (["react OR vue"], {2, 5}),
+    (["NOT stage"], {0, 2, 3, 4, 5, 6}),
+    (["python AND NOT senior"], {1}),
+    (['(python OR go) AND NOT "head of"'], {0, 1}),
+    (["NOT NOT python"], {0, 1}),
+    (["c++ OR ci/cd"], {4}),
+    (["kubernetes", "NOT python AND react"], {2, 3, 4}),  # entries are OR-ed
+])
+def test_boolean_queries(entries, expected):
+    assert scan(entries) == expected
+
+
+@pytest.mark.parametrize("entries", [
+    ["python"], ["machine learning"], ["(python OR go"], ["NOT"], ["python and go"],
+    ['"machine learning"'], ["react OR vue"], ["NOT stage"], ['(python OR go) AND NOT "head of"'],
+    ["c++ OR ci/cd"], ["kubernetes", "NOT python AND react"], [],
+])
+def test_index_matches_the_scan(index, entries):
+    assert KeywordFilter(entries).evaluate(index) == scan(entries)
+
+
+def test_lookup_is_case_insensitive_and_empty_safe(index):
+    assert index.lookup("PYTHON") == {0, 1}
+    assert index.lookup("  ") == frozenset()
+    assert index.lookup("unknown") == frozenset()
+
+
+def test_pickled_index_keeps_its_postings(index):
+    restored = pickle.loads(pickle.dumps(index, protocol=5))
+    for term in ("python", "kubernetes", "machine learning", "missing"):
+        assert restored.lookup(term) == index.lookup(term)
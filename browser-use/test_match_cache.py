@@ -0,0 +1,74 @@
+"""Match cache: canonical keys, LRU + TTL, cursor store sized for the cached pages."""
+
+import time
+
+import match_pages
+from match_cache import MATCH_CACHE_SIZE, MatchCache, match_cache_key
+from match_pages import RankedResult, ResultPages
+from matching import SearchPreferences, UserProfile
+
+
+def key(skills=(), objectif="", catalog_version=1, endpoint="/match:200", **prefs):
+    return match_cache_key(endpoint, UserProfile(skills=list(skills), objectif=objectif), SearchPreferences(**prefs), catalog_version)
+
+
+def test_or_lists_in_any_order_share_a_key():
+    a = key(exclude_keywords=["sales", "NOT stage"], must_have_keywords=["python", "go"], contract_types=["CDI", "stage"])
+    b = key(exclude_keywords=["NOT stage", "sales"], must_have_keywords=["go", "python"], contract_types=["stage", "CDI"])
+    assert a == b
+
+
+def test_target_roles_order_is_part_of_the_key():
+    assert key(target_roles=["backend", "devops"]) != key(target_roles=["devops", "backend"])
+
+
+def test_skills_and_objective_are_normalized():
+    assert key(["JS", "Python", "python "], "  Alternance Backend") == key(["python", "javascript"], "alternance backend")
+    assert key(["node.js"]) == key(["Node"])
+
+
+def test_key_changes_with_catalog_endpoint_and_filters():
+    base = key(["python"])
+    assert key(["python"], catalog_version=2) != base
+    assert key(["python"], endpoint="/match:50") != base
+    assert key(["python"], min_score=20) != base
+    assert key(["python"], strict_intent=True) != base
+
+
+def test_lru_eviction_and_ttl():
+    cache = MatchCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "a" devient le plus récent
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+    expiring = MatchCache(max_entries=2, ttl_seconds=0)
+    expiring.put("a", 1)
+    time.sleep(0.01)
+    assert expiring.get("a") is None and expiring.expirations == 1
+
+
+def test_disabled_cache_and_clear():
+    disabled = MatchCache(max_entries=0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None
+    cache = MatchCache(max_entries=2)
+    cache.put("a", 1)
+    cache.clear(object())  # listener du catalogue : reçoit le snapshot
+    assert cache.get("a") is None and cache.invalidations == 1
+
+
+def test_cursor_store_holds_a_result_per_cached_page():
+    assert match_pages.MATCH_CURSOR_MAX_RESULTS >= MATCH_CACHE_SIZE
+
+
+def test_kept_result_survives_eviction_of_newer_cursors():
+    pages = ResultPages(ttl_seconds=60, max_results=2)
+    pinned = RankedResult("jobs", None, None, {})
+    pinned_id = pages.create(pinned)
+    pages.create(RankedResult("jobs", None, None, {}))
+    pages.keep(pinned)  # page en cache servie à nouveau
+    pages.create(RankedResult("jobs", None, None, {}))
+    assert pages.get(pinned_id) is pinned
@@ -0,0 +1,124 @@
+"""Cursor pagination: cursor round trip, signed cursors, malformed cursors, last page, expired results."""
+
+import base64
+import json
+import os
+import stat
+import time
+import zlib
+
+import pytest
+
+import match_pages
+from match_pages import (
+    MAX_PAGE_SIZE,
+    RankedResult,
+    ResultPages,
+    decode_cursor,
+    encode_cursor,
+    load_cursor_key,
+    next_cursor,
+    sign_cursor,
+)
+
+REQUEST = {"user_profile": {"skills": ["Python"], "objectif": "alternance"}, "preferences": {"exclude_keywords": ["NOT stage"]}}
+RESULT_ID = "abc-_123abc-_123"  # même forme que secrets.token_urlsafe(12)
+
+
+@pytest.fixture(autouse=True)
+def cursor_key(monkeypatch):
+    monkeypatch.setattr(match_pages, "_cursor_key", b"test key")
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def body_of(**payload) -> str:
+    """Unsigned cursor body."""
+    fields = {"id": RESULT_ID, "offset": 0, "page_size": 200, "kind": "jobs", "request": REQUEST, **payload}
+    return b64(zlib.compress(json.dumps(fields).encode()))
+
+
+def registered(kind="jobs", request=REQUEST) -> RankedResult:
+    result = RankedResult(kind, None, None, {}, request=request)
+    ResultPages().create(result)
+    return result
+
+
+def test_cursor_round_trip_carries_the_request():
+    cursor = encode_cursor(RESULT_ID, 400, 200, "companies", REQUEST)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (RESULT_ID, 400, 200, "companies", REQUEST)
+
+
+@pytest.mark.parametrize("body", [
+    "",
+    "not base64 !",
+    b64(b"abc:0:200"),                               # ancien format / pas du zlib
+    b64(zlib.compress(b"[1, 2]")),                   # pas un objet
+    b64(zlib.compress(b'{"id": "abc"}')),            # champs manquants
+    b64(zlib.compress("é".encode("latin-1"))),
+    body_of(offset=-200),
+    body_of(offset="200"),
+    body_of(page_size=0),
+    body_of(page_size=MAX_PAGE_SIZE + 1),
+    body_of(id=3),
+    body_of(id="abc"),                                # id que ResultPages ne crée pas
+    body_of(id="../../abcdefghijk"),
+    body_of(request=["python"]),
+    b64(zlib.compress(b" " * (1 << 20))),            # décompressé trop gros
+    b64(zlib.compress(json.dumps({"id": "abc"}).encode())[:-4]),  # tronqué
+])
+def test_malformed_cursor_raises(body):
+    with pytest.raises(ValueError):
+        decode_cursor(sign_cursor(body))  # signé : seul le contenu est en cause
+
+
+def test_tampered_cursor_is_rejected():
+    cursor = encode_cursor(RESULT_ID, 200, 200, "jobs", REQUEST)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor[:-3] + "!!!")
+    with pytest.raises(ValueError):
+        decode_cursor(cursor[:10] + ("A" if cursor[10] != "A" else "B") + cursor[11:])
+    with pytest.raises(ValueError):
+        decode_cursor(cursor[:-1] + "é")
+
+
+def test_unsigned_or_forged_cursor_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        decode_cursor(body_of())
+    monkeypatch.setattr(match_pages, "_cursor_key", b"another key")
+    forged = sign_cursor(body_of())
+    monkeypatch.setattr(match_pages, "_cursor_key", b"test key")
+    with pytest.raises(ValueError):
+        decode_cursor(forged)
+    assert decode_cursor(sign_cursor(body_of()))[0] == RESULT_ID
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_cursor_key_file_is_private_and_shared(tmp_path):
+    path = str(tmp_path / "cursor.key")
+    key = load_cursor_key(path)
+    assert len(key) == 64 and load_cursor_key(path) == key  # le worker suivant relit la même clé
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_next_cursor_stops_on_the_last_page():
+    result = registered()
+    assert decode_cursor(next_cursor(result, 0, 200, 450))[:3] == (result.id, 200, 200)
+    assert decode_cursor(next_cursor(result, 200, 200, 450))[1] == 400
+    assert next_cursor(result, 400, 200, 450) is None
+    assert next_cursor(result, 0, 200, 200) is None
+
+
+def test_next_cursor_keeps_kind_and_request():
+    result = registered("companies")
+    assert decode_cursor(next_cursor(result, 0, 25, 100))[3:] == ("companies", REQUEST)
+
+
+def test_expired_result_is_gone():
+    pages = ResultPages(ttl_seconds=0)
+    result_id = pages.create(RankedResult("jobs", None, None, {}))
+    time.sleep(0.01)
+    assert pages.get(result_id) is None
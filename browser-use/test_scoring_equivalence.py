@@ -0,0 +1,421 @@
+"""
+Every engine ranks like the scorer of the baseline api_server, frozen below:
+legacy_job_match_score on each job dict, sorted by score (ties in catalog
+order), vs rank_catalog and rank_catalog_vectorized (full ranking and top-K),
+on jobs_scraped.json with 300 seeded random profiles (every 10th one also
+without the keyword index: must_have / exclude re-tokenize each job). Keyword
+preferences are plain keywords, the only syntax the baseline knew (boolean
+queries: test_keyword_index.py).
+"""
+
+import functools
+import json
+import os
+import random
+import re
+from typing import Dict, List, Optional
+
+import pytest
+
+from keyword_index import build_keyword_index
+from matching import MatchQuery, SearchPreferences, UserProfile, build_job_features, rank_catalog
+
+try:
+    from vector_scoring import build_vector_index, rank_catalog_vectorized
+except ImportError:
+    build_vector_index = None
+
+PROFILES = 300
+NO_INDEX_EVERY = 10
+TOP_K = 50
+
+
+# ============================================================
+# Frozen legacy scorer (baseline api_server.py, do not edit)
+# ============================================================
+
+# Synonymes pour normaliser les compétences (Ex: "js" devient "javascript")
+# Ça évite de rater un match juste à cause d'une abréviation.
+SKILL_SYNONYMS: Dict[str, str] = {
+    "js": "javascript",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "react.js": "react",
+    "next": "nextjs",
+    "next.js": "nextjs",
+    "py": "python",
+    "postgres": "postgresql",
+}
+
+# Si le job mentionne "Frontend", on suppose qu'il faut ces skills :
+ROLE_TO_SKILLS: Dict[str, List[str]] = {
+    "frontend": ["react", "javascript", "typescript", "html", "css"],
+    "backend": ["nodejs", "python", "fastapi", "django", "express", "sql"],
+    "data science": ["python", "sql", "machine learning"],
+    "ml": ["python", "machine learning", "ml", "ai"],  # Ajouté pour ML/AI
+}
+
+# Mots-clés pour deviner le rôle si ce n'est pas explicite
+ROLE_KEYWORDS: Dict[str, List[str]] = {
+    "frontend": ["frontend", "react", "vue", "angular", "nextjs", "javascript", "typescript"],
+    "backend": ["backend", "api", "fastapi", "django", "nodejs", "express", "python", "java", "spring"],
+    "fullstack": ["full stack", "fullstack", "frontend", "backend"],
+    "data": ["data", "data engineer", "data analyst", "sql", "etl", "warehouse"],
+    "ml_ai": ["ml", "machine learning", "ai", "ia", "intelligence artificielle", "deep learning", "nlp", "genai", "gen ai", "llm", "rag", "gpt"],
+    "devops": ["devops", "sre", "docker", "kubernetes", "ci/cd", "cloud", "aws", "gcp", "azure"],
+    "security": ["security", "cyber", "pentest", "soc", "siem"],
+}
+
+# Rôles explicites (quand l'utilisateur sélectionne "Je veux des jobs AI")
+# Plus strict que ROLE_KEYWORDS - utilisé pour le filtre d'intention
+PREFERENCE_ROLES: Dict[str, List[str]] = {
+    "ai_engineer": ["ai", "ia", "intelligence artificielle", "genai", "llm", "rag", "embedding", "fine-tuning", "nlp"],
+    "ml_engineer": ["machine learning", "ml", "deep learning", "model", "training", "inference", "pipeline"],
+    "backend": ["backend", "api", "fastapi", "django", "express", "microservices"],
+    "frontend": ["frontend", "react", "nextjs", "vue", "angular", "typescript"],
+    "data_engineer": ["data engineer", "etl", "pipeline", "warehouse", "spark", "airflow", "dbt"],
+}
+
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill string for consistent matching."""
+    if not skill or not skill.strip():
+        return ""
+    normalized = skill.lower().strip()
+    return SKILL_SYNONYMS.get(normalized, normalized)
+
+
+def as_list(x):
+    """Safely convert stack to list (handles string, list, None)."""
+    if x is None:
+        return []
+    if isinstance(x, list):
+        return x
+    if isinstance(x, str):
+        s = x.strip()
+        # try json list
+        if s.startswith("[") and s.endswith("]"):
+            try:
+                return json.loads(s)
+            except:
+                pass
+        # fallback comma split
+        return [p.strip() for p in s.split(",") if p.strip()]
+    return []
+
+
+def contains_kw(text: str, kw: str) -> bool:
+    """
+    Check if keyword exists in text.
+    - Multi-word phrases: substring match (e.g., "machine learning" in text)
+    - Single words: word-boundary regex to avoid false positives
+      (e.g., "intern" should NOT match "internal")
+    """
+    kw = kw.lower().strip()
+    if not kw:
+        return False
+    if " " in kw:
+        return kw in text
+    return re.search(rf"\b{re.escape(kw)}\b", text) is not None
+
+
+def infer_user_roles(objective: str) -> set:
+    """Infer role buckets from user objective text."""
+    if not objective:
+        return set()
+    txt = objective.lower()
+    matched_roles = set()
+    for role, keywords in ROLE_KEYWORDS.items():
+        if any(contains_kw(txt, kw) for kw in keywords):
+            matched_roles.add(role)
+    return matched_roles
+
+
+def legacy_job_match_score(user_profile, job_data: dict, preferences=None) -> Optional[dict]:
+    """
+    Calcule un score (0-100) pour un job.
+    Gère les Bonus (Alternance) et Malus (Senior).
+    """
+    
+    # --- 1. PRÉPARATION ---
+    job_title = job_data.get("title") or ""
+    job_desc = job_data.get("job_description") or ""
+    stack = as_list(job_data.get("stack"))
+    skills_extracted = as_list(job_data.get("skills_extracted"))
+    contract_type = job_data.get("contract_type") or ""
+    
+    # Le Blob pour tout scanner d'un coup
+    job_full_text = f"{job_title} {job_desc} {job_data.get('sector', '')} {' '.join(stack)} {' '.join(skills_extracted)}".lower()
+    contract_blob = f"{contract_type} {job_title}".lower()
+
+    # --- 2. FILTRES "KILL SWITCH" ---
+    
+    # A. Mots Exclus (Strict : Si je déteste, je jette)
+    if preferences:
+        for kw in preferences.exclude_keywords:
+            if contains_kw(job_full_text, kw.lower()):
+                return None 
+
+        # B. Must Have (Strict)
+        if preferences.must_have_keywords:
+            if not any(contains_kw(job_full_text, kw.lower()) for kw in preferences.must_have_keywords):
+                return None
+
+    # C. Filtre Contrat "Soft" (On ne jette plus, on note juste si c'est le bon)
+    is_target_contract = True
+    if preferences and preferences.contract_types:
+        if not any(contains_kw(contract_blob, ct.lower()) for ct in preferences.contract_types):
+            is_target_contract = False # Ce n'est pas le contrat idéal, on appliquera une pénalité plus tard
+
+    # D. Enriched Only (Jobs sans description = moins pertinents)
+    has_description = bool(job_desc.strip())
+    if preferences and preferences.enriched_only and not has_description:
+        return None  # Mode strict: on exclut les jobs sans description
+
+    # --- 3. CALCUL DES POINTS ---
+
+    # A. INTENT FIT (Max 60 pts)
+    intent_score = 0
+    matched_intent_keywords = []
+    
+    # BONUS: Direct title match with user objective (e.g., "GenAI Engineer" in both)
+    user_obj_lower = user_profile.objectif.lower()
+    job_title_lower = job_title.lower()
+    
+    # Extract key terms from user objective (2+ char words)
+    obj_terms = [w for w in re.split(r'\W+', user_obj_lower) if len(w) >= 2]
+    title_match_bonus = 0
+    for term in obj_terms:
+        if term in job_title_lower:
+            title_match_bonus += 15
+            if term not in matched_intent_keywords:
+                matched_intent_keywords.append(term)
+    title_match_bonus = min(40, title_match_bonus)  # Cap at 40 pts
+    
+    # On utilise ton objectif pour deviner les roles
+    user_roles = infer_user_roles(user_profile.objectif)
+    
+    # Si on a coché des rôles explicites dans les préférences, on utilise PREFERENCE_ROLES (plus strict)
+    if preferences and preferences.target_roles:
+        for role in preferences.target_roles:
+            # PREFERENCE_ROLES a des keywords plus spécifiques (llm, rag, embedding...)
+            keywords = PREFERENCE_ROLES.get(role, ROLE_KEYWORDS.get(role, []))
+            role_hits = 0
+            for kw in keywords:
+                if contains_kw(job_full_text, kw):
+                    role_hits += 10
+                    if kw not in matched_intent_keywords:
+                        matched_intent_keywords.append(kw)
+            intent_score += min(30, role_hits)
+    else:
+        # Fallback: on utilise ROLE_KEYWORDS (plus général)
+        for role in user_roles:
+            keywords = ROLE_KEYWORDS.get(role, [])
+            role_hits = 0
+            for kw in keywords:
+                if contains_kw(job_full_text, kw):
+                    role_hits += 10
+                    if kw not in matched_intent_keywords:
+                        matched_intent_keywords.append(kw)
+            intent_score += min(30, role_hits)
+    
+    intent_score = min(60, intent_score)
+    
+    # STRICT INTENT: Si activé et aucun match d'intention, on jette
+    if preferences and preferences.strict_intent and intent_score == 0:
+        return None
+
+
+    # B. SKILL FIT (Max 30 pts)
+    user_skills_clean = {normalize_skill(s) for s in user_profile.skills}
+    
+    # Expansion des tags (Frontend -> React, JS...)
+    all_job_skills = set(stack) | set(skills_extracted)
+    for tag in stack:
+        if tag and tag.lower() in ROLE_TO_SKILLS:
+            all_job_skills.update(ROLE_TO_SKILLS[tag.lower()])
+            
+    job_skills_clean = {normalize_skill(s) for s in all_job_skills if s}
+    
+    # Intersection
+    matched_skills = user_skills_clean & job_skills_clean
+    overlap_count = len(matched_skills)
+    
+    skill_score = 0
+    if overlap_count > 0:
+        skill_score = min(30, 10 + overlap_count * 5)
+
+
+    # C. HIRING SIGNAL & SENIOR PENALTY (Max 10 pts... ou Malus)
+    hiring_score = 5 # Base
+    
+    target_terms = ["alternance", "apprentissage", "contrat pro", "internship"] # Le Graal
+    junior_terms = ["junior", "stage", "intern", "entry level", "débutant"]      # Bien
+    senior_terms = ["senior", "lead", "principal", "staff", "manager", "head of", "director", "5+ years", "10 ans", "expert"] # Attention
+
+    is_senior = False
+    
+    # 1. Check Seniority (Le Piège)
+    if any(contains_kw(contract_blob, t) for t in senior_terms):
+        is_senior = True
+        hiring_score = 0 # On enlève les points "Hiring"
+    
+    # 2. Check Bonus (Le Graal)
+    elif any(contains_kw(contract_blob, t) for t in target_terms):
+        hiring_score = 20 # Super Bonus (dépasse le max théorique de 10, c'est fait exprès pour booster)
+
+    # 3. Check Junior
+    elif any(contains_kw(contract_blob, t) for t in junior_terms):
+        hiring_score = 10
+
+
+    # --- 4. SCORE FINAL & PENALTIES ---
+    total_score = intent_score + skill_score + hiring_score + title_match_bonus
+    
+    # Pénalité 1 : Ce n'est pas le contrat demandé (ex: CDI au lieu d'Alternance)
+    if not is_target_contract:
+        total_score = total_score * 0.7  # On garde 70% du score
+
+    # Pénalité 2 : C'est un poste Senior (ex: Lead Dev)
+    if is_senior:
+        total_score = total_score * 0.5  # Grosse pénalité
+
+    # Pénalité 3 : Pas de description (on sait moins si ça match vraiment)
+    if not has_description:
+        total_score = total_score * 0.8  # Légère pénalité
+
+    # On s'assure que ça reste propre entre 0 et 100
+    total_score = min(100, int(total_score))
+
+    # Filtre Final (Min Score)
+    if preferences and total_score < preferences.min_score:
+        return None
+
+    # --- 5. RESULTAT ---
+    
+    # Confiance du match (pour l'affichage UI)
+    confidence = "low"
+    if total_score >= 80: confidence = "very high"
+    elif total_score >= 60: confidence = "high"
+    elif total_score >= 40: confidence = "medium"
+
+    return {
+        "job_id": job_data.get("external_id"),
+        "title": job_title,
+        "company": job_data.get("company_name"),
+        "company_slug": job_data.get("company_slug"),      # NEW: For URL building
+        "logo_url": job_data.get("logo_url"),              # NEW: Company logo from Algolia
+        "location": job_data.get("location"),              # NEW: City, Country
+        "published_at": job_data.get("published_at"),      # NEW: Publication date
+        "contract_type": contract_type,
+        "score": total_score,
+        "details": {
+            "intent": intent_score, 
+            "skill": skill_score, 
+            "hiring_score": hiring_score,
+            "penalties": {
+                "senior_penalty": is_senior,
+                "wrong_contract": not is_target_contract,
+                "no_description": not has_description
+            }
+        },
+        "matched_skills": list(matched_skills),
+        "matched_intent": matched_intent_keywords[:5],
+        "url": job_data.get("apply_url"),
+        "match_confidence": confidence,
+        # AI enrichment fields
+        "suggested_outreach_roles": job_data.get("suggested_outreach_roles", []),
+        "enrichment_json": job_data.get("enrichment_json", {})
+    }
+
+
+# Fonction pure : mémoïsée (mêmes résultats) pour que 300 profils x 731 jobs restent rapides
+contains_kw = functools.lru_cache(maxsize=None)(contains_kw)
+
+
+# ============================================================
+# Random profiles
+# ============================================================
+
+SKILLS = sorted({s for skills in ROLE_TO_SKILLS.values() for s in skills} | {"Python", "JS", "node", "SQL", "Figma", "excel"})
+OBJECTIVES = [
+    "", "Je cherche une alternance Backend", "Développeur Fullstack", "GenAI Engineer / LLM",
+    "DevOps", "Data analyst en stage", "Product designer", "CDI frontend react",
+] + [kw for kws in ROLE_KEYWORDS.values() for kw in kws[:1]]
+TARGET_ROLES = sorted(set(ROLE_KEYWORDS) | set(PREFERENCE_ROLES))
+KEYWORDS = ["senior", "python", "stage", "sales", "machine learning", "head of", "react", "Docker", "node.js", "ci/cd"]
+CONTRACTS = ["alternance", "CDI", "stage", "CDD", "freelance"]
+
+
+def random_request(rng: random.Random):
+    user = UserProfile(skills=rng.sample(SKILLS, rng.randint(0, 6)), objectif=rng.choice(OBJECTIVES))
+    prefs = SearchPreferences(
+        target_roles=rng.sample(TARGET_ROLES, rng.randint(0, 2)),
+        exclude_keywords=rng.sample(KEYWORDS, rng.choice([0, 0, 1, 2])),
+        must_have_keywords=rng.sample(KEYWORDS, rng.choice([0, 0, 0, 1, 2])),
+        contract_types=rng.sample(CONTRACTS, rng.choice([0, 0, 1, 2])),
+        strict_intent=rng.random() < 0.2,
+        enriched_only=rng.random() < 0.2,
+        min_score=rng.choice([0, 0, 0, 20, 40]),
+    )
+    return user, prefs
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs_scraped.json"), encoding="utf-8") as f:
+        jobs = json.load(f)
+    features = [build_job_features(j) for j in jobs]
+    return jobs, features, build_keyword_index(features)
+
+
+def summary(match: dict) -> tuple:
+    """What the ranking must reproduce (matched_skills comes from a set: order-free)."""
+    return match["job_id"], match["score"], match["details"], sorted(match["matched_skills"]), match["matched_intent"]
+
+
+def reference(jobs, user, prefs) -> List[tuple]:
+    scored = [r for r in (legacy_job_match_score(user, job, prefs) for job in jobs) if r is not None]
+    return [summary(r) for r in sorted(scored, key=lambda r: r["score"], reverse=True)]
+
+
+def test_engines_rank_like_the_legacy_scorer(catalog):
+    jobs, features, keywords = catalog
+    vectors = build_vector_index(features) if build_vector_index else None
+    rng = random.Random(20240611)
+    try:
+        for i in range(PROFILES):
+            check_profile(i, *random_request(rng), jobs, features, keywords, vectors)
+    finally:
+        contains_kw.cache_clear()
+
+
+def check_profile(i, user, prefs, jobs, features, keywords, vectors):
+    expected = reference(jobs, user, prefs)
+    query = MatchQuery(user, prefs)
+    context = f"profile {i}: {user!r} {prefs!r}"
+
+    engines = {}
+    indexes = (("index", keywords), ("no index", None)) if i % NO_INDEX_EVERY == 0 else (("index", keywords),)
+    for index_name, index in indexes:
+        engines[f"python, {index_name}"] = lambda limit, index=index: rank_catalog(query, features, index, limit=limit)
+        if vectors is not None:
+            engines[f"vector, {index_name}"] = (
+                lambda limit, index=index: rank_catalog_vectorized(query, features, vectors, index, limit=limit)
+            )
+    for name, rank in engines.items():
+        full = rank(None)
+        assert [summary(m) for m in full.matches] == expected, f"{name} / {context}"
+        assert (full.matched, full.filtered) == (len(expected), len(jobs) - len(expected)), f"{name} / {context}"
+        top = rank(TOP_K)
+        assert [summary(m) for m in top.matches] == expected[:TOP_K], f"{name} top-{TOP_K} / {context}"
+        assert (top.matched, top.filtered) == (full.matched, full.filtered), f"{name} top-{TOP_K} / {context}"
+
+
+def test_full_ranking_counts_the_index_candidates(catalog):
+    _, features, keywords = catalog
+    query = MatchQuery(UserProfile(skills=["Python"]), SearchPreferences(must_have_keywords=["python"]))
+    full = rank_catalog(query, features, keywords)
+    top = rank_catalog(query, features, keywords, limit=TOP_K)
+    assert full.stats["candidates"] == full.stats["scored"] == top.stats["candidates"] < len(features)
+    assert rank_catalog(query, features).stats["candidates"] == len(features)  # sans index : tout le catalogue
@@ -0,0 +1,433 @@
+"""
+Vectorized Matching Engine (NumPy)
+==================================
+
+Same scores as matching.score_job, but computed for the whole catalog in a few
+array operations instead of a Python loop per job.
+
+VectorIndex (built once per catalog snapshot from the JobFeatures):
+    - skills        : sparse job x skill matrix (CSR: indptr / indices)
+    - role counts   : job x role matrix of keyword hit counts (ROLE_KEYWORDS)
+    - intent counts : job x role matrix for explicit target_roles (PREFERENCE_ROLES)
+    - flags         : hiring_score, is_senior, has_description
+    - titles        : lowercased titles joined in one string (objective terms -> title bonus)
+    - contracts     : inverted index over "contrat + titre" (contract_types)
+
+Per request, the MatchQuery becomes masks / weight vectors (user skills over the
+skill vocabulary, roles to sum, filters), and intent / skill / hiring / penalty
+components are computed for all jobs at once. Only the jobs that are actually
+returned are turned into result dicts (build_match_result); with a limit, the
+top K is selected with argpartition instead of sorting the whole catalog.
+
+Many profiles at once (rank_catalog_vectorized_batch, /match/batch): the skill
+overlap and the intent points of the whole batch are two matrix products
+(jobs x skills @ skills x profiles, jobs x roles @ roles x profiles) and each
+objective term is searched in the titles once for the batch.
+
+must_have / exclude come from the keyword index; without it they are checked
+job by job on the JobFeatures (like matching.rank_catalog without index).
+
+Validation (scores must be identical to the per-dict Python engine):
+    python vector_scoring.py                  # jobs_scraped.json (731 jobs)
+    python vector_scoring.py --scale 50000    # + synthetic 50k catalog timing
+"""
+
+import re
+from typing import List, Optional
+
+import numpy as np
+
+from keyword_index import KeywordIndex
+from matching import (
+    INTENT_ROLE_KEYWORDS,
+    ROLE_KEYWORDS,
+    JobFeatures,
+    MatchQuery,
+    MatchRanking,
+    ScoredJobs,
+    build_match_result,
+)
+
+
+class VectorIndex:
+    """Column-oriented view of the catalog features."""
+
+    def __init__(self, features: List[JobFeatures]):
+        n = len(features)
+        self.size = n
+
+        # Skills: CSR sparse matrix (jobs x skill vocabulary)
+        self.skill_vocab = {}
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indices = []
+        for i, f in enumerate(features):
+            for skill in f.skills:
+                indices.append(self.skill_vocab.setdefault(skill, len(self.skill_vocab)))
+            indptr[i + 1] = len(indices)
+        self.skill_indptr = indptr
+        self.skill_indices = np.asarray(indices, dtype=np.int64)
+        # Row of each non-zero entry (for bincount)
+        self.skill_rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+
+        # Roles: keyword hit counts per role
+        self.role_cols = {role: c for c, role in enumerate(ROLE_KEYWORDS)}
+        self.role_counts = np.array(
+            [[len(f.role_hits[role]) for role in ROLE_KEYWORDS] for f in features], dtype=np.int64
+        ).reshape(n, len(ROLE_KEYWORDS))
+        self.intent_cols = {role: c for c, role in enumerate(INTENT_ROLE_KEYWORDS)}
+        self.intent_counts = np.array(
+            [[len(f.intent_hits[role]) for role in INTENT_ROLE_KEYWORDS] for f in features], dtype=np.int64
+        ).reshape(n, len(INTENT_ROLE_KEYWORDS))
+        # Points per role, min(30, 10 * hits): intent = sum over the query roles (capped at 60)
+        self.role_points = np.minimum(30, 10 * self.role_counts)
+        self.intent_points = np.minimum(30, 10 * self.intent_counts)
+
+        # Flags
+        self.hiring = np.fromiter((f.hiring_score for f in features), dtype=np.int64, count=n)
+        self.is_senior = np.fromiter((f.is_senior for f in features), dtype=bool, count=n)
+        self.has_description = np.fromiter((f.has_description for f in features), dtype=bool, count=n)
+
+        # Titles in one "\x00"-separated string: one C-level scan per objective term.
+        # Terms are \w+ so a hit never spans two titles.
+        self.titles_blob = "\x00".join(f.title_lower for f in features)
+        lengths = np.fromiter((len(f.title_lower) + 1 for f in features), dtype=np.int64, count=n)
+        self.title_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if n else np.zeros(0, dtype=np.int64)
+
+        # Contract types are free text from the user: inverted index over "contrat + titre"
+        self.contracts = KeywordIndex(features, text_attr="contract_blob", tokens_attr="contract_tokens")
+
+    def title_mask(self, term: str) -> np.ndarray:
+        """Jobs whose title contains term (substring, like `term in title_lower`)."""
+        mask = np.zeros(self.size, dtype=bool)
+        offsets = [m.start() for m in re.finditer(re.escape(term), self.titles_blob)]
+        if offsets:
+            mask[np.searchsorted(self.title_starts, offsets, side="right") - 1] = True
+        return mask
+
+    def positions_mask(self, positions) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        if positions:
+            mask[np.fromiter(positions, dtype=np.int64)] = True
+        return mask
+
+
+def build_vector_index(features: List[JobFeatures]) -> VectorIndex:
+    return VectorIndex(features)
+
+
+class VectorScores:
+    """Per-job components for one query (arrays aligned with the catalog)."""
+
+    def __init__(self, total, alive, intent, skill, target):
+        self.total = total      # final score (int)
+        self.alive = alive      # passed every filter
+        self.intent = intent
+        self.skill = skill
+        self.target = target    # contract is one of the wanted types
+
+
+def score_vector(
+    query: MatchQuery,
+    vindex: VectorIndex,
+    kindex: Optional[KeywordIndex] = None,
+    features: Optional[List[JobFeatures]] = None,
+) -> VectorScores:
+    """All score components of every job for one query, in array form (features: keyword filters without kindex)."""
+    n = vindex.size
+    alive, target = _filter_masks(query, vindex, kindex, features)
+
+    # --- 2. POINTS ---
+    title_bonus = _title_bonus(query, vindex, {})
+
+    # Intent: sum over the query roles of min(30, 10 * hits), capped at 60
+    if query.use_preference_roles:
+        points, cols = vindex.intent_points, vindex.intent_cols
+    else:
+        points, cols = vindex.role_points, vindex.role_cols
+    intent = np.zeros(n, dtype=np.int64)
+    for role in query.intent_roles:
+        col = cols.get(role)
+        if col is not None:
+            intent += points[:, col]
+    intent = np.minimum(60, intent)
+
+    # Skills: overlap = number of user skills among the job skills
+    user_cols = [vindex.skill_vocab[s] for s in query.user_skills if s in vindex.skill_vocab]
+    if user_cols:
+        wanted = np.zeros(len(vindex.skill_vocab), dtype=bool)
+        wanted[user_cols] = True
+        overlap = np.bincount(vindex.skill_rows[wanted[vindex.skill_indices]], minlength=n)
+    else:
+        overlap = np.zeros(n, dtype=np.int64)
+
+    return _final_scores(query, vindex, alive, target, title_bonus, intent, overlap)
+
+
+def score_vector_batch(
+    queries: List[MatchQuery],
+    vindex: VectorIndex,
+    kindex: Optional[KeywordIndex] = None,
+    features: Optional[List[JobFeatures]] = None,
+) -> List[VectorScores]:
+    """score_vector for many queries, intent and skill overlap as matrix products."""
+    n, p = vindex.size, len(queries)
+
+    # Skills: wanted[skill, profile]; overlap = CSR(jobs x skills) @ wanted,
+    # summed per job with a cumulative sum over the non-zero entries
+    wanted = np.zeros((len(vindex.skill_vocab), p), dtype=np.int32)
+    for j, query in enumerate(queries):
+        user_cols = [vindex.skill_vocab[s] for s in query.user_skills if s in vindex.skill_vocab]
+        wanted[user_cols, j] = 1
+    cumulative = np.zeros((len(vindex.skill_indices) + 1, p), dtype=np.int32)
+    np.cumsum(wanted[vindex.skill_indices], axis=0, out=cumulative[1:])
+    overlap = cumulative[vindex.skill_indptr[1:]] - cumulative[vindex.skill_indptr[:-1]]
+
+    # Intent: selected[role, profile]; intent = points(jobs x roles) @ selected
+    role_selected = np.zeros((len(vindex.role_cols), p), dtype=np.int64)
+    intent_selected = np.zeros((len(vindex.intent_cols), p), dtype=np.int64)
+    for j, query in enumerate(queries):
+        selected, cols = (intent_selected, vindex.intent_cols) if query.use_preference_roles else (role_selected, vindex.role_cols)
+        for role in query.intent_roles:
+            col = cols.get(role)
+            if col is not None:
+                selected[col, j] += 1
+    intent = np.minimum(60, vindex.role_points @ role_selected + vindex.intent_points @ intent_selected)
+
+    title_masks = {}  # objective term -> title mask, shared by the batch
+    results = []
+    for j, query in enumerate(queries):
+        alive, target = _filter_masks(query, vindex, kindex, features)
+        title_bonus = _title_bonus(query, vindex, title_masks)
+        results.append(_final_scores(query, vindex, alive, target, title_bonus, intent[:, j], overlap[:, j]))
+    return results
+
+
+def _filter_masks(query: MatchQuery, vindex: VectorIndex, kindex: Optional[KeywordIndex], features: Optional[List[JobFeatures]] = None):
+    """(alive, target): jobs passing must_have/exclude/enriched_only, jobs of a wanted contract type."""
+    n = vindex.size
+    alive = np.ones(n, dtype=bool)
+
+    # --- 1. FILTRES ---
+    if kindex is not None:
+        positions = query.candidate_positions(kindex)
+        if positions is not None:
+            alive = vindex.positions_mask(positions)
+    elif query.must_have is not None or query.exclude is not None:
+        if features is None:
+            raise ValueError("score_vector needs the keyword index or the features to apply must_have/exclude")
+        # Sans index : must_have / exclude job par job, comme matching.evaluate_job
+        alive = np.fromiter((_passes_keywords(query, f) for f in features), dtype=bool, count=n)
+
+    if query.contracts is not None:
+        target_positions = set()
+        for kw in query.contracts.keywords:
+            target_positions |= vindex.contracts.lookup(kw)
+        target = vindex.positions_mask(target_positions)
+    else:
+        target = np.ones(n, dtype=bool)
+
+    if query.enriched_only:
+        alive &= vindex.has_description
+    return alive, target
+
+
+def _passes_keywords(query: MatchQuery, f: JobFeatures) -> bool:
+    if query.exclude is not None and query.exclude.search(f.full_text, f.tokens):
+        return False
+    return query.must_have is None or query.must_have.search(f.full_text, f.tokens)
+
+
+def _title_bonus(query: MatchQuery, vindex: VectorIndex, masks: dict) -> np.ndarray:
+    """+15 per objective term found in the title, capped at 40 (masks: term -> mask cache)."""
+    title_bonus = np.zeros(vindex.size, dtype=np.int64)
+    for term in query.obj_terms:
+        mask = masks.get(term)
+        if mask is None:
+            mask = masks[term] = vindex.title_mask(term)
+        title_bonus += 15 * mask
+    return np.minimum(40, title_bonus)
+
+
+def _final_scores(query: MatchQuery, vindex: VectorIndex, alive, target, title_bonus, intent, overlap) -> VectorScores:
+    if query.strict_intent:
+        alive &= intent > 0
+
+    skill = np.where(overlap > 0, np.minimum(30, 10 + overlap * 5), 0)
+
+    # --- 3. TOTAL & PENALTIES (same float operations, same order as score_job) ---
+    total = (intent + skill + vindex.hiring + title_bonus).astype(np.float64)
+    total = np.where(target, total, total * 0.7)
+    total = np.where(vindex.is_senior, total * 0.5, total)
+    total = np.where(vindex.has_description, total, total * 0.8)
+    total = np.minimum(100, np.trunc(total).astype(np.int64))
+
+    if query.min_score is not None:
+        alive &= total >= query.min_score
+
+    return VectorScores(total, alive, intent, skill, target)
+
+
+def _build_results(query: MatchQuery, features: List[JobFeatures], scores: VectorScores, positions) -> List[dict]:
+    return [
+        build_match_result(
+            query, features[i],
+            int(scores.total[i]), int(scores.intent[i]), int(scores.skill[i]), bool(scores.target[i]),
+        )
+        for i in positions
+    ]
+
+
+def evaluate_catalog_vectorized(
+    query: MatchQuery,
+    features: List[JobFeatures],
+    vindex: VectorIndex,
+    kindex: Optional[KeywordIndex] = None,
+) -> ScoredJobs:
+    """Drop-in for matching.evaluate_catalog (no result dict built)."""
+    scores = score_vector(query, vindex, kindex, features)
+    positions = np.flatnonzero(scores.alive)
+    components = list(zip(
+        scores.total[positions].tolist(),
+        scores.intent[positions].tolist(),
+        scores.skill[positions].tolist(),
+        scores.target[positions].tolist(),
+    ))
+    return ScoredJobs(query, features, positions.tolist(), components, vindex.size - len(positions))
+
+
+def score_catalog_vectorized(
+    query: MatchQuery,
+    features: List[JobFeatures],
+    vindex: VectorIndex,
+    kindex: Optional[KeywordIndex] = None,
+):
+    """Drop-in for matching.score_catalog: (matches in catalog order, filtered)."""
+    scores = score_vector(query, vindex, kindex, features)
+    positions = np.flatnonzero(scores.alive)
+    return _build_results(query, features, scores, positions), vindex.size - len(positions)
+
+
+def rank_catalog_vectorized(
+    query: MatchQuery,
+    features: List[JobFeatures],
+    vindex: VectorIndex,
+    kindex: Optional[KeywordIndex] = None,
+    limit: Optional[int] = None,
+) -> MatchRanking:
+    """Drop-in for matching.rank_catalog. Only the returned jobs become dicts."""
+    return _rank_scores(query, features, vindex, score_vector(query, vindex, kindex, features), limit)
+
+
+def rank_catalog_vectorized_batch(
+    queries: List[MatchQuery],
+    features: List[JobFeatures],
+    vindex: VectorIndex,
+    kindex: Optional[KeywordIndex] = None,
+    limit: Optional[int] = None,
+    chunk_size: int = 32,
+) -> List[MatchRanking]:
+    """rank_catalog_vectorized for each query, scored chunk_size profiles at a time (bounds the jobs x profiles matrices)."""
+    rankings = []
+    for start in range(0, len(queries), chunk_size):
+        chunk = queries[start:start + chunk_size]
+        for query, scores in zip(chunk, score_vector_batch(chunk, vindex, kindex, features)):
+            rankings.append(_rank_scores(query, features, vindex, scores, limit))
+    return rankings
+
+
+def _rank_scores(query: MatchQuery, features: List[JobFeatures], vindex: VectorIndex, scores: VectorScores, limit: Optional[int]) -> MatchRanking:
+    positions = np.flatnonzero(scores.alive)
+    if limit is not None and 0 < limit < len(positions):
+        # Top-K without sorting the whole catalog: unique key = score, then catalog order
+        key = scores.total[positions] * (vindex.size + 1) + (vindex.size - positions)
+        top = np.argpartition(-key, limit - 1)[:limit]
+        ranked = positions[top[np.argsort(-key[top])]]
+    else:
+        # Stable sort on -score: ties keep catalog order, like list.sort(reverse=True)
+        ranked = positions[np.argsort(-scores.total[positions], kind="stable")]
+        if limit is not None:
+            ranked = ranked[:limit]
+    matches = _build_results(query, features, scores, ranked)
+    stats = {"candidates": vindex.size, "scored": vindex.size, "pruned": 0, "materialized": len(matches)}
+    return MatchRanking(matches, len(positions), vindex.size - len(positions), stats)
+
+
+# ============================================================
+# CLI: validation against the Python engine
+# ============================================================
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+    import time
+
+    from keyword_index import build_keyword_index
+    from matching import SearchPreferences, UserProfile, build_job_features, rank_catalog
+
+    parser = argparse.ArgumentParser(description="Check the NumPy engine against the Python engine")
+    parser.add_argument("--jobs", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs_scraped.json"))
+    parser.add_argument("--scale", type=int, default=0, help="Also time a synthetic catalog of N jobs")
+    args = parser.parse_args()
+
+    with open(args.jobs, encoding="utf-8") as f:
+        jobs = json.load(f)
+
+    profiles = [
+        (UserProfile(skills=["Python", "React", "SQL"], objectif="Je cherche une alternance Backend"), None),
+        (UserProfile(skills=["js", "node"], objectif="Développeur Fullstack"), SearchPreferences(contract_types=["alternance", "CDI"])),
+        (UserProfile(skills=["python", "machine learning"], objectif="GenAI Engineer / LLM"),
+         SearchPreferences(target_roles=["ai_engineer", "ml_engineer"], exclude_keywords=["senior"], strict_intent=True)),
+        (UserProfile(skills=["docker", "aws"], objectif="DevOps"),
+         SearchPreferences(must_have_keywords=["docker OR kubernetes"], enriched_only=True, min_score=20)),
+    ]
+
+    def check(catalog_jobs, label):
+        feats = [build_job_features(j) for j in catalog_jobs]
+        kindex = build_keyword_index(feats)
+        vindex = build_vector_index(feats)
+        print(f"[{label}] {len(feats)} jobs")
+        for user, prefs in profiles:
+            query = MatchQuery(user, prefs or SearchPreferences())
+            t0 = time.perf_counter()
+            expected = rank_catalog(query, feats, kindex)
+            t1 = time.perf_counter()
+            got = rank_catalog_vectorized(query, feats, vindex, kindex)
+            t2 = time.perf_counter()
+            top_py = rank_catalog(query, feats, kindex, limit=200)
+            t3 = time.perf_counter()
+            top_np = rank_catalog_vectorized(query, feats, vindex, kindex, limit=200)
+            t4 = time.perf_counter()
+            same = [(m["job_id"], m["score"]) for m in expected.matches] == [(m["job_id"], m["score"]) for m in got.matches]
+            same_top = all(
+                [(m["job_id"], m["score"]) for m in r.matches] == [(m["job_id"], m["score"]) for m in expected.matches[:200]]
+                and (r.matched, r.filtered) == (expected.matched, expected.filtered)
+                for r in (top_py, top_np)
+            )
+            print(f"   {user.objectif[:30]:30} matched={got.matched:6} identical={same and same_top}  "
+                  f"python={1000 * (t1 - t0):8.1f}ms  numpy={1000 * (t2 - t1):8.1f}ms  "
+                  f"top200: python={1000 * (t3 - t2):8.1f}ms (pruned {top_py.stats['pruned']})  numpy={1000 * (t4 - t3):8.1f}ms")
+            if not (same and same_top):
+                raise SystemExit("[X] Scores differ between engines")
+
+        # Batch: every profile (x8 to fill a chunk) scored in one pass
+        queries = [MatchQuery(user, prefs or SearchPreferences()) for user, prefs in profiles] * 8
+        t0 = time.perf_counter()
+        one_by_one = [rank_catalog_vectorized(q, feats, vindex, kindex, limit=200) for q in queries]
+        t1 = time.perf_counter()
+        batch = rank_catalog_vectorized_batch(queries, feats, vindex, kindex, limit=200)
+        t2 = time.perf_counter()
+        same_batch = all(
+            [(m["job_id"], m["score"], m["details"]["intent"]) for m in a.matches]
+            == [(m["job_id"], m["score"], m["details"]["intent"]) for m in b.matches]
+            and (a.matched, a.filtered) == (b.matched, b.filtered)
+            for a, b in zip(one_by_one, batch)
+        )
+        print(f"   batch of {len(queries)} profiles, top200: identical={same_batch}  "
+              f"one by one={1000 * (t1 - t0):8.1f}ms  batch={1000 * (t2 - t1):8.1f}ms")
+        if not same_batch:
+            raise SystemExit("[X] Batch scores differ")
+
+    check(jobs, "jobs_scraped.json")
+    if args.scale:
+        check([jobs[i % len(jobs)] for i in range(args.scale)], f"synthetic x{args.scale}")
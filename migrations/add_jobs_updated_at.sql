@@ -0,0 +1,32 @@
+-- Run this in Supabase SQL Editor: https://supabase.com/dashboard/project/ymvzketndlglxsrjjvhj/sql
+-- updated_at on jobs: lets the API sync its in-memory catalog by delta
+-- (browser-use/api_server.py: fetch_jobs_updated_since)
+
+ALTER TABLE public.jobs
+  ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+-- Delta query: updated_at >= watermark, paged on (updated_at, id)
+CREATE INDEX IF NOT EXISTS idx_jobs_updated_at_id ON public.jobs(updated_at, id);
+
+-- Bump updated_at only when the row really changes: the Algolia refresh re-upserts
+-- every job with a new last_checked_at / scraped_at, which must not count as a change.
+CREATE OR REPLACE FUNCTION public.touch_jobs_updated_at()
+RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    NEW.updated_at := now();
+  ELSIF (to_jsonb(NEW) - 'updated_at' - 'last_checked_at' - 'scraped_at' - 'match_features_at')
+        IS DISTINCT FROM
+        (to_jsonb(OLD) - 'updated_at' - 'last_checked_at' - 'scraped_at' - 'match_features_at') THEN
+    NEW.updated_at := now();
+  ELSE
+    NEW.updated_at := OLD.updated_at;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_touch_updated_at ON public.jobs;
+CREATE TRIGGER jobs_touch_updated_at
+  BEFORE INSERT OR UPDATE ON public.jobs
+  FOR EACH ROW EXECUTE FUNCTION public.touch_jobs_updated_at();
@@ -0,0 +1,39 @@
+-- Run this in Supabase SQL Editor: https://supabase.com/dashboard/project/ymvzketndlglxsrjjvhj/sql
+-- Matching features computed at ingest time (browser-use/matching.py: materialize_match_columns)
+-- Fill existing rows afterwards: python browser-use/backfill_match_features.py
+
+ALTER TABLE public.jobs
+  ADD COLUMN IF NOT EXISTS match_text text,                 -- lowercase blob: title, description, sector, stack, skills
+  ADD COLUMN IF NOT EXISTS has_description boolean,
+  ADD COLUMN IF NOT EXISTS match_skills text[],             -- normalized skills (stack + skills_extracted + tag expansion)
+  ADD COLUMN IF NOT EXISTS role_keyword_hits text[],        -- role keywords found in match_text
+  ADD COLUMN IF NOT EXISTS is_senior boolean,
+  ADD COLUMN IF NOT EXISTS hiring_score smallint,           -- 0 senior, 5 base, 10 junior, 20 alternance/stage
+  ADD COLUMN IF NOT EXISTS match_features_version int,      -- matching.MATCH_FEATURES_VERSION, NULL = to recompute
+  ADD COLUMN IF NOT EXISTS match_features_at timestamptz;
+
+-- Backfill: rows without up-to-date features
+CREATE INDEX IF NOT EXISTS idx_jobs_match_features_version ON public.jobs(match_features_version);
+
+-- A writer that changes a source column without rewriting the features
+-- (match_features_at untouched) leaves them stale: flag the row for recompute.
+CREATE OR REPLACE FUNCTION public.flag_stale_match_features()
+RETURNS trigger AS $$
+BEGIN
+  IF NEW.match_features_at IS NOT DISTINCT FROM OLD.match_features_at
+     AND (NEW.title IS DISTINCT FROM OLD.title
+          OR NEW.job_description IS DISTINCT FROM OLD.job_description
+          OR NEW.sector IS DISTINCT FROM OLD.sector
+          OR NEW.stack::text IS DISTINCT FROM OLD.stack::text
+          OR NEW.skills_extracted::text IS DISTINCT FROM OLD.skills_extracted::text
+          OR NEW.contract_type IS DISTINCT FROM OLD.contract_type) THEN
+    NEW.match_features_version := NULL;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_flag_stale_match_features ON public.jobs;
+CREATE TRIGGER jobs_flag_stale_match_features
+  BEFORE UPDATE ON public.jobs
+  FOR EACH ROW EXECUTE FUNCTION public.flag_stale_match_features();
@@ -0,0 +1,20 @@
+-- Run this in Supabase SQL Editor: https://supabase.com/dashboard/project/ymvzketndlglxsrjjvhj/sql
+-- Run history of the refresh scheduler (browser-use/refresh_scheduler.py: supabase_run_recorder)
+
+CREATE TABLE IF NOT EXISTS public.refresh_runs (
+  id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  task text NOT NULL,                   -- algolia, descriptions, catalog
+  status text NOT NULL,                 -- ok, failed, skipped (already running)
+  started_at timestamptz NOT NULL,
+  duration_seconds double precision,
+  result jsonb,                         -- summary returned by the task (upserted, flagged_expired...)
+  error text,
+  host text,
+  pid int
+);
+
+-- Last runs of a task
+CREATE INDEX IF NOT EXISTS idx_refresh_runs_task_started_at ON public.refresh_runs(task, started_at DESC);
+
+-- Written with the service role only
+ALTER TABLE public.refresh_runs ENABLE ROW LEVEL SECURITY;